@@ -0,0 +1,69 @@
+import json
+import hashlib
+from typing import Dict
+
+# Формат дельт каталога модов
+#
+# В mods.json хранится порядковый номер версии каталога (sequence).
+# Рядом, в data/deltas/, лежат:
+#   index.json  - {"sequence": N, "oldest": K}: последняя версия и самая
+#                 старая версия, от которой еще есть цепочка дельт
+#   <N>.json    - переход с версии N-1 на N:
+#                 {"from": N-1, "sequence": N, "upsert": {id: мод}, "delete": [id],
+#                  "checksum": контрольная сумма модов версии N}
+DELTA_FORMAT = 1
+
+def catalog_checksum(mods: Dict[str, Dict]) -> str:
+    """
+    Контрольная сумма модов каталога, не зависящая от форматирования файла
+    :param mods: Словарь mods из mods.json
+    :return: SHA-256 в hex
+    """
+    canonical = json.dumps(mods, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def make_delta(old_catalog: Dict, new_catalog: Dict) -> Dict:
+    """
+    Дельта между двумя версиями каталога
+    :param old_catalog: Старый mods.json
+    :param new_catalog: Новый mods.json (с sequence)
+    :return: Дельта для перехода со старой версии на новую
+    """
+    old_mods = old_catalog.get('mods', {})
+    new_mods = new_catalog.get('mods', {})
+    return {
+        'format': DELTA_FORMAT,
+        'from': old_catalog.get('sequence', 0),
+        'sequence': new_catalog['sequence'],
+        'upsert': {mod_id: mod for mod_id, mod in new_mods.items() if old_mods.get(mod_id) != mod},
+        'delete': [mod_id for mod_id in old_mods if mod_id not in new_mods],
+        'checksum': catalog_checksum(new_mods)
+    }
+
+def apply_delta(catalog: Dict, delta: Dict) -> Dict:
+    """
+    Применение дельты к каталогу
+    :param catalog: Текущий каталог (не изменяется)
+    :param delta: Дельта с версии каталога на следующую
+    :return: Новый каталог
+    :raises ValueError: Дельта не к этой версии или результат не совпал с контрольной суммой
+    """
+    if delta.get('format', DELTA_FORMAT) != DELTA_FORMAT:
+        raise ValueError(f"Неизвестный формат дельты: {delta.get('format')}")
+    sequence = catalog.get('sequence', 0)
+    if delta.get('from') != sequence:
+        raise ValueError(f"Дельта {delta.get('from')} -> {delta.get('sequence')} "
+                         f"не подходит к версии каталога {sequence}")
+
+    mods = dict(catalog.get('mods', {}))
+    for mod_id in delta.get('delete', []):
+        mods.pop(mod_id, None)
+    mods.update(delta.get('upsert', {}))
+
+    if delta.get('checksum') and catalog_checksum(mods) != delta['checksum']:
+        raise ValueError(f"Контрольная сумма каталога версии {delta.get('sequence')} не совпала")
+
+    result = dict(catalog)
+    result['sequence'] = delta['sequence']
+    result['mods'] = mods
+    return result
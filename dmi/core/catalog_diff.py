@@ -0,0 +1,64 @@
+from typing import Dict, List
+
+class CatalogDiff:
+    def __init__(self, old_mods: Dict[str, Dict], new_mods: Dict[str, Dict]):
+        """
+        Разница между двумя версиями каталога модов
+        :param old_mods: Моды локального каталога (словарь mods из mods.json)
+        :param new_mods: Моды нового каталога
+        """
+        # Новые и удаленные моды
+        self.added: List[str] = [mod_id for mod_id in new_mods if mod_id not in old_mods]
+        self.removed: List[str] = [mod_id for mod_id in old_mods if mod_id not in new_mods]
+        # Моды с новой версией
+        self.updated: List[str] = []
+        # Моды, у которых поменялся файл без смены версии
+        self.hash_changed: List[str] = []
+        # Моды, у которых поменялось только описание (название, медиа и т.д.)
+        self.changed: List[str] = []
+
+        for mod_id, new_mod in new_mods.items():
+            old_mod = old_mods.get(mod_id)
+            if old_mod is None or old_mod == new_mod:
+                continue
+            if old_mod.get('version') != new_mod.get('version'):
+                self.updated.append(mod_id)
+            elif (old_mod.get('file') or {}).get('hash') != (new_mod.get('file') or {}).get('hash'):
+                self.hash_changed.append(mod_id)
+            else:
+                self.changed.append(mod_id)
+
+    def has_changes(self) -> bool:
+        """Есть ли хоть какие-то изменения"""
+        return bool(self.added or self.removed or self.updated or self.hash_changed or self.changed)
+
+    def get_summary(self) -> str:
+        """
+        Краткое описание изменений для пользователя
+        :return: Строка вида "Новых модов: 2, обновлено: 1"
+        """
+        parts = []
+        if self.added:
+            parts.append(f"новых модов: {len(self.added)}")
+        if self.updated:
+            parts.append(f"обновлено: {len(self.updated)}")
+        if self.hash_changed:
+            parts.append(f"изменены файлы: {len(self.hash_changed)}")
+        if self.removed:
+            parts.append(f"удалено: {len(self.removed)}")
+        if self.changed:
+            parts.append(f"изменены описания: {len(self.changed)}")
+        if not parts:
+            return "Изменений нет"
+        summary = ", ".join(parts)
+        return summary[0].upper() + summary[1:]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Изменения в виде словаря (для логов и отладки)"""
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'updated': self.updated,
+            'hash_changed': self.hash_changed,
+            'changed': self.changed
+        }
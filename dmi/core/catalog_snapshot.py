@@ -0,0 +1,101 @@
+import os
+import sys
+import struct
+import marshal
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from .config import get_app_data_dir
+from .mod_record import ModRecord
+
+class CatalogSnapshot:
+    # Версия формата снимка; меняется вместе с полями ModRecord
+    FORMAT = 1
+    # Длина заголовка перед ним самим
+    HEADER_LENGTH = struct.Struct('<I')
+
+    def __init__(self, snapshot_path: str = None):
+        """
+        Двоичный снимок разобранного каталога (marshal)
+        Файл снимка состоит из заголовка (формат, версия Python, размер,
+        mtime и SHA-256 исходного mods.json) и кортежей записей ModRecord.
+        Данные читаются целиком и разбираются marshal.loads: marshal.load
+        из файла на большом каталоге в разы медленнее.
+        Снимок действителен, пока совпадают размер и mtime; если изменилось
+        только время, проверяется хэш содержимого
+        :param snapshot_path: Путь к снимку. По умолчанию %APPDATA%/DMI/cache/catalog.snapshot
+        """
+        if snapshot_path is None:
+            snapshot_path = os.path.join(get_app_data_dir('cache'), 'catalog.snapshot')
+        self.snapshot_path = snapshot_path
+
+    def _header(self, st: os.stat_result, sha256: str) -> Dict:
+        """Заголовок снимка для исходного файла"""
+        return {
+            'format': self.FORMAT,
+            # Формат marshal зависит от версии Python
+            'python': list(sys.version_info[:2]),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': sha256
+        }
+
+    def load(self, source_path: str) -> Optional[Tuple[Dict, List[ModRecord]]]:
+        """
+        Загрузка каталога из снимка
+        :param source_path: Путь к mods.json
+        :return: (поля каталога кроме mods, записи) или None, если снимка нет или он устарел
+        """
+        try:
+            st = os.stat(source_path)
+            with open(self.snapshot_path, 'rb') as f:
+                length, = self.HEADER_LENGTH.unpack(f.read(self.HEADER_LENGTH.size))
+                header = marshal.loads(f.read(length))
+                if (header.get('format') != self.FORMAT
+                        or header.get('python') != list(sys.version_info[:2])
+                        or header.get('size') != st.st_size):
+                    return None
+
+                if header.get('mtime_ns') != st.st_mtime_ns:
+                    # Файл перезаписан - снимок подходит, только если содержимое то же
+                    with open(source_path, 'rb') as source:
+                        if hashlib.sha256(source.read()).hexdigest() != header.get('sha256'):
+                            return None
+                    refresh = True
+                else:
+                    refresh = False
+
+                fields, values = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, struct.error):
+            return None
+
+        records = [ModRecord.from_tuple(item) for item in values]
+        if refresh:
+            self.save(source_path, header['sha256'], fields, records)
+        return fields, records
+
+    def save(self, source_path: str, sha256: str, fields: Dict, records: List[ModRecord]) -> None:
+        """
+        Атомарное сохранение снимка
+        :param source_path: Путь к mods.json, из которого получены записи
+        :param sha256: Хэш содержимого mods.json
+        :param fields: Поля каталога кроме mods (например, sequence)
+        :param records: Записи модов
+        """
+        try:
+            header = self._header(os.stat(source_path), sha256)
+            temp_path = self.snapshot_path + '.tmp'
+            header = marshal.dumps(header)
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER_LENGTH.pack(len(header)))
+                f.write(header)
+                f.write(marshal.dumps((fields, [record.to_tuple() for record in records])))
+            os.replace(temp_path, self.snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при сохранении снимка каталога: {e}")
+
+    def clear(self) -> None:
+        """Удаление снимка"""
+        try:
+            os.remove(self.snapshot_path)
+        except FileNotFoundError:
+            pass
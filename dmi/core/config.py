@@ -2,6 +2,18 @@ import os
 import json
 from typing import Any, Dict
 
+def get_app_data_dir(*parts: str) -> str:
+    """
+    Получение пути к папке данных программы (%APPDATA%/DMI/...)
+    :param parts: Вложенные папки
+    :return: Путь к папке (создается если её нет)
+    """
+    # Вне Windows APPDATA нет, используем домашнюю папку
+    appdata = os.getenv('APPDATA') or os.path.expanduser('~')
+    path = os.path.join(appdata, 'DMI', *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
 class Config:
     def __init__(self, config_path: str = None):
         if config_path is None:
@@ -84,3 +96,12 @@ class Config:
         """Установка настройки проверки обновлений"""
         self.config["settings"]["check_updates"] = check
         self._save_config()
+    
+    def get_media_cache_max_bytes(self) -> int:
+        """Получение ограничения размера кэша медиафайлов в байтах"""
+        return self.config["settings"].get("media_cache_max_mb", 500) * 1024 * 1024
+    
+    def set_media_cache_max_mb(self, size_mb: int) -> None:
+        """Установка ограничения размера кэша медиафайлов (МБ)"""
+        self.config["settings"]["media_cache_max_mb"] = size_mb
+        self._save_config()
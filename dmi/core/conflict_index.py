@@ -0,0 +1,152 @@
+import os
+import marshal
+import threading
+from typing import Dict, List, Optional, Tuple
+from .config import get_app_data_dir
+from .vpk_reader import VpkReader
+
+class ConflictIndex:
+    # Версия формата кэша содержимого
+    FORMAT = 1
+
+    def __init__(self, cache_path: str = None):
+        """
+        Индекс пересечений файлов между установленными pak файлами
+        Для каждого пути внутри VPK хранится список pak файлов, которые его
+        содержат, в порядке загрузки (первый загруженный побеждает).
+        Каталог каждого VPK разбирается один раз: содержимое кэшируется по
+        SHA-256 файла, а для файлов без известного хэша - по пути, размеру и mtime
+        :param cache_path: Файл кэша содержимого. По умолчанию %APPDATA%/DMI/cache/vpk_contents.cache
+        """
+        if cache_path is None:
+            cache_path = os.path.join(get_app_data_dir('cache'), 'vpk_contents.cache')
+        self.cache_path = cache_path
+        self._lock = threading.RLock()
+        # {ключ: {путь внутри VPK: CRC32}}; загружается при первом обращении
+        self._contents: Optional[Dict[str, Dict[str, int]]] = None
+        self._dirty = False
+        # {путь внутри VPK: [pak файлы в порядке загрузки]}
+        self._providers: Dict[str, List[str]] = {}
+        # {pak файл: ключ содержимого}
+        self._slots: Dict[str, str] = {}
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        if self._contents is None:
+            try:
+                with open(self.cache_path, 'rb') as f:
+                    data = marshal.loads(f.read())
+                self._contents = data['contents'] if data.get('format') == self.FORMAT else {}
+            except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+                self._contents = {}
+        return self._contents
+
+    def save(self) -> None:
+        """Атомарное сохранение кэша содержимого (если он менялся)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                temp_path = self.cache_path + '.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(marshal.dumps({'format': self.FORMAT, 'contents': self._contents}))
+                os.replace(temp_path, self.cache_path)
+                self._dirty = False
+            except (OSError, ValueError) as e:
+                print(f"Ошибка при сохранении кэша содержимого VPK: {e}")
+
+    @staticmethod
+    def _key(path: str, sha256: str = None, st: os.stat_result = None) -> str:
+        """Ключ кэша: хэш содержимого или признаки файла"""
+        if sha256:
+            return sha256.lower()
+        st = st or os.stat(path)
+        return f"{os.path.normcase(os.path.abspath(path))}|{st.st_size}|{st.st_mtime_ns}"
+
+    def get_contents(self, path: str, sha256: str = None) -> Dict[str, int]:
+        """
+        Содержимое VPK из кэша или разбором каталога
+        :param path: Путь к VPK
+        :param sha256: Хэш файла, если известен
+        :return: {путь внутри VPK: CRC32}
+        :raises ValueError: Если файл не является VPK
+        """
+        key = self._key(path, sha256)
+        with self._lock:
+            contents = self._load().get(key)
+        if contents is not None:
+            return contents
+
+        with VpkReader(path) as reader:
+            contents = {entry.path: entry.crc for entry in reader}
+        with self._lock:
+            self._contents[key] = contents
+            self._dirty = True
+        return contents
+
+    def build(self, paks: List[Tuple[str, str, Optional[str]]]) -> None:
+        """
+        Построение индекса по установленным pak файлам
+        :param paks: (имя pak файла, путь, SHA-256 или None) в порядке загрузки
+        """
+        providers: Dict[str, List[str]] = {}
+        slots = {}
+        for slot, path, sha256 in paks:
+            try:
+                contents = self.get_contents(path, sha256)
+            except (OSError, ValueError) as e:
+                print(f"Не удалось прочитать каталог {slot}: {e}")
+                continue
+            slots[slot] = self._key(path, sha256)
+            for inner_path in contents:
+                providers.setdefault(inner_path, []).append(slot)
+        with self._lock:
+            self._providers = providers
+            self._slots = slots
+        self.save()
+
+    def _crc(self, slot: str, inner_path: str) -> Optional[int]:
+        return self._contents.get(self._slots.get(slot), {}).get(inner_path)
+
+    def get_conflicts(self, include_identical: bool = False) -> Dict[str, List[str]]:
+        """
+        Пути, которые есть в нескольких pak файлах
+        :param include_identical: Учитывать файлы с одинаковым содержимым (CRC)
+        :return: {путь внутри VPK: [pak файлы в порядке загрузки]}
+        """
+        with self._lock:
+            conflicts = {}
+            for inner_path, slots in self._providers.items():
+                if len(slots) < 2:
+                    continue
+                if not include_identical and len({self._crc(slot, inner_path) for slot in slots}) == 1:
+                    continue
+                conflicts[inner_path] = list(slots)
+            return conflicts
+
+    def get_pairs(self) -> Dict[Tuple[str, str], List[str]]:
+        """
+        Пересечения по парам pak файлов
+        :return: {(побеждающий pak, перекрытый pak): [пути]}
+        """
+        pairs: Dict[Tuple[str, str], List[str]] = {}
+        for inner_path, slots in self.get_conflicts().items():
+            winner = slots[0]
+            for slot in slots[1:]:
+                pairs.setdefault((winner, slot), []).append(inner_path)
+        return pairs
+
+    def find_overlaps(self, contents: Dict[str, int], exclude: str = None) -> Dict[str, List[str]]:
+        """
+        Какие установленные pak файлы содержат те же пути (проверка перед установкой)
+        Файлы с тем же содержимым (CRC) не считаются пересечением
+        :param contents: {путь внутри VPK: CRC32} проверяемого файла
+        :param exclude: Pak файл, который не учитывается (сам проверяемый)
+        :return: {pak файл: [пути]}
+        """
+        overlaps: Dict[str, List[str]] = {}
+        with self._lock:
+            for inner_path, crc in contents.items():
+                for slot in self._providers.get(inner_path, ()):
+                    if slot != exclude and self._crc(slot, inner_path) != crc:
+                        overlaps.setdefault(slot, []).append(inner_path)
+        return overlaps
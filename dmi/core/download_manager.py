@@ -0,0 +1,210 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait as wait_futures
+from typing import Callable, Dict, List, Optional
+from .drive_downloader import DriveDownloader
+
+class DownloadJob:
+    """Задание на загрузку одного файла"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id: int, file_id: str, target_path: str, size: int = 0,
+                 on_done: Optional[Callable[['DownloadJob'], None]] = None,
+                 sha256: str = None):
+        """
+        :param job_id: Номер задания в менеджере
+        :param file_id: ID файла на Google Drive
+        :param target_path: Путь для сохранения
+        :param size: Ожидаемый размер файла в байтах (0 если неизвестен)
+        :param on_done: Вызывается из рабочего потока после завершения задания
+        :param sha256: Ожидаемый хэш файла, проверяется во время загрузки
+        """
+        self.job_id = job_id
+        self.file_id = file_id
+        self.target_path = target_path
+        self.size = size
+        self.sha256 = sha256
+        self.on_done = on_done
+        self.status = self.QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        """True если задание завершено (успешно или нет)"""
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+    @property
+    def success(self) -> bool:
+        """True если файл загружен"""
+        return self.status == self.DONE
+
+
+class DownloadManager:
+    def __init__(self, downloader: DriveDownloader = None, max_workers: int = 4,
+                 progress_callback: Optional[Callable[[DownloadJob, float], None]] = None):
+        """
+        Менеджер параллельных загрузок поверх DriveDownloader
+        :param downloader: Загрузчик файлов (по умолчанию DriveDownloader)
+        :param max_workers: Максимальное число одновременных загрузок
+        :param progress_callback: Функция (задание, общий прогресс в %),
+                                  вызывается из рабочих потоков
+        """
+        self.downloader = downloader or DriveDownloader()
+        self.progress_callback = progress_callback
+        # Пул ограничен max_workers, остальные задания ждут в очереди пула
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="dmi-download")
+        self._jobs: Dict[int, DownloadJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, file_id: str, target_path: str, size: int = 0,
+               on_done: Optional[Callable[[DownloadJob], None]] = None,
+               sha256: str = None) -> DownloadJob:
+        """
+        Поставить файл в очередь на загрузку
+        :param file_id: ID файла на Google Drive
+        :param target_path: Путь для сохранения
+        :param size: Ожидаемый размер в байтах, используется как вес в общем прогрессе
+                     и для проверки скачанного файла
+        :param on_done: Функция, вызываемая после завершения задания
+        :param sha256: Ожидаемый SHA-256 файла
+        :return: Задание на загрузку
+        """
+        with self._lock:
+            job = DownloadJob(next(self._ids), file_id, target_path, size, on_done, sha256)
+            self._jobs[job.job_id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: DownloadJob) -> None:
+        """Выполнение задания в рабочем потоке"""
+        if job.cancel_event.is_set():
+            self._finish(job, DownloadJob.CANCELLED, "Загрузка отменена")
+            return
+
+        job.status = DownloadJob.RUNNING
+
+        def on_progress(progress: float):
+            job.progress = progress
+            self._notify(job)
+
+        try:
+            success, message = self.downloader.download_file(
+                job.file_id,
+                job.target_path,
+                on_progress,
+                job.cancel_event,
+                job.size or None,
+                job.sha256
+            )
+        except Exception as e:
+            success, message = False, f"Ошибка при загрузке: {str(e)}"
+
+        if success:
+            job.progress = 100.0
+            status = DownloadJob.DONE
+        elif job.cancel_event.is_set():
+            status = DownloadJob.CANCELLED
+        else:
+            status = DownloadJob.FAILED
+        self._finish(job, status, message)
+
+    def _finish(self, job: DownloadJob, status: str, message: str) -> None:
+        """Фиксация результата задания и вызов обработчиков"""
+        job.status = status
+        job.message = message
+        self._notify(job)
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"Ошибка в обработчике загрузки {job.file_id}: {e}")
+
+    def _notify(self, job: DownloadJob) -> None:
+        """Передача прогресса в progress_callback"""
+        if self.progress_callback:
+            self.progress_callback(job, self.get_total_progress())
+
+    def get_total_progress(self) -> float:
+        """
+        Общий прогресс всех заданий, взвешенный по размеру файлов
+        :return: Прогресс в процентах
+        """
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j.status != DownloadJob.CANCELLED]
+        if not jobs:
+            return 0.0
+
+        # Задания без известного размера считаем файлами среднего размера
+        known = [j.size for j in jobs if j.size > 0]
+        default_weight = sum(known) / len(known) if known else 1
+        total_weight = 0.0
+        done_weight = 0.0
+        for job in jobs:
+            weight = job.size if job.size > 0 else default_weight
+            total_weight += weight
+            progress = 100.0 if job.finished else job.progress
+            done_weight += weight * progress / 100
+        return done_weight / total_weight * 100
+
+    def get_jobs(self) -> List[DownloadJob]:
+        """Список всех заданий в порядке добавления"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Отмена задания
+        :param job_id: Номер задания
+        :return: True если задание было активно и отменено
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        # Задание еще в очереди - снимаем его сразу
+        if job.future is not None and job.future.cancel():
+            self._finish(job, DownloadJob.CANCELLED, "Загрузка отменена")
+        return True
+
+    def cancel_all(self) -> None:
+        """Отмена всех незавершенных заданий"""
+        for job in self.get_jobs():
+            self.cancel(job.job_id)
+
+    def wait(self, jobs: List[DownloadJob] = None, timeout: float = None) -> bool:
+        """
+        Ожидание завершения заданий
+        :param jobs: Задания (по умолчанию все)
+        :param timeout: Максимальное время ожидания в секундах
+        :return: True если все задания завершены
+        """
+        if jobs is None:
+            jobs = self.get_jobs()
+        futures = [j.future for j in jobs if j.future is not None]
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def clear_finished(self) -> None:
+        """Удаление завершенных заданий из списка"""
+        with self._lock:
+            self._jobs = {k: j for k, j in self._jobs.items() if not j.finished}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Остановка менеджера
+        :param wait: Дождаться завершения активных загрузок
+        """
+        if not wait:
+            self.cancel_all()
+        self._executor.shutdown(wait=wait)
@@ -1,55 +1,81 @@
 import os
-import requests
+import threading
 from typing import Optional, Tuple
+from .hash_cache import HashCache
+from .http_client import HttpClient, get_http_client
+from .resumable_download import ResumableDownloader
 
 class DriveDownloader:
-    def __init__(self):
-        """Инициализация загрузчика файлов с Google Drive"""
+    def __init__(self, hash_cache: HashCache = None):
+        """
+        Инициализация загрузчика файлов с Google Drive
+        :param hash_cache: Кэш проверенных хэшей (по умолчанию общий файл в %APPDATA%/DMI)
+        """
         self.base_url = "https://drive.google.com/uc?export=download"
-    
-    def download_file(self, file_id: str, target_path: str, 
-                     progress_callback=None) -> Tuple[bool, str]:
+        self.hash_cache = hash_cache or HashCache()
+        self.http = get_http_client()
+        self.engine = ResumableDownloader(self.hash_cache)
+
+    def _resolve_url(self, http_client: HttpClient, file_id: str) -> str:
         """
-        Загрузка файла с Google Drive
+        Получение прямой ссылки на файл
+        Для больших файлов Google Drive требует подтверждение загрузки
+        :param http_client: HTTP клиент
         :param file_id: ID файла
-        :param target_path: Путь для сохранения
-        :param progress_callback: Функция для отображения прогресса
-        :return: (успех, сообщение)
+        :return: URL для загрузки
         """
+        url = f"{self.base_url}&id={file_id}"
+        response = http_client.get(url, stream=True)
         try:
-            # Создаем сессию для поддержки больших файлов
-            session = requests.Session()
-            
-            # Получаем параметры для загрузки
-            response = session.get(f"{self.base_url}&id={file_id}", 
-                                 stream=True)
             response.raise_for_status()
-            
+
             # Проверяем наличие страницы подтверждения для больших файлов
             for key, value in response.cookies.items():
                 if key.startswith('download_warning'):
-                    response = session.get(f"{self.base_url}&id={file_id}&confirm={value}", 
-                                        stream=True)
-                    break
-            
-            # Получаем размер файла
-            file_size = int(response.headers.get('content-length', 0))
-            
-            # Создаем папку если нужно
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
-            
-            # Загружаем файл с отображением прогресса
-            downloaded = 0
-            with open(target_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_callback:
-                            progress = (downloaded / file_size) * 100
-                            progress_callback(progress)
-            
-            return True, "Файл успешно загружен"
+                    return f"{url}&confirm={value}"
+            return url
+        finally:
+            # Тело здесь не нужно, его скачает движок докачки
+            response.close()
+
+    def download_file(self, file_id: str, target_path: str,
+                     progress_callback=None,
+                     cancel_event: Optional[threading.Event] = None,
+                     expected_size: int = None,
+                     expected_hash: str = None) -> Tuple[bool, str]:
+        """
+        Загрузка файла с Google Drive
+        Прерванная загрузка сохраняется в <target_path>.part и при следующем
+        вызове продолжается с места обрыва
+        :param file_id: ID файла
+        :param target_path: Путь для сохранения
+        :param progress_callback: Функция для отображения прогресса
+        :param cancel_event: Событие отмены, проверяется между чанками
+        :param expected_size: Размер файла из каталога (file.size)
+        :param expected_hash: SHA-256 файла из каталога (file.hash)
+        :return: (успех, сообщение)
+        """
+        try:
+            # Файл уже скачан и проверен - повторно не качаем
+            if (expected_hash and os.path.exists(target_path) and
+                    self.hash_cache.get(target_path) == expected_hash.lower()):
+                if progress_callback:
+                    progress_callback(100.0)
+                return True, "Файл уже загружен"
             
+            url = self._resolve_url(self.http, file_id)
+
+            # Ссылка подтверждения меняется, поэтому докачку привязываем к ID файла
+            return self.engine.download(
+                url,
+                target_path,
+                progress_callback,
+                cancel_event,
+                self.http,
+                resume_key=f"drive:{file_id}",
+                expected_size=expected_size,
+                expected_hash=expected_hash
+            )
+
         except Exception as e:
             return False, f"Ошибка при загрузке: {str(e)}"
@@ -0,0 +1,125 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .mod_record import ModRecord
+
+# Год и месяц в начале даты (в каталоге встречаются даты с перепутанными днем и месяцем)
+_MONTH_RE = re.compile(r'\d{4}-(0[1-9]|1[0-2])')
+
+# Число единичных бит; int.bit_count есть только с Python 3.10
+_popcount = getattr(int, 'bit_count', None) or (lambda bits: bin(bits).count('1'))
+
+class FacetIndex:
+    # Фасеты каталога: категория, подкатегория (поле type), герой, автор, месяц обновления
+    FACETS = ('category', 'subcategory', 'hero', 'author', 'month')
+
+    def __init__(self):
+        """
+        Индекс фасетов каталога
+        Для каждого значения фасета хранится битовая маска позиций модов
+        (int, бит N - мод с позицией N в каталоге). Фильтр по нескольким
+        фасетам - побитовое И масок, количество - число единичных бит
+        """
+        self.size = 0
+        # Маска всех модов каталога
+        self.all_bits = 0
+        # Фасет -> значение -> маска позиций
+        self._bits: Dict[str, Dict[str, int]] = {facet: {} for facet in self.FACETS}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @staticmethod
+    def _facet_values(mod: ModRecord) -> Tuple[Optional[str], ...]:
+        """Значения фасетов мода в порядке FACETS (None - у мода нет значения)"""
+        match = _MONTH_RE.match(mod.last_updated)
+        month = match.group(0) if match else None
+        return mod.category or None, mod.type, mod.hero, mod.author or None, month
+
+    def build(self, mods: Iterable[ModRecord]) -> None:
+        """
+        Построение индекса
+        :param mods: Записи модов в порядке каталога (позиции совпадают с поисковым индексом)
+        """
+        positions: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in self.FACETS}
+        size = 0
+        for position, mod in enumerate(mods):
+            size += 1
+            for facet, value in zip(self.FACETS, self._facet_values(mod)):
+                if value is not None:
+                    positions[facet].setdefault(value, []).append(position)
+
+        self.size = size
+        self.all_bits = (1 << size) - 1
+        self._bits = {
+            facet: {value: self.positions_to_bits(value_positions)
+                    for value, value_positions in values.items()}
+            for facet, values in positions.items()
+        }
+
+    @staticmethod
+    def positions_to_bits(positions: Iterable[int]) -> int:
+        """
+        Маска из позиций
+        Биты выставляются в bytearray и переводятся в int одним вызовом,
+        а не сдвигами по одному биту
+        """
+        positions = list(positions)
+        if not positions:
+            return 0
+        buffer = bytearray(max(positions) // 8 + 1)
+        for position in positions:
+            buffer[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(buffer, 'little')
+
+    @staticmethod
+    def bits_to_positions(bits: int) -> Set[int]:
+        """Позиции единичных бит маски"""
+        positions = set()
+        for byte_index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+            if byte:
+                base = byte_index << 3
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        positions.add(base + bit)
+        return positions
+
+    def get_values(self, facet: str) -> List[str]:
+        """Значения фасета, отсортированные по имени"""
+        return sorted(self._bits[facet])
+
+    def get_bits(self, facet: str, value: str) -> int:
+        """Маска модов со значением фасета"""
+        return self._bits[facet].get(value, 0)
+
+    def filter_bits(self, filters: Dict[str, Optional[str]], base: int = None,
+                    skip: str = None) -> int:
+        """
+        Маска модов, подходящих под все фильтры
+        :param filters: Фасет -> выбранное значение (None - без фильтра)
+        :param base: Исходная маска (например, результаты поиска); None - весь каталог
+        :param skip: Фасет, фильтр которого не учитывается
+        :return: Маска позиций
+        """
+        bits = self.all_bits if base is None else base
+        for facet, value in filters.items():
+            if value is not None and facet != skip:
+                bits &= self.get_bits(facet, value)
+        return bits
+
+    def query(self, filters: Dict[str, Optional[str]], base: int = None
+              ) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """
+        Фильтрация и количество модов для каждого значения каждого фасета
+        Количество для значения фасета считается с учетом остальных фильтров,
+        но без фильтра самого этого фасета - сколько модов будет видно,
+        если выбрать это значение
+        :param filters: Фасет -> выбранное значение (None - без фильтра)
+        :param base: Исходная маска (например, результаты поиска); None - весь каталог
+        :return: (маска подходящих модов, фасет -> значение -> количество)
+        """
+        counts = {}
+        for facet in self.FACETS:
+            others = self.filter_bits(filters, base, skip=facet)
+            counts[facet] = {value: _popcount(bits & others)
+                             for value, bits in self._bits[facet].items()}
+        return self.filter_bits(filters, base), counts
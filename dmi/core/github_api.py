@@ -1,9 +1,15 @@
 import os
 import json
-import requests
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+from .catalog_delta import apply_delta
+from .catalog_diff import CatalogDiff
+from .config import get_app_data_dir
+from .http_client import get_http_client
 
 class GitHubAPI:
+    # Если версий до актуальной больше, быстрее скачать каталог целиком
+    MAX_DELTAS = 20
+
     def __init__(self):
         """Инициализация GitHub API клиента"""
         self.api_url = "https://api.github.com"
@@ -11,66 +17,203 @@ class GitHubAPI:
         self.repo_owner = "DeadlockMods"  # Владелец репозитория
         self.repo_name = "mods"  # Название репозитория
         self.branch = "main"  # Основная ветка
-        
+        self.http = get_http_client()
+
+        self.local_path = os.path.join("data", "mods.json")
+        # ETag и Last-Modified установленного каталога
+        self.state_path = os.path.join(get_app_data_dir(), "catalog_state.json")
+        # Каталог, полученный при проверке, и его заголовки - применяется без повторной загрузки
+        self._pending: Optional[Dict] = None
+        self._pending_headers: Dict[str, Optional[str]] = {}
+        # Разница с локальным каталогом по последней проверке
+        self.last_diff: Optional[CatalogDiff] = None
+
+    @property
+    def deltas_url(self) -> str:
+        """Адрес папки с дельтами каталога"""
+        return f"{self.raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}/data/deltas"
+
+    @property
+    def catalog_url(self) -> str:
+        """Адрес mods.json в репозитории"""
+        return f"{self.raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}/data/mods.json"
+
+    def _load_state(self) -> Dict[str, Optional[str]]:
+        """Заголовки установленного каталога (пусто, если каталог не совпадает с сохраненным)"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Заголовки относятся к конкретному адресу и к конкретному файлу на диске
+        try:
+            st = os.stat(self.local_path)
+        except OSError:
+            return {}
+        if state.get('url') != self.catalog_url or state.get('mtime_ns') != st.st_mtime_ns:
+            return {}
+        return state
+
+    def _save_state(self, headers: Dict[str, Optional[str]]) -> None:
+        """Сохранение заголовков только что записанного каталога"""
+        state = {
+            'url': self.catalog_url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last_modified'),
+            'mtime_ns': os.stat(self.local_path).st_mtime_ns
+        }
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def _load_local(self) -> Optional[Dict]:
+        """Локальный каталог или None, если его нет или он поврежден"""
+        try:
+            with open(self.local_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _fetch_catalog(self, local_mods: Optional[Dict]) -> Optional[Dict]:
+        """
+        Получение нового каталога: цепочкой дельт, а если это невозможно - целиком
+        Полученный каталог запоминается для update_mods_json()
+        :param local_mods: Локальный каталог
+        :return: Новый каталог или None, если на сервере он не изменился
+        """
+        handled, remote_mods = self._fetch_deltas(local_mods)
+        if handled:
+            return remote_mods
+        return self._fetch_snapshot()
+
+    def _fetch_deltas(self, local_mods: Optional[Dict]) -> Tuple[bool, Optional[Dict]]:
+        """
+        Обновление локального каталога по дельтам (см. catalog_delta)
+        :param local_mods: Локальный каталог
+        :return: (получилось_без_полного_каталога, новый каталог или None если версия актуальна)
+        """
+        if local_mods is None or 'sequence' not in local_mods:
+            return False, None
+        sequence = local_mods['sequence']
+
+        try:
+            response = self.http.get(f"{self.deltas_url}/index.json")
+            if response.status_code == 404:
+                # Репозиторий не публикует дельты
+                return False, None
+            response.raise_for_status()
+            index = response.json()
+
+            if index['sequence'] == sequence:
+                self._pending = None
+                return True, None
+            # Клиент слишком отстал (или каталог на сервере пересоздан) - нужен полный каталог
+            if (sequence < index.get('oldest', index['sequence'])
+                    or sequence > index['sequence']
+                    or index['sequence'] - sequence > self.MAX_DELTAS):
+                return False, None
+
+            catalog = local_mods
+            for next_sequence in range(sequence + 1, index['sequence'] + 1):
+                response = self.http.get(f"{self.deltas_url}/{next_sequence}.json")
+                response.raise_for_status()
+                catalog = apply_delta(catalog, response.json())
+
+        except Exception as e:
+            print(f"Не удалось обновить каталог по дельтам: {e}")
+            return False, None
+
+        self._pending = catalog
+        # ETag полного каталога неизвестен; он понадобится только при откате на полный каталог
+        self._pending_headers = {}
+        return True, catalog
+
+    def _fetch_snapshot(self) -> Optional[Dict]:
+        """
+        Условная загрузка полного каталога по сохраненному ETag
+        :return: Новый каталог или None, если на сервере он не изменился (304)
+        """
+        headers = {}
+        state = self._load_state()
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+        response = self.http.get(self.catalog_url, headers=headers)
+        if response.status_code == 304:
+            self._pending = None
+            return None
+        response.raise_for_status()
+
+        self._pending = response.json()
+        self._pending_headers = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        return self._pending
+
+    def _apply_pending(self) -> None:
+        """Запись полученного каталога на диск (атомарно) вместе с его заголовками"""
+        os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+        temp_path = self.local_path + '.tmp'
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._pending, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.local_path)
+        self._save_state(self._pending_headers)
+        self._pending = None
+
     def check_for_updates(self) -> Tuple[bool, str]:
         """
         Проверка наличия обновлений mods.json
+        Каталог обновляется по дельтам или загружается условным запросом целиком;
+        если он изменился, считается
+        разница с локальным (last_diff), а сам ответ сохраняется для update_mods_json()
         :return: (есть_обновления, сообщение)
         """
         try:
-            # Получаем содержимое удаленного mods.json
-            url = f"{self.raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}/data/mods.json"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            remote_mods = response.json()
-            
+            self.last_diff = None
             # Проверяем локальную версию
-            local_path = os.path.join("data", "mods.json")
-            if not os.path.exists(local_path):
+            local_mods = self._load_local()
+            remote_mods = self._fetch_catalog(local_mods)
+            if remote_mods is None:
+                return False, "Обновления не требуются"
+
+            if local_mods is None:
                 return True, "Локальный файл mods.json не найден"
-            
-            with open(local_path, 'r', encoding='utf-8') as f:
-                local_mods = json.load(f)
-            
-            # Сравниваем версии модов
-            has_updates = False
-            for mod_id, remote_mod in remote_mods['mods'].items():
-                if mod_id not in local_mods['mods']:
-                    has_updates = True
-                    break
-                if remote_mod.get('version') != local_mods['mods'][mod_id].get('version'):
-                    has_updates = True
-                    break
-            
-            if has_updates:
-                return True, "Доступны обновления модов"
-            return False, "Обновления не требуются"
-            
+
+            self.last_diff = CatalogDiff(local_mods.get('mods', {}), remote_mods.get('mods', {}))
+            if not self.last_diff.has_changes():
+                # Содержимое то же - запоминаем только ETag, чтобы дальше получать 304.
+                # Проверка идет в фоновом потоке, mods.json пишет только update_mods_json()
+                if self._pending_headers.get('etag') or self._pending_headers.get('last_modified'):
+                    self._save_state(self._pending_headers)
+                self._pending = None
+                return False, "Обновления не требуются"
+
+            return True, f"Доступны обновления модов. {self.last_diff.get_summary()}"
+
         except Exception as e:
             return False, f"Ошибка при проверке обновлений: {str(e)}"
-    
+
     def update_mods_json(self) -> Tuple[bool, str]:
         """
         Загрузка актуальной версии mods.json
+        Если каталог уже получен в check_for_updates(), повторной загрузки нет
         :return: (успех, сообщение)
         """
         try:
-            # Скачиваем mods.json
-            url = f"{self.raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}/data/mods.json"
-            response = requests.get(url)
-            response.raise_for_status()
-            
+            if self._pending is None and self._fetch_catalog(self._load_local()) is None:
+                return True, "Список модов уже актуален"
+
             # Сохраняем файл
-            os.makedirs("data", exist_ok=True)
-            with open(os.path.join("data", "mods.json"), "w", encoding="utf-8") as f:
-                json.dump(response.json(), f, indent=2, ensure_ascii=False)
-            
+            self._apply_pending()
             return True, "Список модов успешно обновлен"
-            
+
         except Exception as e:
             return False, f"Ошибка при обновлении: {str(e)}"
-    
+
     def download_mod(self, mod_path: str, target_path: str) -> Tuple[bool, str]:
         """
         Скачивание файла мода
@@ -81,7 +224,7 @@ class GitHubAPI:
         try:
             # Скачиваем файл мода
             url = f"{self.raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}/{mod_path}"
-            response = requests.get(url)
+            response = self.http.get(url)
             response.raise_for_status()
             
             # Создаем папку если нужно
@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Optional
+from .config import get_app_data_dir
+
+# Блокировки по файлу кэша: экземпляры над одним файлом сохраняют его по очереди
+_file_locks: Dict[str, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+
+def _get_file_lock(path: str) -> threading.Lock:
+    key = os.path.normcase(os.path.abspath(path))
+    with _file_locks_guard:
+        return _file_locks.setdefault(key, threading.Lock())
+
+class HashCache:
+    # Размер блока при чтении файла для подсчета хэша
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_path: str = None):
+        """
+        Кэш проверенных SHA-256 хэшей файлов
+        Запись действительна пока у файла не изменились размер, mtime и inode,
+        поэтому повторная проверка целого файла сводится к одному stat
+        :param cache_path: Путь к файлу кэша. По умолчанию %APPDATA%/DMI/hash_cache.json
+        """
+        if cache_path is None:
+            cache_path = os.path.join(get_app_data_dir(), 'hash_cache.json')
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._file_lock = _get_file_lock(cache_path)
+        self._entries = self._load()
+        # Изменения этого экземпляра, еще не сохраненные на диск:
+        # при сохранении они накладываются на то, что записали другие
+        self._changed: Dict[str, Dict] = {}
+        self._removed = set()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """Нормализованный путь для ключа кэша"""
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Dict:
+        """Признаки, по которым определяется, что файл не менялся"""
+        return {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'inode': st.st_ino
+        }
+
+    def _load(self) -> Dict[str, Dict]:
+        """Загрузка кэша с диска"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        """
+        Атомарное сохранение кэша
+        Файл может вести несколько экземпляров (загрузчик, проверка, поиск модов)
+        и другие процессы, поэтому изменения накладываются на текущее содержимое
+        файла, а временный файл у каждой записи свой
+        """
+        with self._file_lock:
+            entries = self._load()
+            entries.update(self._changed)
+            for key in self._removed:
+                entries.pop(key, None)
+
+            directory = os.path.dirname(self.cache_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix='hash_cache.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.cache_path)
+            except OSError:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+        self._entries = entries
+        self._changed.clear()
+        self._removed.clear()
+
+    def get(self, path: str, st: os.stat_result = None) -> Optional[str]:
+        """
+        Получение проверенного хэша файла
+        :param path: Путь к файлу
+        :param st: Результат os.stat, если уже получен
+        :return: SHA-256 или None если файл не проверялся или изменился
+        """
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        if entry is None:
+            return None
+        signature = self._signature(st)
+        if any(entry.get(k) != v for k, v in signature.items()):
+            return None
+        return entry['sha256']
+
+    def put(self, path: str, sha256: str, st: os.stat_result = None, save: bool = True) -> None:
+        """
+        Запись проверенного хэша файла
+        :param path: Путь к файлу
+        :param sha256: Хэш содержимого
+        :param st: Результат os.stat, если уже получен
+        :param save: Сразу сохранить кэш на диск. При записи многих файлов
+                     передайте False и вызовите flush() в конце
+        """
+        st = st or os.stat(path)
+        entry = self._signature(st)
+        entry['sha256'] = sha256
+        key = self._key(path)
+        with self._lock:
+            self._entries[key] = entry
+            self._changed[key] = entry
+            self._removed.discard(key)
+            if save:
+                self._save()
+
+    def flush(self) -> None:
+        """Сохранение записей, добавленных с save=False, и удалений remove()"""
+        with self._lock:
+            if self._changed or self._removed:
+                self._save()
+
+    def remove(self, path: str) -> None:
+        """
+        Удаление записи о файле
+        На диск попадает при flush() (или при следующем put с save=True)
+        :param path: Путь к файлу
+        """
+        key = self._key(path)
+        with self._lock:
+            self._changed.pop(key, None)
+            if self._entries.pop(key, None) is not None:
+                self._removed.add(key)
+
+    def get_or_compute(self, path: str) -> str:
+        """
+        Хэш файла из кэша или подсчет с записью в кэш
+        :param path: Путь к файлу
+        :return: SHA-256
+        """
+        st = os.stat(path)
+        sha256 = self.get(path, st)
+        if sha256 is None:
+            sha256 = file_sha256(path)
+            self.put(path, sha256, st)
+        return sha256
+
+
+def file_sha256(path: str, block_size: int = HashCache.BLOCK_SIZE) -> str:
+    """
+    Подсчет SHA-256 файла
+    :param path: Путь к файлу
+    :param block_size: Размер блока чтения
+    :return: Хэш в hex
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
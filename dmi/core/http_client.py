@@ -0,0 +1,195 @@
+import time
+import weakref
+import threading
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    # requests импортируется при первом запросе - это заметная часть времени запуска
+    import requests
+
+class RequestTiming:
+    """Замер одного HTTP запроса для хуков"""
+
+    def __init__(self, method: str, url: str, host: str):
+        self.method = method
+        self.url = url
+        self.host = host
+        self.status: Optional[int] = None
+        # Время ожидания свободного слота хоста и до получения заголовков ответа (сек)
+        self.wait_time = 0.0
+        self.elapsed = 0.0
+        self.error: Optional[str] = None
+
+
+class HttpClient:
+    # (таймаут соединения, таймаут чтения) в секундах
+    DEFAULT_TIMEOUT = (10, 30)
+    # Коды ответа, на которые запрос повторяется
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries: int = 3, backoff_factor: float = 0.5,
+                 max_per_host: int = 4, pool_size: int = 10):
+        """
+        Общий HTTP клиент программы
+        Одна сессия с пулом keep-alive соединений на каждый хост, таймауты
+        по умолчанию, повторы с экспоненциальной задержкой при 5xx и обрывах
+        соединения, ограничение числа одновременных запросов к одному хосту
+        и хуки с замерами времени запросов
+        :param timeout: Таймаут по умолчанию (соединение, чтение)
+        :param retries: Сколько раз повторять запрос
+        :param backoff_factor: Базовая задержка между повторами (0.5, 1, 2, ... сек)
+        :param max_per_host: Максимум одновременных запросов к одному хосту
+        :param pool_size: Размер пула соединений на хост
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_per_host = max_per_host
+        self.pool_size = pool_size
+        self._session = None
+
+        self._hooks: List[Callable[[RequestTiming], None]] = []
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        """Сессия requests; создается (и requests импортируется) при первом обращении"""
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self) -> 'requests.Session':
+        """Сессия с пулом соединений и повторами запросов"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                              max_retries=retry)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def add_timing_hook(self, hook: Callable[[RequestTiming], None]) -> None:
+        """
+        Добавление хука, который получает замер каждого запроса
+        :param hook: Функция (RequestTiming), вызывается из потока запроса
+        """
+        self._hooks.append(hook)
+
+    def remove_timing_hook(self, hook: Callable[[RequestTiming], None]) -> None:
+        """Удаление хука замеров"""
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _get_host_slots(self, host: str) -> threading.BoundedSemaphore:
+        """Семафор одновременных запросов к хосту"""
+        with self._lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slots
+
+    def request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        """
+        Выполнение запроса
+        Для stream=True слот хоста занят, пока ответ не закрыт
+        (response.close() или with), поэтому потоковые ответы нужно закрывать
+        :param method: HTTP метод
+        :param url: Адрес
+        :param kwargs: Параметры requests (headers, stream, timeout, ...)
+        :return: Ответ
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        timing = RequestTiming(method, url, host)
+
+        slots = self._get_host_slots(host)
+        start = time.perf_counter()
+        slots.acquire()
+        timing.wait_time = time.perf_counter() - start
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                slots.release()
+
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            release()
+            timing.error = str(e)
+            timing.elapsed = time.perf_counter() - start
+            self._notify(timing)
+            raise
+
+        timing.status = response.status_code
+        timing.elapsed = time.perf_counter() - start
+        self._notify(timing)
+
+        if not kwargs.get('stream'):
+            # Тело уже прочитано, соединение вернулось в пул
+            release()
+            return response
+
+        # Потоковый ответ держит слот до закрытия
+        original_close = response.close
+
+        def close():
+            try:
+                original_close()
+            finally:
+                release()
+
+        response.close = close
+        # Страховка: если ответ забыли закрыть, слот освободится при сборке мусора
+        weakref.finalize(response, release)
+        return response
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        """GET запрос, см. request()"""
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> 'requests.Response':
+        """HEAD запрос, см. request()"""
+        return self.request('HEAD', url, **kwargs)
+
+    def _notify(self, timing: RequestTiming) -> None:
+        """Передача замера в хуки"""
+        for hook in list(self._hooks):
+            try:
+                hook(timing)
+            except Exception as e:
+                print(f"Ошибка в хуке замера запросов: {e}")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """
+    Общий экземпляр HTTP клиента
+    :return: HttpClient, создается при первом обращении
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
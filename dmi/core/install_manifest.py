@@ -0,0 +1,198 @@
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Optional
+from .config import get_app_data_dir
+
+PAK_PATTERN = re.compile(r'pak(\d+)_dir\.vpk')
+
+class InstallManifest:
+    def __init__(self, manifest_path: str = None):
+        """
+        Манифест установленных модов: pak слот -> мод
+        Хранится в JSON и перезаписывается атомарно. Вопрос «установлен ли мод»
+        решается поиском в словаре, папка аддонов сканируется только в reconcile()
+        :param manifest_path: Путь к файлу. По умолчанию %APPDATA%/DMI/install_manifest.json
+        """
+        if manifest_path is None:
+            manifest_path = os.path.join(get_app_data_dir(), 'install_manifest.json')
+        self.manifest_path = manifest_path
+        self._lock = threading.RLock()
+        self.addons_path = ""
+        # {имя pak файла: {mod_id, version, hash, size, mtime_ns, [merged]}}
+        # merged - моды, объединенные в этот pak: [{mod_id, version}]
+        self._slots: Dict[str, Dict] = {}
+        # {mod_id: имя pak файла}
+        self._by_mod: Dict[str, str] = {}
+        # pak файлы в папке аддонов, о которых манифест ничего не знает
+        self.untracked: List[str] = []
+        self._load()
+
+    def _load(self) -> None:
+        """Загрузка манифеста с диска"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.addons_path = data.get('addons_path', "")
+        self._slots = data.get('slots', {})
+        self._rebuild_index()
+
+    @staticmethod
+    def _get_mod_ids(entry: Dict) -> List[str]:
+        """ID модов, которые содержит pak файл (несколько у объединенного)"""
+        mod_ids = [mod['mod_id'] for mod in entry.get('merged', ())]
+        if entry.get('mod_id'):
+            mod_ids.append(entry['mod_id'])
+        return mod_ids
+
+    def _rebuild_index(self) -> None:
+        """Пересборка обратного индекса mod_id -> слот"""
+        self._by_mod = {
+            mod_id: slot
+            for slot, entry in self._slots.items()
+            for mod_id in self._get_mod_ids(entry)
+        }
+
+    def save(self) -> None:
+        """Атомарное сохранение манифеста"""
+        with self._lock:
+            data = {'addons_path': self.addons_path, 'slots': self._slots}
+            temp_path = self.manifest_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+
+    def reconcile(self, addons_path: str) -> List[str]:
+        """
+        Сверка манифеста с папкой аддонов (один listdir и stat на pak файл)
+        Записи об удаленных или замененных файлах выбрасываются
+        :param addons_path: Путь к папке аддонов
+        :return: Список pak файлов, которых нет в манифесте
+        """
+        with self._lock:
+            if os.path.normcase(addons_path) != os.path.normcase(self.addons_path):
+                # Папка игры сменилась - старые записи к ней не относятся
+                self.addons_path = addons_path
+                self._slots = {}
+                changed = True
+            else:
+                changed = False
+
+            present = {}
+            if os.path.isdir(addons_path):
+                with os.scandir(addons_path) as it:
+                    for entry in it:
+                        if PAK_PATTERN.fullmatch(entry.name) and entry.is_file():
+                            present[entry.name] = entry.stat()
+
+            for slot, entry in list(self._slots.items()):
+                st = present.get(slot)
+                if st is None or st.st_size != entry.get('size') or st.st_mtime_ns != entry.get('mtime_ns'):
+                    del self._slots[slot]
+                    changed = True
+
+            self.untracked = sorted(name for name in present if name not in self._slots)
+            if changed:
+                self._rebuild_index()
+                self.save()
+            return list(self.untracked)
+
+    def record(self, slot: str, path: str, mod_id: str = None, version: str = None,
+               sha256: str = None) -> None:
+        """
+        Запись об установленном pak файле
+        :param slot: Имя pak файла (например, 'pak03_dir.vpk')
+        :param path: Полный путь к файлу (для размера и mtime)
+        :param mod_id: ID мода в каталоге (None для модов из локального файла)
+        :param version: Версия мода
+        :param sha256: Хэш содержимого
+        """
+        self.apply_batch([{'slot': slot, 'path': path, 'mod_id': mod_id,
+                           'version': version, 'sha256': sha256}], [])
+
+    def remove(self, slot: str) -> None:
+        """Удаление записи о pak файле"""
+        self.apply_batch([], [slot])
+
+    def apply_batch(self, records: List[Dict], removed: List[str],
+                    moved: Dict[str, str] = None) -> None:
+        """
+        Несколько изменений с одним сохранением манифеста
+        :param records: Записи о новых pak файлах: {'slot', 'path', 'mod_id', 'version', 'sha256'}
+                        и 'merged' для объединенного pak файла
+        :param removed: Имена удаленных pak файлов
+        :param moved: Старое имя pak файла -> новое (переименование сохраняет размер и mtime)
+        """
+        stats = [os.stat(record['path']) for record in records]
+        with self._lock:
+            changed = False
+            for slot in removed:
+                entry = self._slots.pop(slot, None)
+                if entry is not None:
+                    changed = True
+                    for mod_id in self._get_mod_ids(entry):
+                        self._by_mod.pop(mod_id, None)
+
+            if moved:
+                # Сначала снимаем все записи: новые имена могут совпадать со старыми
+                entries = {slot: self._slots.pop(slot, None) for slot in moved}
+                for slot, target in moved.items():
+                    if entries[slot] is not None:
+                        self._slots[target] = entries[slot]
+                untracked = set(self.untracked)
+                self.untracked = sorted((untracked - set(moved))
+                                        | {moved[slot] for slot in untracked & set(moved)})
+                self._rebuild_index()
+                changed = True
+
+            for record, st in zip(records, stats):
+                slot = record['slot']
+                old = self._slots.get(slot)
+                if old:
+                    for mod_id in self._get_mod_ids(old):
+                        self._by_mod.pop(mod_id, None)
+                entry = {
+                    'mod_id': record.get('mod_id'),
+                    'version': record.get('version'),
+                    'hash': record.get('sha256'),
+                    'size': st.st_size,
+                    'mtime_ns': st.st_mtime_ns
+                }
+                if record.get('merged'):
+                    entry['merged'] = record['merged']
+                self._slots[slot] = entry
+                for mod_id in self._get_mod_ids(entry):
+                    self._by_mod[mod_id] = slot
+                if slot in self.untracked:
+                    self.untracked.remove(slot)
+                changed = True
+
+            if changed:
+                self.save()
+
+    def get_slot(self, mod_id: str) -> Optional[str]:
+        """
+        Pak файл, под которым установлен мод
+        :param mod_id: ID мода
+        :return: Имя pak файла или None
+        """
+        with self._lock:
+            return self._by_mod.get(mod_id)
+
+    def is_installed(self, mod_id: str) -> bool:
+        """Установлен ли мод"""
+        return self.get_slot(mod_id) is not None
+
+    def get_entry(self, slot: str) -> Optional[Dict]:
+        """Запись о pak файле"""
+        with self._lock:
+            entry = self._slots.get(slot)
+            return dict(entry) if entry else None
+
+    def get_slots(self) -> Dict[str, Dict]:
+        """Копия всех записей {pak файл: запись}"""
+        with self._lock:
+            return {slot: dict(entry) for slot, entry in self._slots.items()}
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+from typing import Callable, Dict, IO, List, Optional
+from .config import get_app_data_dir
+
+def _lock_file(f: IO, blocking: bool) -> bool:
+    """
+    Исключительная блокировка открытого файла (между процессами и между
+    разными открытиями файла в одном процессе)
+    :param f: Открытый файл
+    :param blocking: Ждать, пока блокировку снимут
+    :return: True если блокировка получена
+    """
+    if os.name == 'nt':
+        import msvcrt
+        while True:
+            try:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.1)
+    import fcntl
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+def _unlock_file(f: IO) -> None:
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+class InstallTransaction:
+    # Состояния журнала
+    STAGING = 'staging'
+    COMMITTING = 'committing'
+    COMMITTED = 'committed'
+
+    def __init__(self, addons_path: str, journal_path: str = None):
+        """
+        Транзакция над папкой аддонов: несколько установок, удалений и
+        переименований pak файлов, которые применяются все вместе или не применяются совсем
+        Новые и переименовываемые файлы сначала получают временные имена в той
+        же папке, удаляемые переименовываются в резервные имена; при фиксации
+        временные файлы занимают свои слоты через os.replace. Поэтому циклы
+        переименований (pak01 <-> pak02) не требуют особой обработки.
+        Вместо имени pak файла можно передать абсолютный путь на том же диске
+        (например, в папку отложенных модов) - файл переносится туда и обратно
+        тем же переименованием. Перед каждым шагом намерение
+        записывается в журнал, поэтому после сбоя recover() может откатить
+        незафиксированную транзакцию или довести зафиксированную до конца.
+        Журнал один на всех: транзакция используется через with, на это время
+        файл блокировки журнала занят, и recover() в другом установщике или
+        процессе не трогает журнал идущей транзакции
+        :param addons_path: Папка аддонов
+        :param journal_path: Файл журнала. По умолчанию %APPDATA%/DMI/install_journal.json
+        """
+        if journal_path is None:
+            journal_path = self.get_default_journal_path()
+        self.addons_path = addons_path
+        self.journal_path = journal_path
+        self.state = self.STAGING
+        # Операции: {'op': 'add'|'remove'|'move', 'slot', 'temp'|'backup', 'target', ...данные для манифеста}
+        self.ops: List[Dict] = []
+        self._lock_file: Optional[IO] = None
+
+    @staticmethod
+    def _open_lock(journal_path: str) -> IO:
+        """Открытие файла блокировки журнала"""
+        f = open(journal_path + '.lock', 'a+b')
+        if os.name == 'nt' and os.path.getsize(f.name) == 0:
+            # msvcrt блокирует байты файла, поэтому хотя бы один должен быть
+            f.write(b'\0')
+            f.flush()
+        return f
+
+    def __enter__(self) -> 'InstallTransaction':
+        """Захват журнала (ждет, пока закончится транзакция в другом установщике)"""
+        self._lock_file = self._open_lock(self.journal_path)
+        _lock_file(self._lock_file, blocking=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._lock_file is not None:
+            _unlock_file(self._lock_file)
+            self._lock_file.close()
+            self._lock_file = None
+
+    @staticmethod
+    def get_default_journal_path() -> str:
+        """Путь к журналу по умолчанию"""
+        return os.path.join(get_app_data_dir(), 'install_journal.json')
+
+    @staticmethod
+    def get_temp_name(slot: str) -> str:
+        """Временное имя для нового pak файла (игра его не загрузит)"""
+        return f".dmi-{os.path.basename(slot)}.tmp"
+
+    @staticmethod
+    def get_backup_name(slot: str) -> str:
+        """Резервное имя удаляемого pak файла до фиксации"""
+        return f".dmi-{os.path.basename(slot)}.del"
+
+    def _path(self, name: str) -> str:
+        # Абсолютный путь os.path.join возвращает как есть
+        return os.path.join(self.addons_path, name)
+
+    @staticmethod
+    def _destination(op: Dict) -> str:
+        """Имя, которое временный файл операции получает при фиксации"""
+        return op.get('target', op['slot'])
+
+    def _write_journal(self) -> None:
+        """Атомарная запись журнала"""
+        data = {'addons_path': self.addons_path, 'state': self.state, 'ops': self.ops}
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+
+    def _delete_journal(self) -> None:
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+
+    def add(self, slot: str, place: Callable[[str], None], **info) -> None:
+        """
+        Подготовка нового pak файла
+        :param slot: Имя pak файла, которое он получит при фиксации
+        :param place: Функция, создающая файл по переданному временному пути
+        :param info: Данные для манифеста (mod_id, version, sha256)
+        """
+        temp_name = self.get_temp_name(slot)
+        self.ops.append(dict(info, op='add', slot=slot, temp=temp_name))
+        self._write_journal()
+        place(self._path(temp_name))
+
+    def remove(self, slot: str) -> None:
+        """
+        Подготовка удаления pak файла: файл переименовывается в резервное имя
+        :param slot: Имя pak файла
+        """
+        backup_name = self.get_backup_name(slot)
+        self.ops.append({'op': 'remove', 'slot': slot, 'backup': backup_name})
+        self._write_journal()
+        os.replace(self._path(slot), self._path(backup_name))
+
+    def move(self, slot: str, target: str, **info) -> None:
+        """
+        Подготовка переименования pak файла: файл получает временное имя
+        :param slot: Текущее имя pak файла или абсолютный путь
+        :param target: Имя (или абсолютный путь), которое он получит при фиксации
+        :param info: Данные для манифеста, если файл переносится в папку аддонов
+        """
+        temp_name = self.get_temp_name(target)
+        self.ops.append(dict(info, op='move', slot=slot, target=target, temp=temp_name))
+        self._write_journal()
+        os.replace(self._path(slot), self._path(temp_name))
+
+    def commit(self) -> None:
+        """
+        Фиксация: временные файлы занимают свои слоты
+        После успешного вызова транзакция считается выполненной, даже если
+        программа упадет до finish() - recover() доведет её до конца
+        """
+        self.state = self.COMMITTING
+        self._write_journal()
+        for op in self.ops:
+            if op['op'] != 'remove':
+                os.replace(self._path(op['temp']), self._path(self._destination(op)))
+        self.state = self.COMMITTED
+        self._write_journal()
+
+    def finish(self) -> None:
+        """Удаление резервных копий удаленных файлов и журнала"""
+        for op in self.ops:
+            if op['op'] == 'remove':
+                self._discard(op['backup'])
+        self._delete_journal()
+
+    def rollback(self) -> None:
+        """
+        Откат: созданные файлы удаляются, удаленные и переименованные
+        возвращаются на место. Пропущенные шаги (файлы, которых нет) не считаются ошибкой
+        """
+        if self.state == self.COMMITTING:
+            # Фиксация прервана: к её началу все временные файлы были созданы,
+            # значит файлы без временного имени уже заняли свои слоты
+            for op in self.ops:
+                if op['op'] != 'remove' and not os.path.exists(self._path(op['temp'])):
+                    destination = self._path(self._destination(op))
+                    if os.path.exists(destination):
+                        os.replace(destination, self._path(op['temp']))
+
+        for op in reversed(self.ops):
+            if op['op'] == 'add':
+                self._discard(op['temp'])
+            elif op['op'] == 'move':
+                temp_path = self._path(op['temp'])
+                if os.path.exists(temp_path):
+                    os.replace(temp_path, self._path(op['slot']))
+            else:
+                backup_path = self._path(op['backup'])
+                if os.path.exists(backup_path):
+                    os.replace(backup_path, self._path(op['slot']))
+        self.state = self.STAGING
+        self._delete_journal()
+
+    def _discard(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def recover(cls, journal_path: str = None) -> Optional['InstallTransaction']:
+        """
+        Восстановление после сбоя посреди транзакции
+        Незафиксированная транзакция откатывается, зафиксированная завершается
+        :param journal_path: Файл журнала
+        :return: Завершенная транзакция (чтобы обновить по ней манифест)
+                 или None, если журнала нет или транзакция откачена
+        """
+        if journal_path is None:
+            journal_path = cls.get_default_journal_path()
+        if not os.path.exists(journal_path):
+            return None
+
+        lock = cls._open_lock(journal_path)
+        try:
+            if not _lock_file(lock, blocking=False):
+                # Журнал принадлежит транзакции, которая идет прямо сейчас
+                return None
+            try:
+                return cls._recover_locked(journal_path)
+            finally:
+                _unlock_file(lock)
+        finally:
+            lock.close()
+
+    @classmethod
+    def _recover_locked(cls, journal_path: str) -> Optional['InstallTransaction']:
+        """Восстановление по журналу при захваченной блокировке"""
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Журнал не дописан - до первого шага дело не дошло
+            os.remove(journal_path)
+            return None
+
+        transaction = cls(data['addons_path'], journal_path)
+        transaction.state = data.get('state', cls.STAGING)
+        transaction.ops = data.get('ops', [])
+        if transaction.state == cls.COMMITTED:
+            transaction.finish()
+            return transaction
+        transaction.rollback()
+        return None
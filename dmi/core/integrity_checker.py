@@ -0,0 +1,181 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from .hash_cache import HashCache, file_sha256
+from .mod_installer import ModInstaller
+from .mod_record import ModRecord
+
+class IntegrityReport:
+    def __init__(self):
+        """
+        Результат проверки папки аддонов
+        Каждый элемент списков - {slot, mod_id, expected, actual}
+        """
+        # Содержимое совпадает с каталогом
+        self.ok: List[Dict] = []
+        # Файл не менялся после установки, но хэш не совпадает с каталогом
+        self.corrupt: List[Dict] = []
+        # Файл изменен после установки (размер или время) и не совпадает с каталогом
+        self.modified: List[Dict] = []
+        # Pak файлы, которых нет в каталоге
+        self.unknown: List[Dict] = []
+        # Не проверялись: объединенные pak файлы и моды без хэша в каталоге
+        self.skipped: List[Dict] = []
+        # Сколько файлов пришлось прочитать (остальные взяты из кэша хэшей)
+        self.hashed = 0
+
+    def has_problems(self) -> bool:
+        """Есть ли поврежденные или измененные pak файлы"""
+        return bool(self.corrupt or self.modified)
+
+    def get_summary(self) -> str:
+        """
+        Краткое описание результата для пользователя
+        :return: Строка вида "В порядке: 10, повреждено: 1"
+        """
+        parts = [f"В порядке: {len(self.ok)}"]
+        if self.corrupt:
+            parts.append(f"повреждено: {len(self.corrupt)}")
+        if self.modified:
+            parts.append(f"изменено: {len(self.modified)}")
+        if self.unknown:
+            parts.append(f"неизвестных: {len(self.unknown)}")
+        if self.skipped:
+            parts.append(f"не проверено: {len(self.skipped)}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """Результат в виде словаря (для логов и отладки)"""
+        return {
+            'ok': self.ok,
+            'corrupt': self.corrupt,
+            'modified': self.modified,
+            'unknown': self.unknown,
+            'skipped': self.skipped
+        }
+
+class IntegrityChecker:
+    # Файлы больше этого размера хэшируются в отдельных процессах
+    LARGE_FILE_SIZE = 32 * 1024 * 1024
+
+    def __init__(self, mod_installer: ModInstaller, hash_cache: HashCache = None,
+                 max_workers: int = None):
+        """
+        Проверка установленных pak файлов по хэшам каталога (file.hash)
+        Хэши хранятся в HashCache по пути, размеру, mtime и inode, поэтому
+        повторная проверка неизменной папки - это один stat на файл.
+        Файлы, размер которых не совпадает с каталогом, не читаются вовсе
+        :param mod_installer: Установщик модов (папка аддонов и манифест)
+        :param hash_cache: Кэш хэшей. По умолчанию тот же, что у загрузчика установщика
+        :param max_workers: Число процессов для больших файлов (по умолчанию - по числу ядер)
+        """
+        self.mod_installer = mod_installer
+        self.hash_cache = hash_cache or mod_installer.drive.hash_cache
+        self.max_workers = max_workers
+
+    def _hash_files(self, paths: List[str]) -> Dict[str, str]:
+        """
+        Подсчет SHA-256 файлов: большие - в пуле процессов, маленькие - здесь
+        :param paths: Пути к файлам
+        :return: {путь: хэш}; файлы, которые не удалось прочитать, пропускаются
+        """
+        sizes = {}
+        for path in paths:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError as e:
+                # Файл удалили или закрыли доступ после составления списка
+                print(f"Ошибка при чтении {path}: {e}")
+        large = [path for path in sizes if sizes[path] >= self.LARGE_FILE_SIZE]
+        small = [path for path in sizes if sizes[path] < self.LARGE_FILE_SIZE]
+        hashes = {}
+
+        if len(large) > 1:
+            # Сначала самые большие, чтобы процессы закончили примерно одновременно
+            large.sort(key=sizes.get, reverse=True)
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {path: executor.submit(file_sha256, path) for path in large}
+                for path in small:
+                    hashes[path] = self._hash_one(path)
+                for path, future in futures.items():
+                    try:
+                        hashes[path] = future.result()
+                    except OSError as e:
+                        print(f"Ошибка при чтении {path}: {e}")
+        else:
+            for path in large + small:
+                hashes[path] = self._hash_one(path)
+
+        return {path: sha256 for path, sha256 in hashes.items() if sha256}
+
+    @staticmethod
+    def _hash_one(path: str) -> Optional[str]:
+        try:
+            return file_sha256(path)
+        except OSError as e:
+            print(f"Ошибка при чтении {path}: {e}")
+            return None
+
+    def verify(self, mods: List[ModRecord]) -> IntegrityReport:
+        """
+        Проверка всех pak файлов папки аддонов
+        :param mods: Записи каталога
+        :return: Результат проверки
+        """
+        catalog = {mod.id: mod for mod in mods}
+        by_hash = {mod.file_hash.lower(): mod.id for mod in mods if mod.file_hash}
+        slots = self.mod_installer.manifest.get_slots()
+        game_path = self.mod_installer.game_path
+        report = IntegrityReport()
+
+        # Что ожидаем увидеть в каждом файле и нужно ли его читать
+        checks = []
+        to_hash = []
+        for pak_filename in sorted(self.mod_installer.get_installed_mods()):
+            path = os.path.join(game_path, pak_filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = slots.get(pak_filename) or {}
+            mod = catalog.get(entry.get('mod_id'))
+            item = {'slot': pak_filename, 'mod_id': entry.get('mod_id'),
+                    'expected': mod.file_hash.lower() if mod and mod.file_hash else None,
+                    'actual': self.hash_cache.get(path, st)}
+            changed = bool(entry) and (entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns)
+
+            if entry.get('merged') or (entry.get('mod_id') and not item['expected']):
+                report.skipped.append(item)
+                continue
+            if item['expected'] and mod.file_size and mod.file_size != st.st_size:
+                # Размер не совпадает - хэш считать незачем
+                (report.modified if changed else report.corrupt).append(item)
+                continue
+            checks.append((item, path, st, changed))
+            if item['actual'] is None:
+                to_hash.append(path)
+
+        hashes = self._hash_files(to_hash)
+        report.hashed = len(hashes)
+        for item, path, st, changed in checks:
+            if item['actual'] is None:
+                item['actual'] = hashes.get(path)
+                if item['actual'] is None:
+                    report.skipped.append(item)
+                    continue
+                self.hash_cache.put(path, item['actual'], st, save=False)
+
+            if item['expected']:
+                if item['actual'] == item['expected']:
+                    report.ok.append(item)
+                else:
+                    (report.modified if changed else report.corrupt).append(item)
+            elif item['actual'] in by_hash:
+                # Pak без записи в манифесте, но с содержимым мода из каталога
+                item['mod_id'] = by_hash[item['actual']]
+                report.ok.append(item)
+            else:
+                report.unknown.append(item)
+        # Кэш сохраняется один раз, а не после каждого файла
+        self.hash_cache.flush()
+        return report
@@ -0,0 +1,250 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+from .hash_cache import HashCache, file_sha256
+from .install_manifest import PAK_PATTERN
+from .mod_record import ModRecord
+from .vpk_store import VpkStore
+
+class ImportReport:
+    def __init__(self):
+        """
+        Результат разбора папки со скачанными модами
+        Файлы на диске не меняются: отчет только описывает, что найдено
+        """
+        # Моды каталога: {path, size, sha256, mod_id, suggested_name} - по одному на содержимое
+        self.matched: List[Dict] = []
+        # Неизвестные каталогу файлы: {path, size, sha256, suggested_name};
+        # sha256 - None, если размер уникален и хэш считать незачем
+        self.unknown: List[Dict] = []
+        # Повторы уже найденного содержимого: {path, size, sha256, original}
+        self.duplicates: List[Dict] = []
+        # Файлы и папки, которые не удалось прочитать: {path, error}
+        self.errors: List[Dict] = []
+        # Сколько .vpk найдено и сколько пришлось прочитать целиком
+        self.scanned = 0
+        self.hashed = 0
+
+    def get_duplicate_size(self) -> int:
+        """Сколько байт занимают повторы"""
+        return sum(item['size'] for item in self.duplicates)
+
+    def get_summary(self) -> str:
+        """
+        Краткое описание результата для пользователя
+        :return: Строка вида "Найдено .vpk: 120, из каталога: 80, ..."
+        """
+        parts = [f"Найдено .vpk: {self.scanned}", f"из каталога: {len(self.matched)}",
+                 f"неизвестных: {len(self.unknown)}"]
+        if self.duplicates:
+            parts.append(f"повторов: {len(self.duplicates)} "
+                         f"({self.get_duplicate_size() / 1024 / 1024:.1f} МБ)")
+        if self.errors:
+            parts.append(f"ошибок: {len(self.errors)}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict:
+        """Результат в виде словаря (для сохранения в JSON)"""
+        return {
+            'scanned': self.scanned,
+            'hashed': self.hashed,
+            'matched': self.matched,
+            'unknown': self.unknown,
+            'duplicates': self.duplicates,
+            'errors': self.errors
+        }
+
+class LibraryImporter:
+    def __init__(self, hash_cache: HashCache = None, max_workers: int = None):
+        """
+        Разбор папок со скачанными модами (архивы с сайтов, старые сборки):
+        поиск .vpk, сравнение с каталогом по file.hash и поиск одинаковых файлов
+        Папки обходятся os.scandir в нескольких потоках, хэш считается только
+        у файлов, размер которых есть в каталоге или встречается больше одного раза.
+        Хэши сохраняются в HashCache, поэтому повторный разбор той же папки - это stat
+        :param hash_cache: Кэш хэшей. По умолчанию общий файл в %APPDATA%/DMI
+        :param max_workers: Число потоков обхода и хэширования (по умолчанию - как в ThreadPoolExecutor)
+        """
+        self.hash_cache = hash_cache or HashCache()
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _scan_dir(path: str) -> Tuple[List[Tuple[str, os.stat_result]], List[str], Optional[str]]:
+        """
+        Содержимое одной папки
+        :param path: Путь к папке
+        :return: (.vpk файлы [(путь, stat)], вложенные папки, ошибка или None)
+        """
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        # Ссылки на папки не обходим, чтобы не зациклиться
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith('.vpk') and entry.is_file():
+                            files.append((entry.path, entry.stat()))
+                    except OSError:
+                        continue
+        except OSError as e:
+            return files, subdirs, str(e)
+        return files, subdirs, None
+
+    def scan(self, roots: List[str], report: ImportReport = None) -> List[Tuple[str, os.stat_result]]:
+        """
+        Поиск .vpk файлов во всех вложенных папках
+        :param roots: Папки для обхода
+        :param report: Отчет для записи ошибок чтения папок
+        :return: [(путь, stat)] в порядке путей; каждый файл на диске - один раз,
+                 даже если папки пересекаются (папка и её родитель)
+        """
+        files = {}
+        walked = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # {задача: папка}; каждая прочитанная папка добавляет задачи для вложенных
+            pending = {}
+
+            def submit(path: str) -> None:
+                real_path = os.path.normcase(os.path.realpath(path))
+                if real_path not in walked:
+                    walked.add(real_path)
+                    pending[executor.submit(self._scan_dir, path)] = path
+
+            for root in roots:
+                submit(root)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    dir_files, subdirs, error = future.result()
+                    for file_path, st in dir_files:
+                        files.setdefault(self._file_key(file_path, st), (file_path, st))
+                    for subdir in subdirs:
+                        submit(subdir)
+                    if error and report is not None:
+                        report.errors.append({'path': path, 'error': error})
+        return sorted(files.values(), key=lambda item: item[0])
+
+    @staticmethod
+    def _file_key(path: str, st: os.stat_result) -> Tuple:
+        """
+        Ключ физического файла: устройство и inode (жесткие ссылки - один файл),
+        на Windows, где os.scandir не заполняет inode, - настоящий путь
+        """
+        if st.st_ino:
+            return st.st_dev, st.st_ino
+        return os.path.normcase(os.path.realpath(path)),
+
+    def _hash(self, path: str, st: os.stat_result) -> Tuple[str, bool]:
+        """
+        Хэш файла из кэша или подсчет с записью в кэш
+        :return: (SHA-256, пришлось ли читать файл)
+        """
+        sha256 = self.hash_cache.get(path, st)
+        if sha256 is not None:
+            return sha256, False
+        sha256 = file_sha256(path)
+        self.hash_cache.put(path, sha256, st, save=False)
+        return sha256, True
+
+    @staticmethod
+    def suggest_name(path: str, mod: ModRecord = None) -> str:
+        """
+        Понятное имя файла для отчета
+        У мода из каталога - имя файла из каталога; у файла с именем вида pakNN_dir.vpk
+        - имя папки, в которой он лежит; у остальных - имя без цифр
+        :param path: Путь к файлу
+        :param mod: Запись каталога, если файл опознан
+        :return: Имя файла с расширением .vpk
+        """
+        if mod is not None and mod.file_name:
+            return mod.file_name
+        filename = os.path.basename(path)
+        if PAK_PATTERN.fullmatch(filename.lower()):
+            name = os.path.basename(os.path.dirname(path))
+        else:
+            name = re.sub(r'\d', '', os.path.splitext(filename)[0])
+        name = name.strip(' _-') or os.path.splitext(filename)[0]
+        return f"{name}.vpk"
+
+    def run(self, roots: List[str], mods: List[ModRecord]) -> ImportReport:
+        """
+        Разбор папок
+        :param roots: Папки со скачанными модами
+        :param mods: Записи каталога
+        :return: Отчет
+        """
+        report = ImportReport()
+        files = self.scan(roots, report)
+        report.scanned = len(files)
+
+        by_hash = {mod.file_hash.lower(): mod for mod in mods if mod.file_hash}
+        catalog_sizes = {mod.file_size for mod in mods if mod.file_hash and mod.file_size}
+        size_counts: Dict[int, int] = {}
+        for _, st in files:
+            size_counts[st.st_size] = size_counts.get(st.st_size, 0) + 1
+
+        # Файл, размера которого нет ни в каталоге, ни у других файлов, - не мод каталога и не повтор
+        to_hash = [(path, st) for path, st in files
+                   if st.st_size in catalog_sizes or size_counts[st.st_size] > 1]
+        hashes: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Сначала большие, чтобы потоки закончили примерно одновременно
+            to_hash.sort(key=lambda item: item[1].st_size, reverse=True)
+            futures = {path: executor.submit(self._hash, path, st) for path, st in to_hash}
+            for path, future in futures.items():
+                try:
+                    hashes[path], computed = future.result()
+                    report.hashed += computed
+                except OSError as e:
+                    report.errors.append({'path': path, 'error': str(e)})
+        # Кэш хэшей сохраняется один раз, а не после каждого файла
+        try:
+            self.hash_cache.flush()
+        except OSError as e:
+            print(f"Ошибка при сохранении кэша хэшей: {e}")
+
+        seen: Dict[str, str] = {}
+        for path, st in files:
+            if path in futures and path not in hashes:
+                # Не удалось прочитать - уже в ошибках
+                continue
+            sha256 = hashes.get(path)
+            item = {'path': path, 'size': st.st_size, 'sha256': sha256}
+            if sha256 in seen:
+                item['original'] = seen[sha256]
+                report.duplicates.append(item)
+                continue
+            if sha256 is not None:
+                seen[sha256] = path
+            mod = by_hash.get(sha256)
+            item['suggested_name'] = self.suggest_name(path, mod)
+            if mod is not None:
+                item['mod_id'] = mod.id
+                report.matched.append(item)
+            else:
+                report.unknown.append(item)
+        return report
+
+    @staticmethod
+    def import_to_store(report: ImportReport, store: VpkStore) -> int:
+        """
+        Копирование найденных модов каталога в хранилище, чтобы их установка
+        обходилась без скачивания. Исходные файлы остаются на месте
+        :param report: Отчет run()
+        :param store: Хранилище VPK
+        :return: Сколько файлов добавлено
+        """
+        added = 0
+        for item in report.matched:
+            if store.has(item['sha256']):
+                continue
+            try:
+                store.add(item['path'], item['sha256'])
+                added += 1
+            except OSError as e:
+                print(f"Ошибка при копировании {item['path']} в хранилище: {e}")
+        return added
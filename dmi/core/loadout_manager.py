@@ -0,0 +1,276 @@
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+from .config import get_app_data_dir
+from .install_manifest import PAK_PATTERN
+from .mod_installer import ModInstaller
+from .mod_record import ModRecord
+
+class LoadoutManager:
+    def __init__(self, mod_installer: ModInstaller, profiles_path: str = None):
+        """
+        Профили модов (наборы установленных модов с порядком загрузки)
+        Моды, не входящие в выбранный профиль, не удаляются, а переносятся
+        в папку отложенных модов рядом с папкой аддонов (тот же диск), поэтому
+        переключение профиля - это переименования файлов и ссылки из хранилища,
+        без копирования. Все изменения идут одной транзакцией установщика
+        :param mod_installer: Установщик модов
+        :param profiles_path: Файл профилей. По умолчанию %APPDATA%/DMI/loadouts.json
+        """
+        if profiles_path is None:
+            profiles_path = os.path.join(get_app_data_dir(), 'loadouts.json')
+        self.mod_installer = mod_installer
+        self.profiles_path = profiles_path
+        self._lock = threading.RLock()
+        # {имя профиля: {'mods': [mod_id, ...]}}
+        self._profiles: Dict[str, Dict] = self._load_json(profiles_path)
+        # {mod_id: {file, version, hash}}; загружается при первом обращении
+        self._stash: Optional[Dict[str, Dict]] = None
+
+    @staticmethod
+    def _load_json(path: str) -> Dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_json(path: str, data: Dict) -> None:
+        """Атомарное сохранение JSON"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @property
+    def stash_dir(self) -> str:
+        """
+        Папка отложенных модов: рядом с папкой аддонов, чтобы перенос
+        был переименованием в пределах одного диска
+        """
+        return os.path.join(os.path.dirname(os.path.normpath(self.mod_installer.game_path)), 'dmi_stash')
+
+    @property
+    def stash_index_path(self) -> str:
+        return os.path.join(self.stash_dir, 'index.json')
+
+    def _get_stash(self) -> Dict[str, Dict]:
+        """
+        Индекс отложенных модов
+        Записи без файла выбрасываются; файлы без записи (сбой до сохранения
+        индекса) добавляются по имени файла
+        """
+        if self._stash is None:
+            stash = self._load_json(self.stash_index_path)
+            stash = {mod_id: entry for mod_id, entry in stash.items()
+                     if os.path.exists(os.path.join(self.stash_dir, entry['file']))}
+            if os.path.isdir(self.stash_dir):
+                known = {entry['file'] for entry in stash.values()}
+                for name in os.listdir(self.stash_dir):
+                    if name.endswith('.vpk') and name not in known:
+                        stash[name[:-len('.vpk')]] = {'file': name, 'version': None, 'hash': None}
+            self._stash = stash
+        return self._stash
+
+    def _get_stash_name(self, mod_id: str) -> str:
+        """Имя файла отложенного мода"""
+        return re.sub(r'[^\w.-]', '_', mod_id) + '.vpk'
+
+    def get_stashed_mods(self) -> List[str]:
+        """ID отложенных модов"""
+        with self._lock:
+            return sorted(self._get_stash())
+
+    def get_profiles(self) -> List[str]:
+        """Имена профилей"""
+        with self._lock:
+            return sorted(self._profiles)
+
+    def get_profile(self, name: str) -> Optional[List[str]]:
+        """
+        Моды профиля
+        :param name: Имя профиля
+        :return: ID модов в порядке загрузки или None, если профиля нет
+        """
+        with self._lock:
+            profile = self._profiles.get(name)
+            return list(profile['mods']) if profile else None
+
+    def get_current_mods(self) -> List[str]:
+        """Установленные моды каталога в порядке загрузки (включая моды объединенных pak)"""
+        mods = []
+        for pak_filename in self.mod_installer.get_slot_order():
+            entry = self.mod_installer.manifest.get_entry(pak_filename)
+            if entry:
+                mods.extend(mod['mod_id'] for mod in entry.get('merged', ()))
+                if entry.get('mod_id'):
+                    mods.append(entry['mod_id'])
+        return mods
+
+    def save_profile(self, name: str, mod_ids: List[str] = None) -> Tuple[bool, str]:
+        """
+        Сохранение профиля
+        :param name: Имя профиля
+        :param mod_ids: ID модов в порядке загрузки. По умолчанию - установленные сейчас
+        :return: (успех, сообщение)
+        """
+        name = name.strip()
+        if not name:
+            return False, "Имя профиля не может быть пустым"
+        if mod_ids is None:
+            mod_ids = self.get_current_mods()
+        try:
+            with self._lock:
+                self._profiles[name] = {'mods': list(dict.fromkeys(mod_ids))}
+                self._save_json(self.profiles_path, self._profiles)
+            return True, f"Профиль {name} сохранен"
+        except OSError as e:
+            return False, f"Ошибка при сохранении профиля: {str(e)}"
+
+    def delete_profile(self, name: str) -> Tuple[bool, str]:
+        """
+        Удаление профиля (моды и отложенные файлы не трогаются)
+        :param name: Имя профиля
+        :return: (успех, сообщение)
+        """
+        try:
+            with self._lock:
+                if self._profiles.pop(name, None) is None:
+                    return False, f"Профиль {name} не найден"
+                self._save_json(self.profiles_path, self._profiles)
+            return True, f"Профиль {name} удален"
+        except OSError as e:
+            return False, f"Ошибка при удалении профиля: {str(e)}"
+
+    def switch_profile(self, name: str, catalog: Dict[str, ModRecord] = None) -> Tuple[bool, str]:
+        """
+        Переключение на профиль
+        :param name: Имя профиля
+        :param catalog: Записи каталога по ID - для модов, которых нет среди
+                        отложенных, но есть в хранилище VPK
+        :return: (успех, сообщение)
+        """
+        mod_ids = self.get_profile(name)
+        if mod_ids is None:
+            return False, f"Профиль {name} не найден"
+        return self.apply(mod_ids, catalog)
+
+    def apply(self, mod_ids: List[str], catalog: Dict[str, ModRecord] = None) -> Tuple[bool, str]:
+        """
+        Приведение папки аддонов к набору модов
+        Pak файлы не из каталога остаются под своими номерами, моды набора
+        занимают свободные номера с pak01 в заданном порядке. Установленные
+        моды вне набора переносятся в папку отложенных. Объединенный pak
+        (merge_paks) не делится: набор должен содержать все его моды, pak
+        встает на место первого из них. Затрагиваются только файлы, у которых меняется имя или место
+        :param mod_ids: ID модов в порядке загрузки
+        :param catalog: Записи каталога по ID
+        :return: (успех, сообщение)
+        """
+        catalog = catalog or {}
+        installer = self.mod_installer
+        mod_ids = list(dict.fromkeys(mod_ids))
+        try:
+            with self._lock:
+                stash = self._get_stash()
+                installed = {}
+                # {mod_id: объединенный pak}
+                merged = {}
+                others = []
+                for pak_filename in installer.get_slot_order():
+                    entry = installer.manifest.get_entry(pak_filename)
+                    if entry and entry.get('merged'):
+                        for mod in entry['merged']:
+                            merged[mod['mod_id']] = pak_filename
+                    elif entry and entry.get('mod_id'):
+                        installed[entry['mod_id']] = (pak_filename, entry)
+                    else:
+                        others.append(pak_filename)
+
+                # Объединенный pak нельзя разделить или отложить частично
+                wanted = set(mod_ids)
+                merged_paks = {}
+                for mod_id, pak_filename in merged.items():
+                    merged_paks.setdefault(pak_filename, []).append(mod_id)
+                for pak_filename, merged_ids in sorted(merged_paks.items()):
+                    if not wanted.issuperset(merged_ids):
+                        return False, (f"Набор затрагивает объединенный pak {pak_filename} "
+                                       f"(моды: {', '.join(merged_ids)}): включите в набор все его моды")
+
+                # Откуда взять каждый мод набора
+                missing = []
+                for mod_id in mod_ids:
+                    mod_data = catalog.get(mod_id)
+                    if (mod_id not in installed and mod_id not in merged and mod_id not in stash
+                            and not (mod_data and installer.store.has(mod_data.file_hash))):
+                        missing.append(mod_id)
+                if missing:
+                    titles = [catalog[mod_id].title if mod_id in catalog else mod_id for mod_id in missing]
+                    return False, f"Моды не загружены, установите их из каталога: {', '.join(titles)}"
+
+                stashed_out = {}
+                moves = {}
+                for mod_id, (pak_filename, entry) in installed.items():
+                    if mod_id not in wanted:
+                        stash_name = self._get_stash_name(mod_id)
+                        moves[pak_filename] = os.path.join(self.stash_dir, stash_name)
+                        stashed_out[mod_id] = {'file': stash_name, 'version': entry.get('version'),
+                                               'hash': entry.get('hash')}
+
+                adds = []
+                stashed_in = []
+                layout = []
+                for mod_id in mod_ids:
+                    if mod_id not in merged:
+                        layout.append((mod_id, installed.get(mod_id, (None,))[0]))
+                    elif (None, merged[mod_id]) not in layout:
+                        layout.append((None, merged[mod_id]))
+                # Чужие pak файлы не переименовываются: их порядок задал пользователь
+                reserved = {int(PAK_PATTERN.fullmatch(pak_filename).group(1)) for pak_filename in others}
+                number = 0
+                for mod_id, pak_filename in layout:
+                    number += 1
+                    while number in reserved:
+                        number += 1
+                    slot = installer.get_pak_name(number)
+                    if pak_filename is not None:
+                        if pak_filename != slot:
+                            moves[pak_filename] = slot
+                    elif mod_id in stash:
+                        entry = stash[mod_id]
+                        adds.append({
+                            'source': os.path.join(self.stash_dir, entry['file']),
+                            'info': {'mod_id': mod_id, 'version': entry.get('version'),
+                                     'sha256': entry.get('hash')},
+                            'slot': slot
+                        })
+                        stashed_in.append(mod_id)
+                    else:
+                        mod_data = catalog[mod_id]
+                        adds.append({'sha256': mod_data.file_hash, 'mod_data': mod_data, 'slot': slot})
+
+                if not moves and not adds:
+                    return True, "Набор модов уже применен"
+
+                # Устаревшая копия того же мода в папке отложенных удаляется той же
+                # транзакцией: при откате она вернется на место
+                removes = [os.path.join(self.stash_dir, stash[mod_id]['file'])
+                           for mod_id in stashed_out if mod_id in stash]
+                os.makedirs(self.stash_dir, exist_ok=True)
+                installer.commit_changes(adds, removes, moves)
+
+                for mod_id in stashed_in:
+                    stash.pop(mod_id, None)
+                stash.update(stashed_out)
+                self._save_json(self.stash_index_path, stash)
+
+            return True, (f"Набор модов применен: добавлено {len(adds)}, "
+                          f"отложено {len(stashed_out)}, переименовано {len(moves) - len(stashed_out)}")
+
+        except Exception as e:
+            # Индекс перечитаем с диска: транзакция откатила файлы
+            self._stash = None
+            return False, f"Ошибка при переключении профиля (изменения отменены): {str(e)}"
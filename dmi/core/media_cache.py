@@ -1,26 +1,90 @@
 import os
+import json
+import time
 import shutil
-import requests
+import threading
 from pathlib import Path
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional
+from .config import get_app_data_dir
+from .http_client import get_http_client
+from .resumable_download import ResumableDownloader
 
 class MediaCache:
-    def __init__(self, cache_dir: str = None):
+    # Видео превью большие, их качаем с докачкой
+    RESUMABLE_EXTENSIONS = ('.mp4', '.webm')
+    # Сколько файл считается свежим без обращения к серверу
+    MAX_AGE = 24 * 60 * 60
+    # Ограничение размера кэша по умолчанию
+    DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+    # Как часто сохранять индекс, если менялось только время доступа
+    INDEX_SAVE_INTERVAL = 30.0
+    INDEX_NAME = 'index.json'
+    # Незавершенные загрузки движка докачки (<файл>.part и <файл>.part.json)
+    PARTIAL_SUFFIXES = ('.part', '.part.json')
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
         """
         Инициализация кэша медиафайлов
+        Для каждого файла в index.json хранятся ETag/Last-Modified, размер,
+        время загрузки и последнего обращения. Устаревший файл проверяется
+        условным запросом, а при превышении max_bytes удаляются давно
+        не использованные файлы
         :param cache_dir: Папка для кэша. По умолчанию %APPDATA%/DMI/cache/media/
+        :param max_bytes: Максимальный размер кэша в байтах
         """
         if cache_dir is None:
-            appdata = os.getenv('APPDATA')
-            cache_dir = os.path.join(appdata, 'DMI', 'cache', 'media')
-        
+            cache_dir = get_app_data_dir('cache', 'media')
+
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
+        self.index_path = self.cache_dir / self.INDEX_NAME
+        self.max_bytes = max_bytes
+
         # URL для загрузки медиа
         self.media_base_url = "https://raw.githubusercontent.com/DeadlockMods/mods/main/media"
-    
+        self.engine = ResumableDownloader()
+        self.http = get_http_client()
+
+        self._lock = threading.RLock()
+        # {имя .part файла: размер} - учитываются в max_bytes и удаляются первыми
+        self._partial: Dict[str, int] = {}
+        self._index = self._load_index()
+        self._index_saved_at = time.monotonic()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """
+        Загрузка индекса и однократная сверка с содержимым папки
+        Дальше актуальность файлов определяется только по индексу.
+        Оставшиеся от прерванных загрузок .part файлы запоминаются в _partial
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        present = set()
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    present.add(entry.name)
+                    if entry.name.endswith(self.PARTIAL_SUFFIXES):
+                        self._partial[entry.name] = entry.stat().st_size
+        return {name: meta for name, meta in index.items() if name in present}
+
+    def _save_index(self, force: bool = True) -> None:
+        """
+        Атомарное сохранение индекса
+        :param force: Сохранить сразу; иначе не чаще INDEX_SAVE_INTERVAL
+        """
+        if not force and time.monotonic() - self._index_saved_at < self.INDEX_SAVE_INTERVAL:
+            return
+        temp_path = self.index_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        temp_path.replace(self.index_path)
+        self._index_saved_at = time.monotonic()
+
     def get_media_path(self, filename: str) -> Optional[str]:
         """
         Получить путь к медиафайлу (скачать если нет в кэше)
@@ -28,45 +92,148 @@ class MediaCache:
         :return: Путь к локальному файлу или None если ошибка
         """
         cache_path = self.cache_dir / filename
-        
-        # Если файл есть в кэше и не устарел
-        if self._is_cache_valid(cache_path):
-            return str(cache_path)
-        
-        # Скачиваем файл
+
+        with self._lock:
+            meta = self._index.get(filename)
+            # Если файл есть в кэше и не устарел
+            if meta is not None and time.time() - meta['fetched_at'] < self.MAX_AGE:
+                meta['last_access'] = time.time()
+                self._save_index(force=False)
+                return str(cache_path)
+
+        # Скачиваем файл или проверяем, не изменился ли он на сервере
         try:
             url = f"{self.media_base_url}/{filename}"
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            # Сохраняем во временный файл
-            temp_path = cache_path.with_suffix('.tmp')
-            with open(temp_path, 'wb') as f:
-                shutil.copyfileobj(response.raw, f)
-            
-            # Перемещаем в кэш
-            temp_path.replace(cache_path)
+
+            headers = {}
+            if meta is not None:
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+
+            resumable = cache_path.suffix.lower() in self.RESUMABLE_EXTENSIONS
+            if resumable:
+                # Видео качает движок докачки; здесь только условная проверка без тела ответа
+                response = self.http.head(url, headers=headers, allow_redirects=True)
+            else:
+                response = self.http.get(url, headers=headers, stream=True)
+            try:
+                if response.status_code == 304 and meta is not None:
+                    # Файл не изменился - только продлеваем срок
+                    with self._lock:
+                        meta['fetched_at'] = meta['last_access'] = time.time()
+                        self._save_index()
+                    return str(cache_path)
+
+                response.raise_for_status()
+
+                if resumable:
+                    # Пока идет загрузка, её .part файл не вытесняется
+                    with self._lock:
+                        self._forget_partial(filename)
+                    success, message = self.engine.download(url, str(cache_path),
+                                                            http_client=self.http)
+                    if not success:
+                        with self._lock:
+                            self._note_partial(filename)
+                            self._evict()
+                        raise IOError(message)
+                else:
+                    # Сохраняем во временный файл
+                    temp_path = cache_path.with_suffix('.tmp')
+                    with open(temp_path, 'wb') as f:
+                        shutil.copyfileobj(response.raw, f)
+
+                    # Перемещаем в кэш
+                    temp_path.replace(cache_path)
+            finally:
+                response.close()
+
+            now = time.time()
+            with self._lock:
+                self._index[filename] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'size': cache_path.stat().st_size,
+                    'fetched_at': now,
+                    'last_access': now
+                }
+                self._evict(keep=filename)
+                self._save_index()
             return str(cache_path)
-            
+
         except Exception as e:
             print(f"Ошибка при загрузке {filename}: {e}")
+            # Без сети лучше показать устаревший файл, чем ничего
+            if meta is not None:
+                return str(cache_path)
             return None
-    
-    def _is_cache_valid(self, cache_path: Path) -> bool:
+
+    def _note_partial(self, filename: str) -> None:
+        """Учет .part файлов, оставшихся после неудачной загрузки"""
+        for suffix in self.PARTIAL_SUFFIXES:
+            try:
+                self._partial[filename + suffix] = (self.cache_dir / (filename + suffix)).stat().st_size
+            except OSError:
+                self._partial.pop(filename + suffix, None)
+
+    def _forget_partial(self, filename: str) -> None:
+        """Снятие .part файлов с учета (загрузка продолжается или завершена)"""
+        for suffix in self.PARTIAL_SUFFIXES:
+            self._partial.pop(filename + suffix, None)
+
+    def get_total_size(self) -> int:
+        """Суммарный размер файлов в кэше по индексу и незавершенных загрузок"""
+        with self._lock:
+            return sum(meta['size'] for meta in self._index.values()) + sum(self._partial.values())
+
+    def _evict(self, keep: str = None) -> int:
         """
-        Проверить актуальность кэша
-        :param cache_path: Путь к файлу
-        :return: True если кэш актуален
+        Удаление давно не использованных файлов, пока кэш больше max_bytes
+        Сначала удаляются незавершенные загрузки: показать их все равно нельзя
+        :param keep: Файл, который удалять нельзя (только что загруженный)
+        :return: Сколько байт освобождено
         """
-        if not cache_path.exists():
-            return False
-        
-        # Проверяем возраст файла (например, 24 часа)
-        max_age = timedelta(hours=24)
-        file_age = datetime.now() - datetime.fromtimestamp(cache_path.stat().st_mtime)
-        return file_age < max_age
-    
+        total = self.get_total_size()
+        freed = 0
+        if total <= self.max_bytes:
+            return 0
+
+        for name, size in list(self._partial.items()):
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            del self._partial[name]
+            total -= size
+            freed += size
+
+        for name, meta in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                (self.cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            del self._index[name]
+            total -= meta['size']
+            freed += meta['size']
+        return freed
+
+    def flush(self) -> None:
+        """Сохранить индекс (время последнего доступа) на диск"""
+        with self._lock:
+            self._save_index()
+
     def clear_cache(self):
         """Очистить кэш"""
-        shutil.rmtree(self.cache_dir)
-        self.cache_dir.mkdir(parents=True)
+        with self._lock:
+            shutil.rmtree(self.cache_dir)
+            self.cache_dir.mkdir(parents=True)
+            self._index = {}
+            self._partial = {}
@@ -1,19 +1,37 @@
 import os
 import shutil
 import re
-from .config import Config
+import threading
+from .config import Config, get_app_data_dir
 from .drive_downloader import DriveDownloader
-from typing import Tuple, Dict
+from .download_manager import DownloadManager, DownloadJob
+from .vpk_store import VpkStore
+from .install_manifest import InstallManifest, PAK_PATTERN
+from .install_transaction import InstallTransaction
+from .mod_record import ModRecord
+from .vpk_reader import VpkReader, VpkEntry
+from .conflict_index import ConflictIndex
+from .vpk_writer import merge_vpks
+from typing import Callable, Dict, List, Optional, Tuple
 
 class ModInstaller:
-    def __init__(self):
+    def __init__(self, download_manager: DownloadManager = None):
         """
         Инициализация установщика модов
+        :param download_manager: Общий менеджер загрузок. Создается при первой
+                                 фоновой установке, если не передан
         """
         self.config = Config()
         self.drive = DriveDownloader()
+        self.store = VpkStore()
+        self.manifest = InstallManifest()
+        self.conflicts = ConflictIndex()
+        self._download_manager = download_manager
         # Путь к папке аддонов будет получен при первом использовании
         self._game_path = None
+        # Выбор номера pak и копирование должны идти последовательно,
+        # иначе параллельные загрузки получат один и тот же номер
+        self._install_lock = threading.Lock()
     
     @property
     def game_path(self) -> str:
@@ -28,29 +46,185 @@ class ModInstaller:
                 os.makedirs(self._game_path)
         return self._game_path
     
-    def _get_next_pak_number(self) -> str:
+    @property
+    def download_manager(self) -> DownloadManager:
+        """Менеджер загрузок, создается при первом обращении"""
+        if self._download_manager is None:
+            self._download_manager = DownloadManager(self.drive)
+        return self._download_manager
+    
+    def shutdown(self) -> None:
+        """Отмена фоновых загрузок (если менеджер загрузок создавался)"""
+        if self._download_manager is not None:
+            self._download_manager.shutdown(wait=False)
+    
+    @property
+    def downloads_path(self) -> str:
+        """Папка для загруженных с Google Drive файлов модов"""
+        return get_app_data_dir('cache', 'downloads')
+    
+    def _get_download_path(self, mod_data: ModRecord) -> str:
         """
-        Находит следующий доступный номер для pak файла
-        :return: Номер в формате XX (например, '03')
+        Путь, по которому сохраняется загруженный файл мода
+        :param mod_data: Запись мода из каталога
+        :return: Полный путь к файлу
+        """
+        return os.path.join(self.downloads_path, mod_data.file_name)
+    
+    def _get_max_pak_number(self) -> int:
+        """
+        Наибольший занятый номер pak файла (одно сканирование папки аддонов)
+        :return: Номер или 0, если pak файлов нет
         """
-        pattern = re.compile(r'pak(\d+)_dir\.vpk')
         max_number = 0
-        
-        # Проверяем существование папки
         if not os.path.exists(self.game_path):
-            return "01"
-        
-        # Сканируем существующие pak файлы
-        for file in os.listdir(self.game_path):
-            match = pattern.match(file)
-            if match:
-                number = int(match.group(1))
-                max_number = max(max_number, number)
+            return max_number
+        with os.scandir(self.game_path) as it:
+            for entry in it:
+                match = PAK_PATTERN.fullmatch(entry.name)
+                if match:
+                    max_number = max(max_number, int(match.group(1)))
+        return max_number
+    
+    def _stage_file(self, item: Dict, destination: str) -> None:
+        """
+        Создание файла мода по временному пути транзакции
+        Если объект есть в хранилище, создается ссылка вместо копии
+        :param item: {'mod_path' или 'sha256', 'mod_data'}
+        :param destination: Путь назначения
+        """
+        sha256 = item.get('sha256')
+        if self.store.has(sha256):
+            self.store.link_into(sha256, destination)
+        else:
+            # Копируем файл с новым именем
+            shutil.copy2(item['mod_path'], destination)
+    
+    @staticmethod
+    def get_pak_name(number: int) -> str:
+        """Имя pak файла по номеру"""
+        return f"pak{number:02d}_dir.vpk"
+    
+    def commit_changes(self, adds: List[Dict], removes: List[str],
+                moves: Dict[str, str] = None) -> List[str]:
+        """
+        Установка, удаление и переименование pak файлов одной транзакцией
+        Папка аддонов сканируется один раз, номера для всех новых файлов
+        выделяются сразу. При любой ошибке все изменения откатываются
+        :param adds: Новые файлы: {'mod_path', 'sha256' или 'source', 'mod_data' или 'info', 'slot'}.
+                     'source' - файл на том же диске, который переносится переименованием;
+                     'info' - данные для манифеста {mod_id, version, sha256} без записи каталога;
+                     'slot' - имя pak файла, если номер нужен определенный
+        :param removes: Имена удаляемых pak файлов (или абсолютные пути на том же диске)
+        :param moves: Текущее имя pak файла -> новое (или абсолютный путь за пределами папки аддонов)
+        :return: Имена созданных pak файлов в порядке adds
+        """
+        moves = moves or {}
+        with self._install_lock:
+            os.makedirs(self.game_path, exist_ok=True)
+            max_number = self._get_max_pak_number()
+            for target in list(moves.values()) + [item['slot'] for item in adds if item.get('slot')]:
+                match = PAK_PATTERN.fullmatch(target)
+                if match:
+                    max_number = max(max_number, int(match.group(1)))
+            slots = []
+            for item in adds:
+                if not item.get('slot'):
+                    max_number += 1
+                slots.append(item.get('slot') or self.get_pak_name(max_number))
+            
+            with InstallTransaction(self.game_path) as transaction:
+                try:
+                    for pak_filename in removes:
+                        transaction.remove(pak_filename)
+                    for pak_filename, target in moves.items():
+                        transaction.move(pak_filename, target)
+                    for slot, item in zip(slots, adds):
+                        info = item.get('info')
+                        if info is None:
+                            mod_data = item.get('mod_data')
+                            info = {
+                                'mod_id': mod_data.id if mod_data else None,
+                                'version': mod_data.version if mod_data else None,
+                                'sha256': item.get('sha256')
+                            }
+                        if item.get('source'):
+                            transaction.move(item['source'], slot, **info)
+                        else:
+                            transaction.add(
+                                slot,
+                                lambda destination, item=item: self._stage_file(item, destination),
+                                **info
+                            )
+                    transaction.commit()
+                except Exception:
+                    transaction.rollback()
+                    raise
+                
+                # Файлы уже на месте; манифест обновляется одним сохранением
+                self._apply_to_manifest(transaction)
+                transaction.finish()
         
-        # Возвращаем следующий номер в формате XX
-        return f"{max_number + 1:02d}"
+        return slots
+    
+    def _apply_to_manifest(self, transaction: InstallTransaction) -> None:
+        """Запись изменений зафиксированной транзакции в манифест"""
+        records = []
+        removed = []
+        moved = {}
+        for op in transaction.ops:
+            if op['op'] == 'remove':
+                removed.append(op['slot'])
+            elif op['op'] == 'move' and os.path.isabs(op['target']):
+                # Файл перенесен за пределы папки аддонов
+                removed.append(op['slot'])
+            elif op['op'] == 'move' and not os.path.isabs(op['slot']):
+                moved[op['slot']] = op['target']
+            else:
+                slot = op.get('target', op['slot'])
+                path = os.path.join(transaction.addons_path, slot)
+                if not os.path.exists(path):
+                    continue
+                records.append({
+                    'slot': slot,
+                    'path': path,
+                    'mod_id': op.get('mod_id'),
+                    'version': op.get('version'),
+                    'sha256': op.get('sha256'),
+                    'merged': op.get('merged')
+                })
+        self.manifest.apply_batch(records, removed, moved)
+    
+    def _place_file(self, mod_path: str = None, sha256: str = None,
+                    mod_data: ModRecord = None) -> str:
+        """
+        Размещение файла мода в папке аддонов под следующим номером pak
+        :param mod_path: Путь к файлу мода (если объекта нет в хранилище)
+        :param sha256: Хэш объекта в хранилище
+        :param mod_data: Информация о моде из каталога для манифеста
+        :return: Имя созданного pak файла
+        """
+        return self.commit_changes([{'mod_path': mod_path, 'sha256': sha256, 'mod_data': mod_data}], [])[0]
+    
+    def _store_download(self, mod_data: ModRecord) -> str:
+        """
+        Перенос проверенного скачанного файла мода в хранилище
+        :param mod_data: Запись мода из каталога
+        :return: Хэш объекта
+        """
+        sha256 = mod_data.file_hash
+        download_path = self._get_download_path(mod_data)
+        object_path = self.store.add(download_path, sha256, move=True)
+        # Файл перенесен: проверенный при загрузке хэш относится теперь к объекту хранилища
+        try:
+            self.drive.hash_cache.put(object_path, sha256.lower(), save=False)
+            self.drive.hash_cache.remove(download_path)
+            self.drive.hash_cache.flush()
+        except OSError as e:
+            print(f"Ошибка при сохранении кэша хэшей: {e}")
+        return sha256
     
-    def install_mod(self, mod_path: str = None, mod_data: Dict[str, str] = None) -> Tuple[bool, str]:
+    def install_mod(self, mod_path: str = None, mod_data: ModRecord = None) -> Tuple[bool, str]:
         """
         Установка мода
         :param mod_path: Путь к файлу мода (.vpk)
@@ -65,47 +239,87 @@ class ModInstaller:
                 if not mod_path.endswith('.vpk'):
                     return False, "Файл не является VPK файлом"
                 
-                # Получаем следующий номер для pak файла
-                next_number = self._get_next_pak_number()
-                new_filename = f"pak{next_number}_dir.vpk"
-                destination = os.path.join(self.game_path, new_filename)
-                
-                # Создаем папку назначения если её нет
-                os.makedirs(os.path.dirname(destination), exist_ok=True)
-                
-                # Копируем файл с новым именем
-                shutil.copy2(mod_path, destination)
+                success, message = self.validate_vpk(mod_path)
+                if not success:
+                    return False, message
                 
-                return True, f"Мод установлен как {new_filename}"
+                new_filename = self._place_file(mod_path)
+                return True, f"Мод установлен как {new_filename}" + self.describe_conflicts(new_filename)
             elif mod_data:
-                # Получаем информацию о файле
-                file_info = mod_data['file']
-                file_id = file_info['drive_id']
-                
-                # Путь для сохранения
-                target_dir = os.path.join(self.config.game_path, 'game', 'deadlock', 'custom')
-                target_path = os.path.join(target_dir, file_info['name'])
-                
-                # Загружаем файл
-                success, message = self.drive.download_file(
-                    file_id, 
-                    target_path,
-                    self.progress_callback
-                )
+                sha256 = mod_data.file_hash
                 
-                if not success:
-                    return False, f"Ошибка загрузки: {message}"
+                # Файл уже есть в хранилище - качать не нужно
+                if not self.store.has(sha256):
+                    target_path = self._get_download_path(mod_data)
+                    
+                    # Загружаем файл, размер и хэш проверяются по каталогу
+                    success, message = self.drive.download_file(
+                        mod_data.drive_id,
+                        target_path,
+                        expected_size=mod_data.file_size,
+                        expected_hash=sha256
+                    )
                     
-                return True, "Мод успешно установлен"
+                    if not success:
+                        return False, f"Ошибка загрузки: {message}"
+                    
+                    if not sha256:
+                        # Без хэша в каталоге хранилище не используем
+                        return self.install_mod(mod_path=target_path)
+                    self._store_download(mod_data)
+                
+                new_filename = self._place_file(sha256=sha256, mod_data=mod_data)
+                return True, f"Мод установлен как {new_filename}" + self.describe_conflicts(new_filename)
             else:
                 return False, "Не указан путь к моду или информация о моде"
                 
         except Exception as e:
             return False, f"Ошибка при установке мода: {str(e)}"
     
+    def submit_install(self, mod_data: ModRecord,
+                       on_done: Optional[Callable[[Optional[DownloadJob], bool, str], None]] = None
+                       ) -> Optional[DownloadJob]:
+        """
+        Фоновая установка мода: загрузка ставится в очередь менеджера загрузок,
+        после неё файл устанавливается в папку аддонов
+        :param mod_data: Запись мода из каталога
+        :param on_done: Функция (задание, успех, сообщение), вызывается из рабочего потока
+        :return: Задание на загрузку (для прогресса и отмены) или None, если мод
+                 уже есть в хранилище и установлен сразу
+        """
+        if self.store.has(mod_data.file_hash):
+            success, message = self.install_mod(mod_data=mod_data)
+            if on_done:
+                on_done(None, success, message)
+            return None
+        
+        def on_downloaded(job: DownloadJob):
+            try:
+                if not job.success:
+                    success, message = False, f"Ошибка загрузки: {job.message}"
+                elif job.sha256:
+                    sha256 = self._store_download(mod_data)
+                    new_filename = self._place_file(sha256=sha256, mod_data=mod_data)
+                    success, message = True, f"Мод установлен как {new_filename}" + self.describe_conflicts(new_filename)
+                else:
+                    success, message = self.install_mod(mod_path=job.target_path)
+            except Exception as e:
+                success, message = False, f"Ошибка при установке мода: {str(e)}"
+            if on_done:
+                on_done(job, success, message)
+        
+        return self.download_manager.submit(
+            mod_data.drive_id,
+            self._get_download_path(mod_data),
+            mod_data.file_size,
+            on_downloaded,
+            mod_data.file_hash
+        )
+    
     def uninstall_mod(self, pak_filename: str) -> Tuple[bool, str]:
         """
         Удаление мода
+        Объединенный pak (merge_paks) так не удаляется - только uninstall_batch
         :param pak_filename: Имя pak файла (например, 'pak03_dir.vpk')
         :return: (успех, сообщение)
         """
@@ -117,13 +331,281 @@ class ModInstaller:
             
             if not os.path.exists(file_path):
                 return False, "Файл мода не найден"
-            
-            os.remove(file_path)
+
+            # Объединенный pak содержит несколько модов: удаление файла удалило бы их все
+            entry = self.manifest.get_entry(pak_filename) or {}
+            if entry.get('merged'):
+                mod_ids = [mod['mod_id'] for mod in entry['merged']]
+                return False, (f"Мод входит в объединенный pak {pak_filename} (моды: {', '.join(mod_ids)}), "
+                               f"удалить его отдельно нельзя")
+
+            self.commit_changes([], [pak_filename])
             return True, f"Мод {pak_filename} удален"
             
         except Exception as e:
             return False, f"Ошибка при удалении мода: {str(e)}"
     
+    def install_batch(self, mods: List[ModRecord]) -> Tuple[bool, str]:
+        """
+        Установка нескольких модов одной транзакцией
+        Сначала все недостающие файлы параллельно загружаются в хранилище,
+        затем моды размещаются в папке аддонов: либо все, либо ни один
+        :param mods: Записи модов из каталога (уже установленные пропускаются)
+        :return: (успех, сообщение)
+        """
+        # Один мод - один слот, даже если он передан несколько раз
+        unique = {}
+        for mod in mods:
+            if not self.is_mod_installed(mod.id):
+                unique.setdefault(mod.id, mod)
+        mods = list(unique.values())
+        if not mods:
+            return True, "Все выбранные моды уже установлены"
+        
+        try:
+            # Загрузка того, чего нет в хранилище
+            jobs = {}
+            for mod in mods:
+                if not self.store.has(mod.file_hash):
+                    jobs[mod.id] = self.download_manager.submit(
+                        mod.drive_id,
+                        self._get_download_path(mod),
+                        mod.file_size,
+                        sha256=mod.file_hash
+                    )
+            self.download_manager.wait(list(jobs.values()))
+            
+            failed = [mod.title for mod in mods if mod.id in jobs and not jobs[mod.id].success]
+            if failed:
+                return False, f"Ошибка загрузки: {', '.join(failed)}. Ничего не установлено"
+            
+            adds = []
+            for mod in mods:
+                if mod.file_hash:
+                    if mod.id in jobs:
+                        self._store_download(mod)
+                    adds.append({'sha256': mod.file_hash, 'mod_data': mod})
+                else:
+                    # Без хэша в каталоге хранилище не используем
+                    adds.append({'mod_path': jobs[mod.id].target_path, 'mod_data': mod})
+            
+            slots = self.commit_changes(adds, [])
+            return True, f"Установлено модов: {len(slots)}"
+            
+        except Exception as e:
+            return False, f"Ошибка при установке модов (изменения отменены): {str(e)}"
+    
+    def uninstall_batch(self, pak_filenames: List[str]) -> Tuple[bool, str]:
+        """
+        Удаление нескольких модов одной транзакцией
+        :param pak_filenames: Имена pak файлов
+        :return: (успех, сообщение)
+        """
+        try:
+            for pak_filename in pak_filenames:
+                if not PAK_PATTERN.fullmatch(pak_filename):
+                    return False, f"Неверное имя pak файла: {pak_filename}"
+                if not os.path.exists(os.path.join(self.game_path, pak_filename)):
+                    return False, f"Файл мода не найден: {pak_filename}"
+            
+            self.commit_changes([], pak_filenames)
+            return True, f"Удалено модов: {len(pak_filenames)}"
+            
+        except Exception as e:
+            return False, f"Ошибка при удалении модов (изменения отменены): {str(e)}"
+    
+    @staticmethod
+    def validate_vpk(path: str) -> Tuple[bool, str]:
+        """
+        Проверка VPK перед установкой: заголовок, дерево каталога и то, что
+        данные лежат в самом файле (pak файл аддонов не может ссылаться на _000.vpk)
+        :param path: Путь к файлу
+        :return: (успех, сообщение)
+        """
+        try:
+            with VpkReader(path) as reader:
+                if not reader.is_single_file():
+                    return False, "VPK ссылается на внешние архивы данных и не может быть установлен как аддон"
+                if reader.verify_checksums() is False:
+                    return False, "Контрольная сумма каталога VPK не совпадает"
+                return True, f"Файлов в VPK: {len(reader)}"
+        except (OSError, ValueError) as e:
+            return False, f"Файл не является VPK файлом: {str(e)}"
+    
+    def get_pak_contents(self, pak_filename: str) -> List[VpkEntry]:
+        """
+        Содержимое установленного pak файла (только каталог, данные не читаются)
+        :param pak_filename: Имя pak файла
+        :return: Записи файлов внутри VPK
+        :raises ValueError: Если файл не является VPK
+        """
+        with VpkReader(os.path.join(self.game_path, pak_filename)) as reader:
+            return list(reader.entries)
+    
+    def merge_paks(self, pak_filenames: List[str]) -> Tuple[bool, str]:
+        """
+        Объединение нескольких установленных pak файлов в один
+        Совпадающие пути разрешаются так же, как их разрешает игра: побеждает
+        pak с меньшим номером. Объединенный файл занимает номер первого из
+        исходных, исходные удаляются той же транзакцией. Моды каталога
+        остаются установленными (в манифесте они перечислены в merged)
+        :param pak_filenames: Имена pak файлов
+        :return: (успех, сообщение)
+        """
+        order = [name for name in self.get_slot_order() if name in set(pak_filenames)]
+        missing = [name for name in pak_filenames if name not in order]
+        if missing:
+            return False, f"Файл мода не найден: {', '.join(missing)}"
+        if len(order) < 2:
+            return False, "Для объединения нужно выбрать хотя бы два pak файла"
+        
+        merged = []
+        for pak_filename in order:
+            entry = self.manifest.get_entry(pak_filename) or {}
+            merged.extend(entry.get('merged', ()))
+            if entry.get('mod_id'):
+                merged.append({'mod_id': entry['mod_id'], 'version': entry.get('version')})
+        
+        temp_path = os.path.join(self.game_path, InstallTransaction.get_temp_name('merge'))
+        try:
+            stats = merge_vpks([os.path.join(self.game_path, name) for name in order], temp_path)
+            self.commit_changes([{
+                'source': temp_path,
+                'info': {'mod_id': None, 'version': None, 'sha256': None, 'merged': merged},
+                'slot': order[0]
+            }], order)
+            return True, (f"Объединено pak файлов: {len(order)} в {order[0]}; "
+                          f"файлов внутри: {stats['files']}, перекрыто: {stats['overridden']}")
+        except Exception as e:
+            return False, f"Ошибка при объединении модов (изменения отменены): {str(e)}"
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def refresh_conflicts(self) -> ConflictIndex:
+        """
+        Перестроение индекса пересечений по установленным pak файлам
+        Каталоги разбираются только у файлов, которых еще нет в кэше
+        :return: Индекс пересечений
+        """
+        paks = []
+        for pak_filename in self.get_slot_order():
+            entry = self.manifest.get_entry(pak_filename) or {}
+            paks.append((pak_filename, os.path.join(self.game_path, pak_filename), entry.get('hash')))
+        self.conflicts.build(paks)
+        return self.conflicts
+    
+    def describe_conflicts(self, pak_filename: str) -> str:
+        """
+        Описание пересечений pak файла с остальными установленными
+        :param pak_filename: Имя pak файла
+        :return: Текст для сообщения (пустая строка, если пересечений нет)
+        """
+        try:
+            self.refresh_conflicts()
+            contents = self.conflicts.get_contents(os.path.join(self.game_path, pak_filename),
+                                                   (self.manifest.get_entry(pak_filename) or {}).get('hash'))
+            overlaps = self.conflicts.find_overlaps(contents, exclude=pak_filename)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при проверке пересечений {pak_filename}: {e}")
+            return ""
+        if not overlaps:
+            return ""
+        own_number = int(PAK_PATTERN.fullmatch(pak_filename).group(1))
+        lines = []
+        for slot, paths in sorted(overlaps.items()):
+            winner = slot if int(PAK_PATTERN.fullmatch(slot).group(1)) < own_number else pak_filename
+            lines.append(f"{slot}: {len(paths)} файлов, загружается {winner}")
+        return "\nПересечения с другими модами:\n" + "\n".join(lines)
+    
+    def get_conflict_report(self) -> List[str]:
+        """
+        Список пересечений между установленными pak файлами
+        :return: Строки вида «pak01_dir.vpk перекрывает pak03_dir.vpk: 12 файлов (пример пути)»
+        """
+        self.refresh_conflicts()
+        report = []
+        for (winner, loser), paths in sorted(self.conflicts.get_pairs().items()):
+            report.append(f"{winner} перекрывает {loser}: {len(paths)} файлов ({paths[0]})")
+        return report
+    
+    def get_slot_order(self) -> List[str]:
+        """
+        Pak файлы папки аддонов в порядке номеров (порядок загрузки игрой)
+        :return: Имена pak файлов
+        """
+        if not os.path.exists(self.game_path):
+            return []
+        slots = []
+        with os.scandir(self.game_path) as it:
+            for entry in it:
+                match = PAK_PATTERN.fullmatch(entry.name)
+                if match:
+                    slots.append((int(match.group(1)), entry.name))
+        return [name for _, name in sorted(slots)]
+    
+    def _plan_slots(self, order: List[str]) -> Dict[str, str]:
+        """
+        Переименования, после которых pak файлы идут подряд с pak01 в заданном порядке
+        :param order: Имена pak файлов в нужном порядке
+        :return: Текущее имя -> новое (файлы, которые остаются на месте, не входят)
+        """
+        plan = {}
+        for number, pak_filename in enumerate(order, start=1):
+            target = self.get_pak_name(number)
+            if target != pak_filename:
+                plan[pak_filename] = target
+        return plan
+    
+    def reorder_slots(self, order: List[str]) -> Tuple[bool, str]:
+        """
+        Изменение порядка загрузки модов переименованием pak файлов (без копирования)
+        Файлы нумеруются подряд с pak01 в заданном порядке; файлы, не вошедшие
+        в order, идут следом в текущем порядке. Циклы (pak01 <-> pak02) проходят
+        через временные имена, манифест обновляется вместе с файлами
+        :param order: Имена pak файлов в нужном порядке
+        :return: (успех, сообщение)
+        """
+        try:
+            current = self.get_slot_order()
+            missing = [name for name in order if name not in current]
+            if missing:
+                return False, f"Файл мода не найден: {', '.join(missing)}"
+            if len(set(order)) != len(order):
+                return False, "Pak файл указан в порядке несколько раз"
+            
+            listed = set(order)
+            plan = self._plan_slots(list(order) + [name for name in current if name not in listed])
+            if not plan:
+                return True, "Порядок модов не изменился"
+            
+            self.commit_changes([], [], plan)
+            return True, f"Переименовано pak файлов: {len(plan)}"
+            
+        except Exception as e:
+            return False, f"Ошибка при изменении порядка модов (изменения отменены): {str(e)}"
+    
+    def reorder_mods(self, mod_ids: List[str]) -> Tuple[bool, str]:
+        """
+        Изменение порядка загрузки установленных модов каталога
+        :param mod_ids: ID модов в нужном порядке
+        :return: (успех, сообщение)
+        """
+        order = []
+        for mod_id in mod_ids:
+            pak_filename = self.get_installed_slot(mod_id)
+            if pak_filename is None:
+                return False, f"Мод {mod_id} не установлен"
+            order.append(pak_filename)
+        return self.reorder_slots(order)
+    
+    def compact_slots(self) -> Tuple[bool, str]:
+        """
+        Удаление пропусков в номерах pak файлов с сохранением порядка
+        :return: (успех, сообщение)
+        """
+        return self.reorder_slots([])
+    
     def get_installed_mods(self) -> list[str]:
         """
         Получение списка установленных модов
@@ -135,10 +617,75 @@ class ModInstaller:
         pattern = re.compile(r'pak\d+_dir\.vpk')
         return [f for f in os.listdir(self.game_path) if pattern.match(f)]
     
-    def is_mod_installed(self, pak_filename: str) -> bool:
+    def refresh_state(self) -> list[str]:
         """
-        Проверка установлен ли мод
-        :param pak_filename: Имя pak файла
+        Сверка манифеста установленных модов с папкой аддонов
+        Вызывается один раз при обновлении списка модов
+        :return: Список pak файлов, которых нет в манифесте
+        """
+        self.recover()
+        return self.manifest.reconcile(self.game_path)
+    
+    def adopt_paks(self, matches: List[Tuple[str, ModRecord, str, os.stat_result]]) -> List[Tuple[str, str]]:
+        """
+        Запись в манифест pak файлов, опознанных как моды каталога
+        Файлы не перемещаются; файл, изменившийся после подсчета хэша,
+        и мод, который уже установлен под другим pak файлом, пропускаются
+        :param matches: [(имя pak файла, запись каталога, хэш, stat при подсчете хэша)]
+        :return: [(имя pak файла, ID мода)] записанных файлов
+        """
+        with self._install_lock:
+            records = []
+            adopted = []
+            seen = set()
+            for pak_filename, mod_data, sha256, st in matches:
+                if mod_data.id in seen or self.manifest.is_installed(mod_data.id):
+                    continue
+                path = os.path.join(self.game_path, pak_filename)
+                try:
+                    current = os.stat(path)
+                except OSError:
+                    continue
+                if current.st_size != st.st_size or current.st_mtime_ns != st.st_mtime_ns:
+                    continue
+                seen.add(mod_data.id)
+                records.append({
+                    'slot': pak_filename,
+                    'path': path,
+                    'mod_id': mod_data.id,
+                    'version': mod_data.version,
+                    'sha256': sha256
+                })
+                adopted.append((pak_filename, mod_data.id))
+            if records:
+                self.manifest.apply_batch(records, [])
+            return adopted
+
+    def recover(self) -> None:
+        """
+        Завершение транзакции, прерванной сбоем (по журналу)
+        Незафиксированная откатывается, зафиксированная доводится до конца
+        """
+        with self._install_lock:
+            try:
+                transaction = InstallTransaction.recover()
+                if transaction is not None:
+                    self._apply_to_manifest(transaction)
+            except Exception as e:
+                print(f"Ошибка при восстановлении прерванной установки: {str(e)}")
+    
+    def get_installed_slot(self, mod_id: str) -> Optional[str]:
+        """
+        Pak файл, под которым установлен мод
+        :param mod_id: ID мода в каталоге
+        :return: Имя pak файла или None
+        """
+        return self.manifest.get_slot(mod_id)
+    
+    def is_mod_installed(self, mod_id: str) -> bool:
+        """
+        Проверка установлен ли мод (по манифесту, без обращения к диску)
+        :param mod_id: ID мода в каталоге
         :return: True если мод установлен
         """
-        return pak_filename in self.get_installed_mods()
+        return self.manifest.is_installed(mod_id)
@@ -0,0 +1,97 @@
+import sys
+from typing import Dict, Optional, Tuple
+
+class ModRecord:
+    # Порядок полей совпадает с порядком в to_tuple() / снимке каталога
+    __slots__ = (
+        'id', 'title', 'category', 'hero', 'type', 'author', 'last_updated', 'version',
+        'preview', 'video', 'description_en', 'description_ru',
+        'file_name', 'file_size', 'file_hash', 'drive_id', 'local_path'
+    )
+
+    def __init__(self, id: str, title: str = "", category: str = "", hero: Optional[str] = None,
+                 type: Optional[str] = None, author: str = "", last_updated: str = "",
+                 version: str = "", preview: Optional[str] = None, video: Optional[str] = None,
+                 description_en: str = "", description_ru: str = "", file_name: str = "",
+                 file_size: int = 0, file_hash: Optional[str] = None, drive_id: Optional[str] = None,
+                 local_path: Optional[str] = None):
+        """
+        Запись о моде из каталога
+        Вложенные словари mods.json (media, descriptions, file) развернуты в поля.
+        Часто повторяющиеся строки (категория, герой, тип, автор, версия, дата)
+        интернируются, поэтому у всех модов это одни и те же объекты
+        """
+        self.id = id
+        self.title = title
+        self.category = _intern(category)
+        self.hero = _intern(hero)
+        self.type = _intern(type)
+        self.author = _intern(author)
+        self.last_updated = _intern(last_updated)
+        self.version = _intern(version)
+        self.preview = preview
+        self.video = video
+        self.description_en = description_en
+        self.description_ru = description_ru
+        self.file_name = file_name
+        self.file_size = file_size
+        self.file_hash = file_hash
+        self.drive_id = drive_id
+        self.local_path = local_path
+
+    @classmethod
+    def from_dict(cls, mod_id: str, data: Dict) -> 'ModRecord':
+        """
+        Запись из элемента mods.json
+        :param mod_id: Ключ мода в каталоге
+        :param data: Информация о моде
+        :return: Запись
+        """
+        media = data.get('media') or {}
+        descriptions = data.get('descriptions') or {}
+        file_info = data.get('file') or {}
+        return cls(
+            mod_id,
+            data.get('title') or "",
+            data.get('category') or "",
+            data.get('hero'),
+            data.get('type'),
+            data.get('author') or "",
+            data.get('last_updated') or "",
+            data.get('version') or "",
+            media.get('preview'),
+            media.get('video'),
+            descriptions.get('en') or "",
+            descriptions.get('ru') or "",
+            file_info.get('name') or "",
+            file_info.get('size') or 0,
+            file_info.get('hash'),
+            file_info.get('drive_id'),
+            file_info.get('local_path')
+        )
+
+    def to_tuple(self) -> Tuple:
+        """Значения полей в порядке __slots__ (для снимка каталога)"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: Tuple) -> 'ModRecord':
+        """Запись из значений, сохраненных to_tuple()"""
+        return cls(*values)
+
+    def get_description(self, language: str = 'ru') -> str:
+        """
+        Описание мода на нужном языке (если его нет - на другом)
+        :param language: 'ru' или 'en'
+        """
+        if language == 'en':
+            return self.description_en or self.description_ru
+        return self.description_ru or self.description_en
+
+    def __repr__(self) -> str:
+        return f"ModRecord({self.id!r}, {self.title!r})"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Интернирование строки (None и пустая строка остаются как есть)"""
+    return sys.intern(value) if value else value
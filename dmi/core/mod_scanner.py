@@ -1,6 +1,11 @@
 import os
 import json
-from typing import Dict, List
+import hashlib
+from typing import Dict, List, Tuple
+from .catalog_snapshot import CatalogSnapshot
+from .facet_index import FacetIndex
+from .mod_record import ModRecord
+from .search_index import SearchIndex
 
 class ModScanner:
     def __init__(self, base_path: str):
@@ -10,39 +15,57 @@ class ModScanner:
         """
         self.base_path = base_path
         self.mods_json_path = os.path.join(base_path, 'data', 'mods.json')
+        self.categories_json_path = os.path.join(base_path, 'data', 'categories.json')
+        self.heroes_json_path = os.path.join(base_path, 'data', 'heroes.json')
         self.mods_data = {}
         self.categories = set()
         self.heroes = set()
+        self.search_index = SearchIndex()
+        self.facet_index = FacetIndex()
+        self.snapshot = CatalogSnapshot()
+    
+    def load_catalog(self) -> Tuple[Dict, List[ModRecord]]:
+        """
+        Загрузка каталога: из двоичного снимка, если mods.json не менялся,
+        иначе разбор JSON и сохранение нового снимка
+        :return: (поля каталога кроме mods, записи модов в порядке каталога)
+        """
+        cached = self.snapshot.load(self.mods_json_path)
+        if cached is not None:
+            return cached
+        
+        with open(self.mods_json_path, 'rb') as f:
+            content = f.read()
+        catalog = json.loads(content)
+        
+        records = [ModRecord.from_dict(mod_id, mod_info)
+                   for mod_id, mod_info in catalog.pop("mods", {}).items()]
+        self.snapshot.save(self.mods_json_path, hashlib.sha256(content).hexdigest(), catalog, records)
+        return catalog, records
     
     def scan_mods(self) -> Dict:
         """
         Загрузка информации о модах из mods.json
-        :return: Словарь с информацией о модах
+        :return: Словарь каталога, в "mods" - список ModRecord
         """
         try:
-            with open(self.mods_json_path, 'r', encoding='utf-8') as f:
-                self.mods_data = json.load(f)
+            fields, records = self.load_catalog()
+            self.mods_data = dict(fields)
+            self.mods_data["mods"] = records
             
-            # Преобразуем словарь модов в список для удобства
-            mods_list = []
-            for mod_id, mod_info in self.mods_data.get("mods", {}).items():
-                # Добавляем id в информацию о моде
-                mod_info["id"] = mod_id
-                mods_list.append(mod_info)
-                
-                # Собираем категории и героев
-                if "category" in mod_info:
-                    self.categories.add(mod_info["category"])
-                if "hero" in mod_info:
-                    self.heroes.add(mod_info["hero"])
-            
-            # Заменяем словарь модов на список
-            self.mods_data["mods"] = mods_list
+            # Собираем категории и героев
+            self.categories = {mod.category for mod in records if mod.category}
+            self.heroes = {mod.hero for mod in records if mod.hero}
             
         except Exception as e:
             print(f"Ошибка при загрузке модов: {str(e)}")
             self.mods_data = {"mods": []}
         
+        # Поисковый индекс и индекс фасетов строятся один раз на загрузку каталога,
+        # позиции в индексах совпадают с порядком модов в списке
+        self.search_index.build(self.mods_data["mods"])
+        self.facet_index.build(self.mods_data["mods"])
+        
         return self.mods_data
     
     def get_categories(self) -> List[str]:
@@ -59,36 +82,62 @@ class ModScanner:
         """
         return sorted(list(self.heroes))
     
-    def filter_mods(self, query: str = "", category: str = "") -> List[Dict]:
+    def get_display_names(self, language: str = 'ru') -> Dict[str, Dict[str, str]]:
+        """
+        Названия значений фасетов из data/categories.json и data/heroes.json
+        :param language: Язык названий
+        :return: Фасет -> значение -> название (значений без названия в словаре нет)
+        """
+        names = {'category': {}, 'subcategory': {}, 'hero': {}}
+        try:
+            with open(self.categories_json_path, 'r', encoding='utf-8') as f:
+                categories = json.load(f).get('categories', {})
+            for category_id, category in categories.items():
+                names['category'][category_id] = self._display_name(category, language, category_id)
+                for sub_id, sub in (category.get('subcategories') or {}).items():
+                    names['subcategory'][sub_id] = self._display_name(sub, language, sub_id)
+            
+            with open(self.heroes_json_path, 'r', encoding='utf-8') as f:
+                heroes = json.load(f).get('heroes', {})
+            for hero_id, hero in heroes.items():
+                names['hero'][hero_id] = self._display_name(hero, language, hero_id)
+        except Exception as e:
+            print(f"Ошибка при загрузке названий категорий и героев: {str(e)}")
+        
+        # В каталоге встречаются id через дефис ("post-processing" при "post_processing" в categories.json)
+        for facet in names:
+            for value, name in list(names[facet].items()):
+                names[facet].setdefault(value.replace('_', '-'), name)
+        return names
+    
+    @staticmethod
+    def _display_name(item: Dict, language: str, default: str) -> str:
+        """Название на нужном языке или английское"""
+        display_name = item.get('display_name') or {}
+        return display_name.get(language) or display_name.get('en') or default
+    
+    def filter_mods(self, query: str = "", category: str = "") -> List[ModRecord]:
         """
         Фильтрация модов по запросу и категории
         :param query: Поисковый запрос
         :param category: Категория для фильтрации
         :return: Отфильтрованный список модов
         """
-        filtered_mods = []
-        query = query.lower()
+        mods = self.mods_data.get('mods', [])
         
-        for mod in self.mods_data.get('mods', []):
-            # Фильтр по категории
-            if category and category != "Все":
-                if mod.get('category') != category:
-                    continue
-            
-            # Фильтр по поиску
-            if query:
-                title = mod.get('title', '').lower()
-                desc = mod.get('descriptions', {}).get('ru', '').lower()
-                author = mod.get('author', '').lower()
-                hero = mod.get('hero', '').lower()
-                
-                if not (query in title or query in desc or 
-                       query in author or query in hero):
-                    continue
-            
-            filtered_mods.append(mod)
+        # Фильтр по поиску через индекс, результаты по релевантности
+        positions = self.search_index.search_positions(query)
+        if positions is None:
+            positions = range(len(mods))
+            ranked = positions
+        else:
+            ranked = self.search_index.rank_positions(positions, query)
         
-        return filtered_mods
+        # Фильтр по категории через маску фасета
+        if category and category != "Все":
+            allowed = self.facet_index.bits_to_positions(self.facet_index.get_bits('category', category))
+            return [mods[p] for p in ranked if p in allowed]
+        return [mods[p] for p in ranked]
 
 if __name__ == '__main__':
     # Пример использования
@@ -0,0 +1,74 @@
+import os
+from typing import Dict, List, Tuple
+from .hash_cache import HashCache, file_sha256
+from .mod_installer import ModInstaller
+from .mod_record import ModRecord
+
+class PakAdopter:
+    def __init__(self, mod_installer: ModInstaller, hash_cache: HashCache = None):
+        """
+        Распознавание pak файлов, установленных без программы (вручную или
+        другими установщиками), по хэшу содержимого из каталога
+        Хэшируются только файлы, размер которых совпадает с размером файла
+        какого-нибудь мода каталога; хэши берутся из HashCache, если файл не менялся
+        :param mod_installer: Установщик модов (папка аддонов и манифест)
+        :param hash_cache: Кэш хэшей. По умолчанию тот же, что у загрузчика установщика
+        """
+        self.mod_installer = mod_installer
+        self.hash_cache = hash_cache or mod_installer.drive.hash_cache
+
+    @staticmethod
+    def build_hash_index(mods: List[ModRecord]) -> Dict[str, ModRecord]:
+        """
+        Индекс file.hash -> мод
+        :param mods: Записи каталога
+        :return: {SHA-256 в нижнем регистре: запись}
+        """
+        return {mod.file_hash.lower(): mod for mod in mods if mod.file_hash}
+
+    def find_candidates(self, mods: List[ModRecord]) -> List[Tuple[str, os.stat_result]]:
+        """
+        Pak файлы без записи в манифесте, размер которых есть в каталоге
+        :param mods: Записи каталога
+        :return: [(имя pak файла, stat)]
+        """
+        sizes = {mod.file_size for mod in mods if mod.file_hash and mod.file_size}
+        candidates = []
+        for pak_filename in list(self.mod_installer.manifest.untracked):
+            try:
+                st = os.stat(os.path.join(self.mod_installer.game_path, pak_filename))
+            except OSError:
+                continue
+            if st.st_size in sizes:
+                candidates.append((pak_filename, st))
+        return candidates
+
+    def adopt(self, mods: List[ModRecord]) -> List[Tuple[str, str]]:
+        """
+        Поиск модов каталога среди pak файлов без записи в манифесте
+        и запись найденных в манифест
+        Вызывается в фоновом потоке: файлы могут читаться целиком
+        :param mods: Записи каталога
+        :return: [(имя pak файла, ID мода)]
+        """
+        by_hash = self.build_hash_index(mods)
+        matches = []
+        for pak_filename, st in self.find_candidates(mods):
+            path = os.path.join(self.mod_installer.game_path, pak_filename)
+            try:
+                sha256 = self.hash_cache.get(path, st)
+                if sha256 is None:
+                    sha256 = file_sha256(path)
+                    self.hash_cache.put(path, sha256, st, save=False)
+            except OSError as e:
+                print(f"Ошибка при чтении {pak_filename}: {e}")
+                continue
+            mod = by_hash.get(sha256)
+            if mod is not None and mod.file_size == st.st_size:
+                matches.append((pak_filename, mod, sha256, st))
+        try:
+            self.hash_cache.flush()
+        except OSError as e:
+            # Без кэша хэши просто посчитаются заново при следующем запуске
+            print(f"Ошибка при сохранении кэша хэшей: {e}")
+        return self.mod_installer.adopt_paks(matches)
@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+from .hash_cache import HashCache
+from .http_client import HttpClient, get_http_client
+
+if TYPE_CHECKING:
+    import requests
+
+class ResumableDownloader:
+    # Размер чанка при чтении ответа
+    CHUNK_SIZE = 64 * 1024
+    # Как часто сохранять состояние загрузки (байты / секунды)
+    STATE_SAVE_BYTES = 4 * 1024 * 1024
+    STATE_SAVE_INTERVAL = 2.0
+    # Сколько раз качать файл заново, если не совпал размер или хэш
+    VERIFY_ATTEMPTS = 2
+
+    def __init__(self, hash_cache: HashCache = None):
+        """
+        Загрузчик с докачкой: данные пишутся в <target>.part, рядом лежит
+        <target>.part.json с числом полученных байт и валидаторами ответа
+        (ETag / Last-Modified). Повторная загрузка продолжает файл запросом
+        Range, а если сервер докачку не поддерживает - начинает заново.
+        :param hash_cache: Кэш, в который записываются проверенные хэши файлов
+        """
+        self.hash_cache = hash_cache
+
+    @staticmethod
+    def get_part_paths(target_path: str) -> Tuple[str, str]:
+        """
+        Пути к временному файлу и файлу состояния загрузки
+        :param target_path: Итоговый путь файла
+        :return: (путь .part, путь .part.json)
+        """
+        part_path = target_path + '.part'
+        return part_path, part_path + '.json'
+
+    def download(self, url: str, target_path: str,
+                 progress_callback: Optional[Callable[[float], None]] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 http_client: HttpClient = None,
+                 resume_key: str = None,
+                 expected_size: int = None,
+                 expected_hash: str = None) -> Tuple[bool, str]:
+        """
+        Загрузка файла с поддержкой докачки
+        :param url: Адрес файла
+        :param target_path: Путь для сохранения
+        :param progress_callback: Функция для отображения прогресса (в процентах)
+        :param cancel_event: Событие отмены, проверяется между чанками
+        :param http_client: HTTP клиент (по умолчанию общий клиент программы)
+        :param resume_key: Идентификатор файла для докачки, если url от запуска
+                           к запуску меняется (по умолчанию сам url)
+        :param expected_size: Ожидаемый размер файла в байтах
+        :param expected_hash: Ожидаемый SHA-256 файла. Хэш считается по ходу
+                              записи чанков, без повторного чтения файла
+        :return: (успех, сообщение)
+        """
+        part_path, state_path = self.get_part_paths(target_path)
+        os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+        http_client = http_client or get_http_client()
+        resume_key = resume_key or url
+        expected_hash = expected_hash.lower() if expected_hash else None
+
+        message = ""
+        for _ in range(self.VERIFY_ATTEMPTS):
+            success, message, hasher = self._attempt(
+                url, target_path, http_client, resume_key,
+                progress_callback, cancel_event, expected_hash is not None
+            )
+            if not success:
+                return False, message
+
+            success, message = self._verify(part_path, hasher, expected_size, expected_hash)
+            if success:
+                os.replace(part_path, target_path)
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                if expected_hash and self.hash_cache is not None:
+                    self.hash_cache.put(target_path, expected_hash.lower())
+                return True, "Файл успешно загружен"
+
+            # Файл поврежден - выбрасываем его и качаем заново с нуля
+            self._discard(part_path, state_path)
+
+        return False, message
+
+    def _attempt(self, url: str, target_path: str, http_client: HttpClient,
+                 resume_key: str, progress_callback, cancel_event,
+                 compute_hash: bool) -> Tuple[bool, str, Any]:
+        """
+        Одна попытка загрузки в .part файл (с докачкой, если возможно)
+        :return: (успех, сообщение, хэшер содержимого .part или None)
+        """
+        part_path, state_path = self.get_part_paths(target_path)
+        state = self._load_state(state_path, part_path, resume_key)
+        offset = state['downloaded']
+
+        headers = {}
+        validator = state.get('etag') or state.get('last_modified')
+        if offset > 0:
+            headers['Range'] = f"bytes={offset}-"
+            # If-Range: сервер отдаст остаток только если файл не изменился,
+            # иначе вернет весь файл с кодом 200
+            if validator:
+                headers['If-Range'] = validator
+
+        response = http_client.get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 416 and offset > 0:
+                # Запрошенный диапазон за концом файла: либо всё уже скачано,
+                # либо файл на сервере стал короче
+                if state.get('total') and offset == state['total']:
+                    hasher = self._hash_part(part_path) if compute_hash else None
+                    return True, "", hasher
+                return self._restart(url, target_path, http_client, resume_key,
+                                     progress_callback, cancel_event, compute_hash, response)
+
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                if not self._can_resume(response, state, offset):
+                    # Пришел не тот диапазон - докачка невозможна
+                    return self._restart(url, target_path, http_client, resume_key,
+                                         progress_callback, cancel_event, compute_hash, response)
+                mode = 'ab'
+                # Состояние хэшера между запусками не сохранить,
+                # поэтому уже скачанную часть дочитываем с диска
+                hasher = self._hash_part(part_path) if compute_hash else None
+            else:
+                # Сервер вернул файл целиком - начинаем заново
+                offset = 0
+                mode = 'wb'
+                hasher = hashlib.sha256() if compute_hash else None
+                state = {
+                    'key': resume_key,
+                    'downloaded': 0,
+                    'total': int(response.headers.get('content-length', 0)) or None,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'accept_ranges': response.headers.get('Accept-Ranges', 'bytes') != 'none'
+                }
+                self._save_state(state_path, state)
+
+            success, message = self._stream(response, part_path, state_path, state, offset,
+                                            mode, hasher, progress_callback, cancel_event)
+            return success, message, hasher
+        finally:
+            response.close()
+
+    def _restart(self, url: str, target_path: str, http_client: HttpClient,
+                 resume_key: str, progress_callback, cancel_event, compute_hash: bool,
+                 response: 'requests.Response') -> Tuple[bool, str, Any]:
+        """Сброс .part файла и загрузка с нуля"""
+        response.close()
+        self._discard(*self.get_part_paths(target_path))
+        return self._attempt(url, target_path, http_client, resume_key,
+                             progress_callback, cancel_event, compute_hash)
+
+    def _verify(self, part_path: str, hasher, expected_size: Optional[int],
+                expected_hash: Optional[str]) -> Tuple[bool, str]:
+        """
+        Проверка размера и хэша скачанного файла
+        :return: (совпадает, сообщение)
+        """
+        if expected_size:
+            size = os.path.getsize(part_path)
+            if size != expected_size:
+                return False, f"Размер файла не совпадает: {size} вместо {expected_size} байт"
+        if expected_hash and hasher.hexdigest() != expected_hash:
+            return False, "Контрольная сумма SHA-256 не совпадает"
+        return True, ""
+
+    def _hash_part(self, part_path: str) -> Any:
+        """Хэшер, уже заполненный содержимым .part файла"""
+        hasher = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for block in iter(lambda: f.read(HashCache.BLOCK_SIZE), b''):
+                hasher.update(block)
+        return hasher
+
+    def _can_resume(self, response: 'requests.Response', state: Dict, offset: int) -> bool:
+        """
+        Проверка, что ответ 206 действительно продолжает наш .part файл
+        :param response: Ответ сервера
+        :param state: Сохраненное состояние загрузки
+        :param offset: Сколько байт уже скачано
+        :return: True если можно дописывать в .part
+        """
+        content_range = response.headers.get('Content-Range', '')
+        # Формат: bytes <start>-<end>/<total>
+        try:
+            unit, spec = content_range.split(' ', 1)
+            byte_range, total = spec.split('/', 1)
+            start = int(byte_range.split('-', 1)[0])
+        except ValueError:
+            return False
+        if unit != 'bytes' or start != offset:
+            return False
+        if total != '*' and state.get('total') and int(total) != state['total']:
+            return False
+        # Без валидаторов докачиваем только если совпал полный размер
+        if not (state.get('etag') or state.get('last_modified')):
+            return bool(state.get('total')) and total != '*'
+        return True
+
+    def _stream(self, response: 'requests.Response', part_path: str, state_path: str,
+                state: Dict, offset: int, mode: str, hasher,
+                progress_callback, cancel_event) -> Tuple[bool, str]:
+        """Запись тела ответа в .part файл с периодическим сохранением состояния"""
+        total = state.get('total') or 0
+        downloaded = offset
+        saved_at = downloaded
+        saved_time = time.monotonic()
+
+        with open(part_path, mode) as f:
+            try:
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        self._checkpoint(f, state_path, state, downloaded)
+                        return False, "Загрузка отменена"
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    downloaded += len(chunk)
+
+                    if (downloaded - saved_at >= self.STATE_SAVE_BYTES or
+                            time.monotonic() - saved_time >= self.STATE_SAVE_INTERVAL):
+                        self._checkpoint(f, state_path, state, downloaded)
+                        saved_at = downloaded
+                        saved_time = time.monotonic()
+
+                    if progress_callback and total:
+                        progress_callback(downloaded / total * 100)
+            except Exception:
+                # Сохраняем то, что успели получить, чтобы докачать позже
+                self._checkpoint(f, state_path, state, downloaded)
+                raise
+
+            self._checkpoint(f, state_path, state, downloaded)
+
+        if total and downloaded != total:
+            return False, f"Загрузка прервана: получено {downloaded} из {total} байт"
+
+        return True, ""
+
+    def _checkpoint(self, f, state_path: str, state: Dict, downloaded: int) -> None:
+        """Сброс данных на диск и сохранение числа полученных байт"""
+        f.flush()
+        state['downloaded'] = downloaded
+        self._save_state(state_path, state)
+
+    def _load_state(self, state_path: str, part_path: str, resume_key: str) -> Dict:
+        """
+        Загрузка состояния прерванной загрузки
+        :return: Состояние; downloaded == 0 если докачивать нечего
+        """
+        empty = {'key': resume_key, 'downloaded': 0}
+        if not os.path.exists(part_path) or not os.path.exists(state_path):
+            self._discard(part_path, state_path)
+            return empty
+
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            self._discard(part_path, state_path)
+            return empty
+
+        if state.get('key') != resume_key or not state.get('accept_ranges', True):
+            self._discard(part_path, state_path)
+            return empty
+
+        # В .part могло попасть больше данных, чем успели отметить в состоянии
+        downloaded = min(int(state.get('downloaded', 0)), os.path.getsize(part_path))
+        with open(part_path, 'r+b') as f:
+            f.truncate(downloaded)
+        state['downloaded'] = downloaded
+        return state
+
+    def _save_state(self, state_path: str, state: Dict) -> None:
+        """Атомарное сохранение состояния загрузки"""
+        temp_path = state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, state_path)
+
+    def _discard(self, part_path: str, state_path: str) -> None:
+        """Удаление незавершенной загрузки"""
+        for path in (part_path, state_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,202 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .mod_record import ModRecord
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def normalize(text: Optional[str]) -> str:
+    """
+    Приведение текста к виду для поиска: нижний регистр, ё -> е,
+    слова через один пробел без знаков препинания
+    :param text: Исходный текст
+    :return: Нормализованный текст
+    """
+    if not text:
+        return ""
+    return " ".join(_TOKEN_RE.findall(text.lower().replace('ё', 'е')))
+
+
+class SearchIndex:
+    # Поля мода и их вес при ранжировании результатов
+    FIELD_WEIGHTS = (
+        ('title', 4),
+        ('hero', 2),
+        ('author', 2),
+        ('description', 1)
+    )
+    # Сколько результатов ранжировать; более широкие запросы отдаются в порядке каталога
+    RANK_LIMIT = 500
+    # Сколько последних слов запроса помнить (набор текста по буквам)
+    TERM_CACHE_SIZE = 256
+
+    def __init__(self):
+        """
+        Поисковый индекс каталога модов
+        Строится один раз при загрузке каталога: словарь слов каталога,
+        для каждого слова - позиции модов, где оно встречается, и n-граммы
+        (1-3 символа) поверх словаря. Слово запроса ищется как подстрока среди
+        слов словаря, а не среди модов, поэтому запрос сводится к объединению
+        и пересечению множеств позиций
+        """
+        self.mod_ids: List[str] = []
+        # Нормализованные поля каждого мода (для ранжирования)
+        self._fields: List[Tuple[str, ...]] = []
+        # Словарь слов каталога и позиции модов для каждого слова
+        self._tokens: List[str] = []
+        self._postings: List[Set[int]] = []
+        # n-грамма -> номера слов словаря
+        self._ngrams: Dict[str, Set[int]] = {}
+        self._term_cache: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.mod_ids)
+
+    @staticmethod
+    def _mod_fields(mod: ModRecord) -> Tuple[str, ...]:
+        """Нормализованные поля мода в порядке FIELD_WEIGHTS"""
+        return (
+            normalize(mod.title),
+            normalize(mod.hero),
+            normalize(mod.author),
+            normalize(f"{mod.description_ru} {mod.description_en}")
+        )
+
+    @staticmethod
+    def _ngrams_of(text: str):
+        """Все n-граммы длиной 1-3 символа"""
+        for n in (1, 2, 3):
+            for i in range(len(text) - n + 1):
+                yield text[i:i + n]
+
+    def build(self, mods: Iterable[ModRecord]) -> None:
+        """
+        Построение индекса
+        :param mods: Записи модов каталога
+        """
+        self.mod_ids = []
+        self._fields = []
+        token_numbers: Dict[str, int] = {}
+        postings: List[Set[int]] = []
+
+        for position, mod in enumerate(mods):
+            fields = self._mod_fields(mod)
+            self.mod_ids.append(mod.id)
+            self._fields.append(fields)
+
+            for token in set(_TOKEN_RE.findall(" ".join(fields))):
+                number = token_numbers.get(token)
+                if number is None:
+                    number = token_numbers[token] = len(postings)
+                    postings.append(set())
+                postings[number].add(position)
+
+        ngrams: Dict[str, Set[int]] = {}
+        for token, number in token_numbers.items():
+            for ngram in set(self._ngrams_of(token)):
+                numbers = ngrams.get(ngram)
+                if numbers is None:
+                    ngrams[ngram] = {number}
+                else:
+                    numbers.add(number)
+
+        self._tokens = list(token_numbers)
+        self._postings = postings
+        self._ngrams = ngrams
+        self._term_cache = {}
+
+    def _term_positions(self, term: str) -> Set[int]:
+        """
+        Позиции модов, в словах которых встречается слово запроса
+        :param term: Нормализованное слово запроса
+        :return: Множество позиций
+        """
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        if len(term) <= 3:
+            # n-грамма совпадает со словом запроса - проверка не нужна
+            numbers = self._ngrams.get(term, set())
+        else:
+            lists = []
+            for i in range(len(term) - 2):
+                trigram_numbers = self._ngrams.get(term[i:i + 3])
+                if not trigram_numbers:
+                    lists = []
+                    break
+                lists.append(trigram_numbers)
+            numbers = set()
+            if lists:
+                lists.sort(key=len)
+                numbers = set(lists[0]).intersection(*lists[1:])
+                # Триграммы дают кандидатов; проверяем вхождение по словарю, а не по модам
+                tokens = self._tokens
+                numbers = {n for n in numbers if term in tokens[n]}
+
+        positions = set()
+        for number in numbers:
+            positions |= self._postings[number]
+
+        if len(self._term_cache) >= self.TERM_CACHE_SIZE:
+            self._term_cache.clear()
+        self._term_cache[term] = positions
+        return positions
+
+    def search_positions(self, query: str) -> Optional[Set[int]]:
+        """
+        Позиции модов, подходящих под запрос
+        :param query: Поисковый запрос
+        :return: Множество позиций или None, если запрос пустой (подходят все)
+        """
+        terms = set(_TOKEN_RE.findall(normalize(query)))
+        if not terms:
+            return None
+
+        result = None
+        # Начинаем с самых длинных (обычно самых редких) слов
+        for term in sorted(terms, key=len, reverse=True):
+            positions = self._term_positions(term)
+            result = set(positions) if result is None else result & positions
+            if not result:
+                return set()
+        return result
+
+    def search(self, query: str) -> List[str]:
+        """
+        Поиск модов
+        Мод подходит, если каждое слово запроса встречается как часть слова
+        в названии, герое, авторе или описании (ru/en)
+        :param query: Поисковый запрос
+        :return: ID модов; по релевантности, если результатов не больше RANK_LIMIT,
+                 иначе в порядке каталога
+        """
+        positions = self.search_positions(query)
+        if positions is None:
+            return list(self.mod_ids)
+        mod_ids = self.mod_ids
+        return [mod_ids[position] for position in self.rank_positions(positions, query)]
+
+    def rank_positions(self, positions: Set[int], query: str) -> List[int]:
+        """
+        Упорядочивание найденных модов
+        :param positions: Позиции из search_positions
+        :param query: Поисковый запрос
+        :return: Позиции по релевантности, если их не больше RANK_LIMIT,
+                 иначе в порядке каталога
+        """
+        if len(positions) > self.RANK_LIMIT:
+            return sorted(positions)
+        terms = set(_TOKEN_RE.findall(normalize(query)))
+        return sorted(positions, key=lambda position: (-self._score(position, terms), position))
+
+    def _score(self, position: int, terms: Iterable[str]) -> int:
+        """Релевантность мода: сумма весов полей, в которых встретились слова запроса"""
+        score = 0
+        fields = self._fields[position]
+        for term in terms:
+            for (_, weight), text in zip(self.FIELD_WEIGHTS, fields):
+                if term in text:
+                    score += weight
+            if fields[0].startswith(term):
+                score += 1
+        return score
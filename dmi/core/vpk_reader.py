@@ -0,0 +1,273 @@
+import os
+import mmap
+import struct
+import hashlib
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+VPK_SIGNATURE = 0x55AA1234
+# Индекс архива для данных, лежащих в самом _dir.vpk после дерева
+DIR_ARCHIVE_INDEX = 0x7FFF
+ENTRY_TERMINATOR = 0xFFFF
+
+# Подпись и версия; дальше - размер дерева и (в v2) размеры остальных секций
+HEADER_V1 = struct.Struct('<III')
+HEADER_V2 = struct.Struct('<IIIIIII')
+# CRC32, размер preload, индекс архива, смещение, длина, терминатор
+ENTRY = struct.Struct('<IHHIIH')
+
+class VpkEntry:
+    """Файл внутри VPK"""
+
+    __slots__ = ('path', 'crc', 'preload_offset', 'preload_length', 'archive_index', 'offset', 'length')
+
+    def __init__(self, path: str, crc: int, preload_offset: int, preload_length: int,
+                 archive_index: int, offset: int, length: int):
+        self.path = path
+        self.crc = crc
+        # Смещение preload данных в _dir.vpk (они лежат сразу после записи в дереве)
+        self.preload_offset = preload_offset
+        self.preload_length = preload_length
+        self.archive_index = archive_index
+        # Смещение в архиве; для DIR_ARCHIVE_INDEX - от конца дерева
+        self.offset = offset
+        self.length = length
+
+    @property
+    def size(self) -> int:
+        """Полный размер файла"""
+        return self.preload_length + self.length
+
+    def __repr__(self) -> str:
+        return f"VpkEntry({self.path!r}, size={self.size}, crc={self.crc:08x})"
+
+class VpkReader:
+    def __init__(self, path: str):
+        """
+        Чтение VPK v1/v2 (формат Source / Source 2)
+        Файл отображается в память через mmap, разбирается только заголовок
+        и дерево каталога, секция данных не читается. Поэтому список файлов
+        даже большого pak получается за миллисекунды
+        :param path: Путь к _dir.vpk (или одиночному .vpk)
+        :raises ValueError: Если файл не является VPK или поврежден
+        """
+        self.path = path
+        self.version = 0
+        self.tree_offset = 0
+        self.tree_size = 0
+        self.data_offset = 0
+        self.data_size = 0
+        self.archive_md5_size = 0
+        self.other_md5_size = 0
+        self.signature_size = 0
+        self.entries: List[VpkEntry] = []
+        self._by_path: Optional[Dict[str, VpkEntry]] = None
+
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = self._map(self._file)
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _map(f) -> mmap.mmap:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_V1.size:
+            raise ValueError("Файл слишком мал для VPK")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _parse(self) -> None:
+        """Разбор заголовка и дерева каталога"""
+        data = self._mmap
+        signature, version, tree_size = HEADER_V1.unpack_from(data, 0)
+        if signature != VPK_SIGNATURE:
+            raise ValueError("Неверная подпись VPK")
+        if version == 1:
+            self.tree_offset = HEADER_V1.size
+        elif version == 2:
+            if len(data) < HEADER_V2.size:
+                raise ValueError("Заголовок VPK обрезан")
+            (_, _, _, self.data_size, self.archive_md5_size,
+             self.other_md5_size, self.signature_size) = HEADER_V2.unpack_from(data, 0)
+            self.tree_offset = HEADER_V2.size
+        else:
+            raise ValueError(f"Неподдерживаемая версия VPK: {version}")
+
+        self.version = version
+        self.tree_size = tree_size
+        self.data_offset = self.tree_offset + tree_size
+        if self.data_offset > len(data):
+            raise ValueError("Дерево каталога выходит за пределы файла")
+        if version == 2 and self.data_offset + self.data_size + self.archive_md5_size \
+                + self.other_md5_size + self.signature_size > len(data):
+            raise ValueError("Секции VPK выходят за пределы файла")
+
+        self.entries = list(self._iter_tree())
+
+    def _iter_tree(self) -> Iterator[VpkEntry]:
+        """
+        Обход дерева: расширение -> папка -> имя файла -> запись
+        Пустая строка завершает уровень; пробел означает пустое значение.
+        Дерево копируется из mmap целиком (оно мало по сравнению с данными),
+        поиск строк по bytes быстрее, чем по mmap
+        """
+        base = self.tree_offset
+        tree = self._mmap[base:self.data_offset]
+        end = len(tree)
+        unpack_from = ENTRY.unpack_from
+        entry_size = ENTRY.size
+        position = 0
+
+        def read_string() -> str:
+            nonlocal position
+            zero = tree.find(b'\0', position)
+            if zero < 0:
+                raise ValueError("Дерево каталога VPK повреждено")
+            value = tree[position:zero].decode('utf-8', 'replace')
+            position = zero + 1
+            return value
+
+        while True:
+            extension = read_string()
+            if not extension:
+                break
+            suffix = '' if extension == ' ' else '.' + extension
+            while True:
+                directory = read_string()
+                if not directory:
+                    break
+                prefix = '' if directory == ' ' else directory + '/'
+                while True:
+                    name = read_string()
+                    if not name:
+                        break
+                    if position + entry_size > end:
+                        raise ValueError("Дерево каталога VPK повреждено")
+                    crc, preload_length, archive_index, offset, length, terminator = \
+                        unpack_from(tree, position)
+                    if terminator != ENTRY_TERMINATOR:
+                        raise ValueError("Дерево каталога VPK повреждено")
+                    position += entry_size
+                    yield VpkEntry(prefix + name + suffix, crc, base + position, preload_length,
+                                   archive_index, offset, length)
+                    position += preload_length
+                    if position > end:
+                        raise ValueError("Дерево каталога VPK повреждено")
+
+    def close(self) -> None:
+        """Закрытие файла"""
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'VpkReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[VpkEntry]:
+        return iter(self.entries)
+
+    def get_paths(self) -> List[str]:
+        """Пути всех файлов внутри VPK"""
+        return [entry.path for entry in self.entries]
+
+    def get(self, path: str) -> Optional[VpkEntry]:
+        """
+        Запись файла по пути
+        :param path: Путь внутри VPK (разделитель /, регистр важен)
+        """
+        if self._by_path is None:
+            self._by_path = {entry.path: entry for entry in self.entries}
+        return self._by_path.get(path)
+
+    def get_total_size(self) -> int:
+        """Суммарный размер файлов внутри VPK"""
+        return sum(entry.size for entry in self.entries)
+
+    def is_single_file(self) -> bool:
+        """Все данные лежат в самом файле (так устроены pak файлы аддонов)"""
+        return all(entry.archive_index == DIR_ARCHIVE_INDEX or not entry.length
+                   for entry in self.entries)
+
+    def _get_archive_path(self, archive_index: int) -> str:
+        """Путь к архиву данных pakNN_XXX.vpk для многофайлового VPK"""
+        base = self.path[:-len('_dir.vpk')] if self.path.endswith('_dir.vpk') else self.path[:-len('.vpk')]
+        return f"{base}_{archive_index:03d}.vpk"
+
+    def read(self, entry: VpkEntry) -> bytes:
+        """
+        Чтение содержимого файла (preload + данные)
+        :param entry: Запись файла
+        :return: Содержимое
+        """
+        return b''.join(self.iter_chunks(entry))
+
+    def iter_chunks(self, entry: VpkEntry, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Содержимое файла частями, без чтения файла в память целиком
+        :param entry: Запись файла
+        :param chunk_size: Размер части
+        :return: Части содержимого (preload, затем данные)
+        """
+        if entry.preload_length:
+            yield self._mmap[entry.preload_offset:entry.preload_offset + entry.preload_length]
+        if not entry.length:
+            return
+        if entry.archive_index == DIR_ARCHIVE_INDEX:
+            start = self.data_offset + entry.offset
+            if start + entry.length > len(self._mmap):
+                raise ValueError(f"Данные {entry.path} выходят за пределы файла")
+            for position in range(start, start + entry.length, chunk_size):
+                yield self._mmap[position:min(position + chunk_size, start + entry.length)]
+            return
+        with open(self._get_archive_path(entry.archive_index), 'rb') as f:
+            f.seek(entry.offset)
+            remaining = entry.length
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError(f"Данные {entry.path} выходят за пределы архива")
+                remaining -= len(chunk)
+                yield chunk
+
+    def verify_crc(self, entry: VpkEntry) -> bool:
+        """Проверка CRC32 содержимого файла"""
+        crc = 0
+        for chunk in self.iter_chunks(entry):
+            crc = zlib.crc32(chunk, crc)
+        return crc & 0xFFFFFFFF == entry.crc
+
+    def verify_checksums(self) -> Optional[bool]:
+        """
+        Проверка MD5 дерева и секции MD5 архивов (только VPK v2)
+        :return: True/False или None, если контрольных сумм в файле нет
+        """
+        if self.version != 2 or self.other_md5_size < 48:
+            return None
+        md5_offset = self.data_offset + self.data_size
+        other_offset = md5_offset + self.archive_md5_size
+        tree_md5 = self._mmap[other_offset:other_offset + 16]
+        archive_md5 = self._mmap[other_offset + 16:other_offset + 32]
+        return (hashlib.md5(self._mmap[self.tree_offset:self.data_offset]).digest() == tree_md5
+                and hashlib.md5(self._mmap[md5_offset:other_offset]).digest() == archive_md5)
+
+def is_vpk(path: str) -> bool:
+    """
+    Проверка, что файл - VPK с неповрежденным деревом каталога
+    :param path: Путь к файлу
+    """
+    try:
+        with VpkReader(path):
+            return True
+    except (OSError, ValueError, struct.error):
+        return False
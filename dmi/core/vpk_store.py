@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import shutil
+import threading
+from typing import Dict, Iterable, Optional
+from .config import get_app_data_dir
+
+class VpkStore:
+    # Ограничение размера хранилища по умолчанию
+    DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+    LINK_HARDLINK = "hardlink"
+    LINK_REFLINK = "reflink"
+    LINK_COPY = "copy"
+
+    def __init__(self, store_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Локальное хранилище VPK файлов, адресуемое по SHA-256 (file.hash из каталога)
+        Установка мода - это жесткая ссылка (или reflink) из хранилища в папку
+        аддонов, поэтому переустановка не копирует данные заново
+        :param store_dir: Папка хранилища. По умолчанию %APPDATA%/DMI/store/
+        :param max_bytes: Максимальный размер хранилища, лишнее удаляется по LRU
+        """
+        if store_dir is None:
+            store_dir = get_app_data_dir('store')
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.index_path = os.path.join(store_dir, 'index.json')
+        self.max_bytes = max_bytes
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """
+        Загрузка индекса {хэш: {size, last_used}}
+        Объекты, которых нет на диске, из индекса выбрасываются
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        return {h: e for h, e in index.items() if os.path.exists(self.get_object_path(h))}
+
+    def _save_index(self) -> None:
+        """Атомарное сохранение индекса"""
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, self.index_path)
+
+    def get_object_path(self, sha256: str) -> str:
+        """
+        Путь к объекту в хранилище
+        :param sha256: Хэш содержимого
+        :return: Путь вида objects/ab/abcdef....vpk
+        """
+        sha256 = sha256.lower()
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}.vpk")
+
+    def has(self, sha256: Optional[str]) -> bool:
+        """Есть ли объект с таким хэшем в хранилище"""
+        if not sha256:
+            return False
+        with self._lock:
+            return sha256.lower() in self._index
+
+    def add(self, source_path: str, sha256: str, move: bool = False) -> str:
+        """
+        Добавление файла в хранилище
+        Хэш должен быть уже проверен (например, при загрузке)
+        :param source_path: Путь к файлу
+        :param sha256: SHA-256 содержимого
+        :param move: Переместить файл вместо копирования (для скачанных файлов)
+        :return: Путь к объекту в хранилище
+        """
+        sha256 = sha256.lower()
+        object_path = self.get_object_path(sha256)
+        with self._lock:
+            if sha256 in self._index:
+                if move:
+                    os.remove(source_path)
+                self._touch(sha256)
+                return object_path
+
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = object_path + '.tmp'
+            if move:
+                # В пределах одного диска это просто переименование
+                shutil.move(source_path, temp_path)
+            else:
+                shutil.copy2(source_path, temp_path)
+            os.replace(temp_path, object_path)
+
+            self._index[sha256] = {
+                'size': os.path.getsize(object_path),
+                'last_used': time.time()
+            }
+            self._save_index()
+        self.collect_garbage(pinned=[sha256])
+        return object_path
+
+    def link_into(self, sha256: str, destination: str) -> str:
+        """
+        Размещение объекта из хранилища по указанному пути
+        Порядок: жесткая ссылка, reflink (copy-on-write), обычное копирование
+        :param sha256: Хэш объекта
+        :param destination: Путь назначения (не должен существовать)
+        :return: Способ размещения (LINK_HARDLINK / LINK_REFLINK / LINK_COPY)
+        :raises KeyError: Если объекта нет в хранилище
+        """
+        sha256 = sha256.lower()
+        with self._lock:
+            if sha256 not in self._index:
+                raise KeyError(sha256)
+            self._touch(sha256)
+        object_path = self.get_object_path(sha256)
+
+        try:
+            os.link(object_path, destination)
+            return self.LINK_HARDLINK
+        except OSError:
+            pass
+
+        if self._reflink(object_path, destination):
+            return self.LINK_REFLINK
+
+        shutil.copy2(object_path, destination)
+        return self.LINK_COPY
+
+    @staticmethod
+    def _reflink(source: str, destination: str) -> bool:
+        """
+        Копирование через reflink (Btrfs / XFS) без дублирования данных
+        :return: True если получилось
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        FICLONE = 0x40049409
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return True
+        except OSError:
+            if os.path.exists(destination):
+                os.remove(destination)
+            return False
+
+    def _touch(self, sha256: str) -> None:
+        """Отметка использования объекта для LRU"""
+        self._index[sha256]['last_used'] = time.time()
+        self._save_index()
+
+    def get_total_size(self) -> int:
+        """Суммарный размер объектов в хранилище"""
+        with self._lock:
+            return sum(e['size'] for e in self._index.values())
+
+    def remove(self, sha256: str) -> None:
+        """Удаление объекта из хранилища"""
+        sha256 = sha256.lower()
+        with self._lock:
+            if self._index.pop(sha256, None) is None:
+                return
+            object_path = self.get_object_path(sha256)
+            if os.path.exists(object_path):
+                os.remove(object_path)
+            self._save_index()
+
+    def collect_garbage(self, pinned: Iterable[str] = ()) -> int:
+        """
+        Удаление давно не использованных объектов, пока хранилище больше max_bytes
+        Объекты, на которые есть жесткие ссылки из папки аддонов, не трогаем:
+        их удаление место не освободит
+        :param pinned: Хэши, которые удалять нельзя
+        :return: Сколько байт освобождено
+        """
+        pinned = {h.lower() for h in pinned}
+        freed = 0
+        with self._lock:
+            total = self.get_total_size()
+            if total <= self.max_bytes:
+                return 0
+
+            for sha256, entry in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+                if total <= self.max_bytes:
+                    break
+                if sha256 in pinned:
+                    continue
+                try:
+                    if os.stat(self.get_object_path(sha256)).st_nlink > 1:
+                        continue
+                except OSError:
+                    pass
+                self.remove(sha256)
+                total -= entry['size']
+                freed += entry['size']
+        return freed
@@ -0,0 +1,190 @@
+import os
+import zlib
+import hashlib
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+from .vpk_reader import VpkReader, VPK_SIGNATURE, DIR_ARCHIVE_INDEX, ENTRY_TERMINATOR, \
+    HEADER_V2, ENTRY
+
+# Секция прочих MD5 в VPK v2: MD5 дерева, MD5 секции архивов, MD5 файла
+OTHER_MD5_SIZE = 48
+# Ограничение формата: смещения и длины - 32-битные
+MAX_DATA_SIZE = 0xFFFFFFFF
+# Размер части при копировании данных
+CHUNK_SIZE = 1024 * 1024
+
+class _Source(NamedTuple):
+    """Файл для записи: CRC32, размер, функция чтения частями, откуда взят"""
+    crc: int
+    size: int
+    chunks: Callable[[], Iterator[bytes]]
+    origin: str
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            yield chunk
+
+class VpkWriter:
+    def __init__(self, verify_crc: bool = False):
+        """
+        Сборка одиночного VPK v2 (все данные в самом файле, как у pak файлов аддонов)
+        из файлов других VPK или файлов на диске. Данные копируются частями
+        (из mmap исходных VPK) и целиком в памяти не держатся; CRC32 берутся
+        из исходных каталогов, MD5 дерева и файла считаются при записи
+        :param verify_crc: Пересчитывать CRC32 данных при копировании и
+                           останавливаться на несовпадении
+        """
+        self.verify_crc = verify_crc
+        # {путь внутри VPK: источник}; первый добавленный путь побеждает
+        self._files: Dict[str, _Source] = {}
+        # {путь: [источники, которые были перекрыты]}
+        self.overridden: Dict[str, List[str]] = {}
+
+    def add_vpk(self, reader: VpkReader) -> int:
+        """
+        Добавление всех файлов VPK
+        Файлы, пути которых уже добавлены из источника с большим приоритетом, пропускаются
+        :param reader: Открытый VPK (должен оставаться открытым до write())
+        :return: Сколько файлов добавлено
+        """
+        added = 0
+        for entry in reader:
+            if self._add(entry.path, _Source(entry.crc, entry.size,
+                                             lambda entry=entry: reader.iter_chunks(entry, CHUNK_SIZE),
+                                             reader.path)):
+                added += 1
+        return added
+
+    def add_file(self, inner_path: str, file_path: str) -> bool:
+        """
+        Добавление файла с диска (CRC32 считается чтением по частям)
+        :param inner_path: Путь внутри VPK (разделитель /)
+        :param file_path: Путь к файлу
+        :return: True если добавлен (путь еще не занят)
+        """
+        crc = 0
+        for chunk in _iter_file(file_path):
+            crc = zlib.crc32(chunk, crc)
+        return self._add(inner_path, _Source(crc & 0xFFFFFFFF, os.path.getsize(file_path),
+                                             lambda: _iter_file(file_path), file_path))
+
+    def _add(self, inner_path: str, source: _Source) -> bool:
+        inner_path = inner_path.replace('\\', '/').strip('/')
+        if inner_path in self._files:
+            self.overridden.setdefault(inner_path, []).append(source.origin)
+            return False
+        self._files[inner_path] = source
+        return True
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @staticmethod
+    def _split(path: str) -> Tuple[str, str, str]:
+        """
+        Путь -> (расширение, папка, имя); пустые значения записываются пробелом
+        Точка в начале имени (.gitignore) - часть имени, а не расширение:
+        пустое имя в дереве VPK означает конец уровня
+        """
+        directory, _, name = path.rpartition('/')
+        stem, _, extension = name.rpartition('.')
+        if stem:
+            name = stem
+        else:
+            extension = ''
+        return extension or ' ', directory or ' ', name
+
+    def _build_tree(self) -> Tuple[bytes, List[Tuple[str, _Source]], int]:
+        """
+        Дерево каталога и порядок данных
+        :return: (дерево, файлы в порядке записи данных, размер данных)
+        """
+        tree: Dict[str, Dict[str, List[Tuple[str, str]]]] = {}
+        for path in self._files:
+            extension, directory, name = self._split(path)
+            tree.setdefault(extension, {}).setdefault(directory, []).append((name, path))
+
+        parts = []
+        order = []
+        offset = 0
+        for extension in sorted(tree):
+            parts.append(extension.encode('utf-8') + b'\0')
+            for directory in sorted(tree[extension]):
+                parts.append(directory.encode('utf-8') + b'\0')
+                for name, path in sorted(tree[extension][directory]):
+                    source = self._files[path]
+                    if offset + source.size > MAX_DATA_SIZE:
+                        raise ValueError("Суммарный размер данных превышает ограничение формата VPK (4 ГБ)")
+                    parts.append(name.encode('utf-8') + b'\0')
+                    parts.append(ENTRY.pack(source.crc, 0, DIR_ARCHIVE_INDEX, offset, source.size,
+                                            ENTRY_TERMINATOR))
+                    order.append((path, source))
+                    offset += source.size
+                parts.append(b'\0')
+            parts.append(b'\0')
+        parts.append(b'\0')
+        return b''.join(parts), order, offset
+
+    def write(self, target_path: str) -> Dict:
+        """
+        Запись VPK
+        :param target_path: Путь к создаваемому файлу
+        :return: Сведения: files, tree_size, data_size, overridden
+        :raises ValueError: Если CRC не совпадает (при verify_crc) или данные слишком велики
+        """
+        tree, order, data_size = self._build_tree()
+        header = HEADER_V2.pack(VPK_SIGNATURE, 2, len(tree), data_size, 0, OTHER_MD5_SIZE, 0)
+
+        file_md5 = hashlib.md5()
+        with open(target_path, 'wb') as f:
+            def put(data: bytes) -> None:
+                f.write(data)
+                file_md5.update(data)
+
+            put(header)
+            put(tree)
+            for path, source in order:
+                crc = 0
+                written = 0
+                for chunk in source.chunks():
+                    put(chunk)
+                    written += len(chunk)
+                    if self.verify_crc:
+                        crc = zlib.crc32(chunk, crc)
+                if written != source.size:
+                    raise ValueError(f"Размер не совпадает: {path} в {source.origin}")
+                if self.verify_crc and crc & 0xFFFFFFFF != source.crc:
+                    raise ValueError(f"CRC не совпадает: {path} в {source.origin}")
+            # Секция MD5 архивов пуста: внешних архивов нет
+            put(hashlib.md5(tree).digest())
+            put(hashlib.md5(b'').digest())
+            f.write(file_md5.digest())
+
+        return {
+            'files': len(order),
+            'tree_size': len(tree),
+            'data_size': data_size,
+            'overridden': sum(len(sources) for sources in self.overridden.values())
+        }
+
+def merge_vpks(source_paths: List[str], target_path: str, verify_crc: bool = False) -> Dict:
+    """
+    Объединение нескольких VPK в один
+    При совпадении путей побеждает источник, стоящий раньше в списке
+    (как pak файл с меньшим номером при загрузке игрой)
+    :param source_paths: Пути к VPK в порядке приоритета
+    :param target_path: Путь к создаваемому VPK
+    :param verify_crc: Проверять CRC32 копируемых данных
+    :return: Сведения о записанном файле (см. VpkWriter.write)
+    """
+    readers = []
+    try:
+        writer = VpkWriter(verify_crc)
+        for path in source_paths:
+            reader = VpkReader(path)
+            readers.append(reader)
+            writer.add_vpk(reader)
+        return writer.write(target_path)
+    finally:
+        for reader in readers:
+            reader.close()
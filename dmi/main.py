@@ -1,10 +1,100 @@
+import time
+# Засекаем время до импорта Qt и остальных модулей
+STARTED_AT = time.perf_counter()
+
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
-from dmi.ui.main_window import MainWindow
+
+# Сколько самых медленных импортов показывать в режиме профилирования
+PROFILE_TOP_IMPORTS = 25
+
+def profile_startup() -> int:
+    """
+    Профилирование запуска (--profile-startup)
+    Программа запускается в отдельном процессе с -X importtime и закрывается
+    после первой отрисовки окна; выводятся самые долгие импорты
+    (по суммарному времени с вложенными) и время до первой отрисовки
+    :return: Код возврата дочернего процесса
+    """
+    import subprocess
+
+    command = [sys.executable, '-X', 'importtime', '-m', 'dmi.main', '--startup-timer', '--exit-after-paint']
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(command, cwd=root, capture_output=True, text=True, encoding='utf-8',
+                            errors='replace')
+
+    # Строки вида "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        imports.append((int(parts[1]), int(parts[0]), parts[2].rstrip()))
+
+    # Верхний уровень (без отступа) - то, что импортировано из главного модуля напрямую
+    total_us = sum(cumulative for cumulative, _, name in imports if not name.startswith('  '))
+    print(f"Импорты: {total_us / 1000:.0f} мс, модулей: {len(imports)}")
+    print(f"{'всего, мс':>10}{'сам, мс':>9}  модуль")
+    for cumulative, self_us, name in sorted(imports, reverse=True)[:PROFILE_TOP_IMPORTS]:
+        print(f"{cumulative / 1000:>10.1f}{self_us / 1000:>9.1f}  {name.strip()}")
+
+    print(result.stdout.strip())
+    other = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+    if other:
+        print("\n".join(other))
+    return result.returncode
+
+def verify_addons() -> int:
+    """
+    Проверка целостности установленных модов (--verify) без запуска интерфейса
+    :return: 0 если проблем нет, 1 если есть поврежденные или измененные pak файлы
+    """
+    from dmi.core.integrity_checker import IntegrityChecker
+    from dmi.core.mod_installer import ModInstaller
+    from dmi.core.mod_scanner import ModScanner
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    mods = ModScanner(root).scan_mods()["mods"]
+    installer = ModInstaller()
+    installer.recover()
+
+    start = time.perf_counter()
+    report = IntegrityChecker(installer).verify(mods)
+    elapsed = time.perf_counter() - start
+
+    for title, items in (("Повреждены", report.corrupt), ("Изменены после установки", report.modified),
+                         ("Нет в каталоге", report.unknown), ("Не проверены", report.skipped)):
+        if items:
+            print(f"{title}:")
+            for item in items:
+                print(f"  {item['slot']}  {item['mod_id'] or '-'}  {item['actual'] or '-'}")
+    print(f"{report.get_summary()}. Прочитано файлов: {report.hashed}, {elapsed:.2f} с")
+    return 1 if report.has_problems() else 0
 
 def main():
+    if '--profile-startup' in sys.argv:
+        sys.exit(profile_startup())
+    if '--verify' in sys.argv:
+        sys.exit(verify_addons())
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from dmi.ui.main_window import MainWindow
+
+    # --startup-timer: вывести время от запуска до первой отрисовки окна
+    show_timer = '--startup-timer' in sys.argv
     app = QApplication(sys.argv)
-    window = MainWindow()
+    exit_after_paint = '--exit-after-paint' in sys.argv
+    window = MainWindow(started_at=STARTED_AT if show_timer else None,
+                        check_updates_on_start=not exit_after_paint)
+    if not window.initialized:
+        # Путь к игре не указан - окно не создано, показывать нечего
+        sys.exit(0)
+    if exit_after_paint:
+        # Для замеров: выйти сразу после первой отрисовки
+        window.firstPainted.connect(lambda _: QTimer.singleShot(0, app.quit))
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,56 @@
+from PyQt6.QtWidgets import QComboBox
+from typing import Dict, List, Optional
+
+
+class FacetComboBox(QComboBox):
+    def __init__(self, facet: str, all_text: str, parent=None):
+        """
+        Выпадающий список значений фасета каталога с количеством модов
+        Первый пункт - без фильтра; у остальных в данных хранится значение фасета
+        :param facet: Имя фасета (см. FacetIndex.FACETS)
+        :param all_text: Текст пункта без фильтра
+        """
+        super().__init__(parent)
+        self.facet = facet
+        self.all_text = all_text
+        self._names: Dict[str, str] = {}
+        self.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToContents)
+        self.addItem(all_text, None)
+
+    def get_value(self) -> Optional[str]:
+        """Выбранное значение или None, если фильтра нет"""
+        return self.currentData()
+
+    def set_values(self, values: List[str], names: Dict[str, str] = None) -> None:
+        """
+        Заполнение списка значений (выбор сохраняется, если значение осталось)
+        Сигналы на время заполнения блокируются
+        :param values: Значения фасета в нужном порядке
+        :param names: Значение -> отображаемое название
+        """
+        current = self.get_value()
+        self._names = names or {}
+
+        self.blockSignals(True)
+        self.clear()
+        self.addItem(self.all_text, None)
+        for value in values:
+            self.addItem(self._names.get(value, value), value)
+        index = self.findData(current) if current is not None else 0
+        self.setCurrentIndex(max(index, 0))
+        self.blockSignals(False)
+
+    def set_counts(self, counts: Dict[str, int]) -> None:
+        """
+        Обновление количества модов у значений
+        Значения без модов при текущих условиях недоступны для выбора
+        :param counts: Значение -> количество
+        """
+        model = self.model()
+        for index in range(1, self.count()):
+            value = self.itemData(index)
+            count = counts.get(value, 0)
+            self.setItemText(index, f"{self._names.get(value, value)} ({count})")
+            item = model.item(index)
+            if item is not None:
+                item.setEnabled(count > 0 or index == self.currentIndex())
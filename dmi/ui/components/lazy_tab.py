@@ -0,0 +1,34 @@
+import importlib
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+
+class LazyTab(QWidget):
+    def __init__(self, module_name: str, class_name: str, parent=None):
+        """
+        Заглушка вкладки: модуль вкладки импортируется, а сама вкладка
+        создается только при первом открытии (см. ensure_created)
+        :param module_name: Модуль вкладки, например 'dmi.ui.components.maps_tab'
+        :param class_name: Класс вкладки в модуле
+        """
+        super().__init__(parent)
+        self.module_name = module_name
+        self.class_name = class_name
+        self.widget = None
+
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def is_created(self) -> bool:
+        """Создана ли вкладка"""
+        return self.widget is not None
+
+    def ensure_created(self) -> QWidget:
+        """
+        Создание вкладки, если она еще не создана
+        :return: Виджет вкладки
+        """
+        if self.widget is None:
+            module = importlib.import_module(self.module_name)
+            self.widget = getattr(module, self.class_name)()
+            self._layout.addWidget(self.widget)
+        return self.widget
@@ -0,0 +1,300 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+from PyQt6.QtCore import (Qt, QAbstractListModel, QSortFilterProxyModel, QModelIndex,
+                          QRect, QSize, QEvent, pyqtSignal)
+from PyQt6.QtGui import QPainter, QColor, QFont, QPen
+from dmi.core.mod_installer import ModInstaller
+from dmi.core.media_cache import MediaCache
+from dmi.core.mod_record import ModRecord
+from .thumbnail_loader import ThumbnailLoader
+import os
+
+# Роли данных модели каталога
+ModRole = Qt.ItemDataRole.UserRole + 1
+InstalledRole = Qt.ItemDataRole.UserRole + 2
+PreviewRole = Qt.ItemDataRole.UserRole + 3
+PreviewPendingRole = Qt.ItemDataRole.UserRole + 4
+InstallPendingRole = Qt.ItemDataRole.UserRole + 5
+
+# Геометрия карточки
+CARD_SIZE = QSize(300, 400)
+PREVIEW_SIZE = QSize(280, 200)
+CARD_MARGIN = 10
+# Ячейка сетки: карточка плюс отступ между карточками
+GRID_SIZE = QSize(CARD_SIZE.width() + 20, CARD_SIZE.height() + 20)
+
+
+class ModListModel(QAbstractListModel):
+    def __init__(self, mod_installer: ModInstaller, media_cache: MediaCache = None, parent=None):
+        """
+        Модель каталога модов
+        :param mod_installer: Установщик для определения статуса мода
+        :param media_cache: Кэш медиафайлов, из которого берутся превью,
+                            которых нет в локальной папке media
+        """
+        super().__init__(parent)
+        self.mod_installer = mod_installer
+        self.media_cache = media_cache
+        self.mods = []
+        # Превью скачиваются и декодируются в фоне при первой отрисовке карточки
+        self.thumbnails = ThumbnailLoader(PREVIEW_SIZE, resolve=self.resolve_preview, parent=self)
+        self.thumbnails.thumbnailReady.connect(self._on_thumbnail_ready)
+        # Путь к превью -> строки модели с этим превью
+        self._preview_rows = {}
+        # ID модов, которые сейчас загружаются и устанавливаются в фоне
+        self._pending = set()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.mods)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        mod_data = self.mods[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return mod_data.title or 'Без названия'
+        if role == ModRole:
+            return mod_data
+        if role == InstalledRole:
+            return self.mod_installer.is_mod_installed(mod_data.id)
+        if role == PreviewRole:
+            return self._get_preview(mod_data)
+        if role == PreviewPendingRole:
+            return self.has_preview(mod_data)
+        if role == InstallPendingRole:
+            return mod_data.id in self._pending
+        return None
+
+    @staticmethod
+    def get_preview_path(mod_data: ModRecord):
+        """Путь к файлу превью мода в локальной папке media или None"""
+        return os.path.join('media', mod_data.preview) if mod_data.preview else None
+
+    def resolve_preview(self, preview_path: str):
+        """
+        Локальный файл превью: из папки media, иначе из кэша медиафайлов
+        (с загрузкой и проверкой актуальности). Вызывается в пуле потоков
+        :param preview_path: Путь из get_preview_path
+        :return: Путь к файлу или None
+        """
+        if os.path.exists(preview_path) or self.media_cache is None:
+            return preview_path
+        return self.media_cache.get_media_path(os.path.basename(preview_path))
+
+    def _get_preview(self, mod_data):
+        """
+        Миниатюра превью мода
+        :return: QPixmap, если готова; None - пока декодируется или превью нет
+        """
+        preview_path = self.get_preview_path(mod_data)
+        if preview_path is None:
+            return None
+        return self.thumbnails.get(preview_path)
+
+    def has_preview(self, mod_data) -> bool:
+        """Есть ли у мода превью, которое показано или еще декодируется"""
+        preview_path = self.get_preview_path(mod_data)
+        return preview_path is not None and not self.thumbnails.is_failed(preview_path)
+
+    def _on_thumbnail_ready(self, preview_path: str):
+        """Перерисовка карточек, для которых готова миниатюра"""
+        for row in self._preview_rows.get(preview_path, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [PreviewRole])
+
+    def set_mods(self, mods) -> None:
+        """
+        Замена списка модов
+        :param mods: Список модов из каталога
+        """
+        self.beginResetModel()
+        self.mods = list(mods)
+        self.thumbnails.clear()
+        self._preview_rows = {}
+        for row, mod_data in enumerate(self.mods):
+            preview_path = self.get_preview_path(mod_data)
+            if preview_path:
+                self._preview_rows.setdefault(preview_path, []).append(row)
+        self.endResetModel()
+
+    def set_pending(self, mod_id: str, pending: bool) -> None:
+        """
+        Отметка мода, установка которого идет в фоне
+        :param mod_id: ID мода
+        :param pending: True - установка началась, False - закончилась
+        """
+        if pending:
+            self._pending.add(mod_id)
+        else:
+            self._pending.discard(mod_id)
+        for row, mod_data in enumerate(self.mods):
+            if mod_data.id == mod_id:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [InstallPendingRole, InstalledRole])
+
+    def is_pending(self, mod_id: str) -> bool:
+        """Идет ли установка мода"""
+        return mod_id in self._pending
+
+    def refresh_installed(self) -> None:
+        """Перерисовка статуса установки у всех карточек"""
+        if self.mods:
+            self.dataChanged.emit(self.index(0), self.index(len(self.mods) - 1), [InstalledRole])
+
+
+class ModFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        """Фильтр каталога по строкам, отобранным поиском и фасетами"""
+        super().__init__(parent)
+        # Строки модели, подходящие под поиск и фильтры (None - все)
+        self.matching_rows = None
+        # Строка модели -> место в выдаче по релевантности
+        self.ranks = {}
+
+    def set_filter(self, matching_rows, ranked_rows=None) -> None:
+        """
+        Установка условий фильтрации
+        Меняет только набор видимых строк, карточки не пересоздаются
+        :param matching_rows: Множество подходящих строк или None (все)
+        :param ranked_rows: Строки в порядке релевантности (None - порядок каталога)
+        """
+        self.matching_rows = matching_rows
+        self.ranks = {row: rank for rank, row in enumerate(ranked_rows or [])}
+        self.invalidateFilter()
+        # Без ранжирования возвращаем исходный порядок каталога
+        self.sort(0 if self.ranks else -1)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        return self.matching_rows is None or source_row in self.matching_rows
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        return self.ranks.get(left.row(), left.row()) < self.ranks.get(right.row(), right.row())
+
+
+class ModCardDelegate(QStyledItemDelegate):
+    # Нажатие кнопки установки/удаления и кнопки превью на карточке
+    installClicked = pyqtSignal(QModelIndex)
+    previewClicked = pyqtSignal(QModelIndex)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return CARD_SIZE
+
+    def _card_rect(self, option: QStyleOptionViewItem) -> QRect:
+        """Прямоугольник карточки внутри ячейки"""
+        rect = QRect(option.rect.topLeft(), CARD_SIZE)
+        return rect.adjusted(2, 2, -2, -2)
+
+    def _button_rects(self, option: QStyleOptionViewItem, mod_data) -> tuple:
+        """
+        Прямоугольники кнопок карточки
+        :return: (кнопка установки, кнопка превью или None)
+        """
+        card = self._card_rect(option)
+        top = card.bottom() - CARD_MARGIN - 30
+        left = card.left() + CARD_MARGIN
+        width = card.width() - 2 * CARD_MARGIN
+        if mod_data.video:
+            half = (width - CARD_MARGIN) // 2
+            return (QRect(left, top, half, 30),
+                    QRect(left + half + CARD_MARGIN, top, width - half - CARD_MARGIN, 30))
+        return QRect(left, top, width, 30), None
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        mod_data = index.data(ModRole)
+        installed = index.data(InstalledRole)
+        card = self._card_rect(option)
+        palette = option.palette
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Рамка карточки
+        painter.setPen(QPen(palette.mid().color()))
+        painter.setBrush(palette.base())
+        painter.drawRect(card)
+
+        # Превью мода
+        preview_rect = QRect(card.left() + CARD_MARGIN, card.top() + CARD_MARGIN,
+                             PREVIEW_SIZE.width(), PREVIEW_SIZE.height())
+        pixmap = index.data(PreviewRole)
+        painter.setPen(palette.text().color())
+        if pixmap is not None and not pixmap.isNull():
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(preview_rect.center())
+            painter.drawPixmap(target, pixmap)
+        elif index.data(PreviewPendingRole):
+            # Заглушка, пока миниатюра декодируется в фоне
+            painter.fillRect(preview_rect, palette.alternateBase())
+            painter.drawText(preview_rect, Qt.AlignmentFlag.AlignCenter, "Загрузка...")
+        else:
+            painter.drawText(preview_rect, Qt.AlignmentFlag.AlignCenter, "Нет превью")
+
+        # Информация о моде
+        text_left = card.left() + CARD_MARGIN
+        text_width = card.width() - 2 * CARD_MARGIN
+        y = preview_rect.bottom() + CARD_MARGIN
+
+        title_font = QFont(option.font)
+        title_font.setBold(True)
+        title_font.setPixelSize(14)
+        painter.setFont(title_font)
+        painter.drawText(QRect(text_left, y, text_width, 20),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         mod_data.title or 'Без названия')
+        y += 22
+
+        painter.setFont(option.font)
+        author = f"Автор: {mod_data.author or 'Неизвестен'}"
+        painter.drawText(QRect(text_left, y, text_width, 18),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, author)
+        y += 20
+
+        category = f"Категория: {mod_data.category}"
+        if mod_data.hero:
+            category = f"{category} - {mod_data.hero}"
+        painter.drawText(QRect(text_left, y, text_width, 18),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, category)
+        y += 22
+
+        description = mod_data.get_description('ru')
+        painter.drawText(QRect(text_left, y, text_width, 80),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap,
+                         description)
+
+        # Кнопки управления
+        install_rect, preview_btn_rect = self._button_rects(option, mod_data)
+        if index.data(InstallPendingRole):
+            self._draw_button(painter, install_rect, "Установка...", palette.button().color())
+        else:
+            self._draw_button(painter, install_rect,
+                              "Удалить" if installed else "Установить",
+                              QColor("#ff4444") if installed else QColor("#44ff44"))
+        if preview_btn_rect is not None:
+            self._draw_button(painter, preview_btn_rect, "Превью", palette.button().color())
+
+        painter.restore()
+
+    def _draw_button(self, painter: QPainter, rect: QRect, text: str, color: QColor):
+        """Отрисовка кнопки карточки"""
+        painter.setPen(QPen(color.darker(130)))
+        painter.setBrush(color)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(QColor("#000000"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+    def editorEvent(self, event, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            mod_data = index.data(ModRole)
+            install_rect, preview_btn_rect = self._button_rects(option, mod_data)
+            pos = event.position().toPoint()
+            if install_rect.contains(pos):
+                # Пока мод устанавливается, повторное нажатие ничего не делает
+                if not index.data(InstallPendingRole):
+                    self.installClicked.emit(index)
+                return True
+            if preview_btn_rect is not None and preview_btn_rect.contains(pos):
+                self.previewClicked.emit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -1,200 +1,224 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
-                             QScrollArea, QLabel, QPushButton, QGridLayout,
-                             QFrame, QSizePolicy, QMessageBox)
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QPixmap, QImage
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QListView, QAbstractItemView,
+                             QMessageBox)
+from PyQt6.QtCore import Qt, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+from typing import Dict, Optional
+from dmi.core.config import Config
 from dmi.core.mod_installer import ModInstaller
+from dmi.core.pak_adopter import PakAdopter
 from dmi.core.media_cache import MediaCache
-import os
+from dmi.core.facet_index import FacetIndex
+from dmi.core.search_index import SearchIndex
+from .mod_grid import ModListModel, ModFilterProxyModel, ModCardDelegate, ModRole, GRID_SIZE
 
-class ModCard(QFrame):
-    def __init__(self, mod_data, parent=None):
-        super().__init__(parent)
-        self.mod_data = mod_data
+
+class _InstallSignals(QObject):
+    # (ID мода, успех, сообщение)
+    finished = pyqtSignal(str, bool, str)
+
+
+class _AdoptionSignals(QObject):
+    # [(имя pak файла, ID мода)]
+    finished = pyqtSignal(object)
+
+
+class _AdoptionTask(QRunnable):
+    def __init__(self, adopter: PakAdopter, mods: list, signals: _AdoptionSignals):
+        """
+        Поиск модов каталога среди pak файлов без записи в манифесте в пуле потоков
+        :param adopter: Объект поиска
+        :param mods: Записи каталога
+        :param signals: Объект для передачи результата в GUI поток
+        """
+        super().__init__()
+        self.adopter = adopter
+        self.mods = mods
+        self.signals = signals
+
+    def run(self):
+        try:
+            adopted = self.adopter.adopt(self.mods)
+        except Exception as e:
+            print(f"Ошибка при поиске установленных вручную модов: {str(e)}")
+            adopted = []
+        try:
+            self.signals.finished.emit(adopted)
+        except RuntimeError:
+            # Окно закрыли, пока шло хэширование
+            pass
+
+
+class ModsTab(QWidget):
+    # Опознаны pak файлы, установленные без программы: количество
+    modsAdopted = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.mods_data = []
+        self.search_index = SearchIndex()
+        self.facet_index = FacetIndex()
+        self.media_cache = MediaCache(max_bytes=Config().get_media_cache_max_bytes())
+        # Один установщик на все карточки
         self.mod_installer = ModInstaller()
-        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Raised)
-        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.setFixedSize(300, 400)
-        
+        self.pak_adopter = PakAdopter(self.mod_installer)
+        self._adopting = False
+        self._adoption_signals = _AdoptionSignals()
+        self._adoption_signals.finished.connect(self._on_adopted)
+        # Результат фоновой установки приходит из потока загрузок
+        self._install_signals = _InstallSignals()
+        self._install_signals.finished.connect(self._on_install_finished)
+        self.setup_ui()
+    
+    def setup_ui(self):
         layout = QVBoxLayout(self)
         
-        # Превью мода
-        preview = QLabel()
-        preview.setFixedSize(280, 200)
-        preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        if mod_data.get('media', {}).get('preview'):
-            preview_path = os.path.join('media', mod_data['media']['preview'])
-            if os.path.exists(preview_path):
-                pixmap = QPixmap(preview_path)
-                preview.setPixmap(pixmap.scaled(280, 200, Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            preview.setText("Нет превью")
-        
-        layout.addWidget(preview)
-        
-        # Информация о моде
-        info_layout = QVBoxLayout()
-        
-        title = QLabel(mod_data.get('title', 'Без названия'))
-        title.setStyleSheet("font-weight: bold; font-size: 14px;")
-        info_layout.addWidget(title)
-        
-        author = QLabel(f"Автор: {mod_data.get('author', 'Неизвестен')}")
-        info_layout.addWidget(author)
-        
-        category = QLabel(f"Категория: {mod_data.get('category', '')}")
-        if mod_data.get('hero'):
-            category.setText(f"{category.text()} - {mod_data['hero']}")
-        info_layout.addWidget(category)
-        
-        description = QLabel(mod_data.get('descriptions', {}).get('ru', ''))
-        description.setWordWrap(True)
-        description.setFixedHeight(80)
-        info_layout.addWidget(description)
-        
-        layout.addLayout(info_layout)
-        
-        # Кнопки управления
-        buttons_layout = QHBoxLayout()
-        
-        # Кнопка установки/удаления
-        self.install_btn = QPushButton()
-        self.install_btn.clicked.connect(self.toggle_mod)
-        buttons_layout.addWidget(self.install_btn)
-        
-        if mod_data.get('media', {}).get('video'):
-            preview_btn = QPushButton("Превью")
-            preview_btn.clicked.connect(self.show_preview)
-            buttons_layout.addWidget(preview_btn)
-        
-        layout.addLayout(buttons_layout)
-        
-        # Обновляем состояние кнопки
-        self.update_button_state()
+        # Модель каталога и фильтр поверх неё
+        self.model = ModListModel(self.mod_installer, self.media_cache, self)
+        self.proxy = ModFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        # Карточки рисует делегат, отрисовываются только видимые
+        self.delegate = ModCardDelegate(self)
+        self.delegate.installClicked.connect(self.toggle_mod)
+        self.delegate.previewClicked.connect(self.show_preview)
+        
+        # Сетка карточек: при изменении размера виджеты не пересоздаются,
+        # QListView сам перераскладывает элементы
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setGridSize(GRID_SIZE)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.view.setItemDelegate(self.delegate)
+        self.view.setModel(self.proxy)
+        
+        layout.addWidget(self.view)
     
-    def update_button_state(self):
-        """Обновление состояния кнопки установки"""
-        mod_filename = self.mod_data['file']['name']
-        if self.mod_installer.is_mod_installed(mod_filename):
-            self.install_btn.setText("Удалить")
-            self.install_btn.setStyleSheet("background-color: #ff4444;")
-        else:
-            self.install_btn.setText("Установить")
-            self.install_btn.setStyleSheet("background-color: #44ff44;")
+    def update_mods(self, mods_data, search_index: SearchIndex = None,
+                    facet_index: FacetIndex = None):
+        """
+        Обновление списка модов
+        :param mods_data: Список записей ModRecord
+        :param search_index: Готовый поисковый индекс по этому же списку
+        :param facet_index: Готовый индекс фасетов по этому же списку
+        """
+        self.mods_data = mods_data
+        if search_index is None:
+            search_index = SearchIndex()
+            search_index.build(mods_data)
+        self.search_index = search_index
+        if facet_index is None:
+            facet_index = FacetIndex()
+            facet_index.build(mods_data)
+        self.facet_index = facet_index
+        # Папку аддонов сверяем один раз на обновление, а не на каждую карточку
+        self.mod_installer.refresh_state()
+        self.model.set_mods(mods_data)
     
-    def toggle_mod(self):
+    def adopt_untracked(self) -> bool:
+        """
+        Запуск фонового поиска модов каталога среди pak файлов, которых нет
+        в манифесте (установленных вручную или до появления манифеста)
+        :return: True если поиск запущен
+        """
+        if self._adopting or not self.mods_data or not self.mod_installer.manifest.untracked:
+            return False
+        self._adopting = True
+        QThreadPool.globalInstance().start(
+            _AdoptionTask(self.pak_adopter, list(self.mods_data), self._adoption_signals))
+        return True
+    
+    def _on_adopted(self, adopted: list):
+        """Результат фонового поиска: обновляем состояние кнопок на карточках"""
+        self._adopting = False
+        if adopted:
+            self.model.refresh_installed()
+            self.modsAdopted.emit(len(adopted))
+    
+    def filter_mods(self, search_text: str, filters: Dict[str, Optional[str]] = None
+                    ) -> Dict[str, Dict[str, int]]:
+        """
+        Фильтрация модов по поиску и фасетам
+        :param search_text: Поисковый запрос
+        :param filters: Фасет -> выбранное значение (None - без фильтра), см. FacetIndex.FACETS
+        :return: Количество модов для значений фасетов при текущих условиях
+        """
+        filters = filters or {}
+        # Строки модели совпадают с позициями в индексах
+        rows = self.search_index.search_positions(search_text)
+        base = None if rows is None else self.facet_index.positions_to_bits(rows)
+        bits, counts = self.facet_index.query(filters, base)
+        
+        if rows is not None or any(value is not None for value in filters.values()):
+            rows = self.facet_index.bits_to_positions(bits)
+        
+        ranked = None
+        if search_text.strip() and rows is not None and len(rows) <= SearchIndex.RANK_LIMIT:
+            ranked = self.search_index.rank_positions(rows, search_text)
+        self.proxy.set_filter(rows, ranked)
+        return counts
+    
+    def toggle_mod(self, index: QModelIndex):
         """Установка или удаление мода"""
+        mod_data = index.data(ModRole)
         try:
-            mod_filename = self.mod_data['file']['name']
+            pak_filename = self.mod_installer.get_installed_slot(mod_data.id)
             
-            if self.mod_installer.is_mod_installed(mod_filename):
+            if pak_filename:
                 # Удаляем мод
-                success, message = self.mod_installer.uninstall_mod(mod_filename)
+                success, message = self.mod_installer.uninstall_mod(pak_filename)
                 if success:
                     QMessageBox.information(self, "Успех", f"Мод успешно удален")
                 else:
                     QMessageBox.warning(self, "Ошибка", f"Ошибка при удалении мода: {message}")
             else:
-                # Устанавливаем мод
-                mod_path = os.path.join('mods', self.mod_data['file']['path'])
-                success, message = self.mod_installer.install_mod(mod_path)
-                if success:
-                    QMessageBox.information(self, "Успех", f"Мод успешно установлен")
-                else:
-                    QMessageBox.warning(self, "Ошибка", f"Ошибка при установке мода: {message}")
+                # Устанавливаем мод в фоне: загрузка не блокирует интерфейс,
+                # до результата кнопка на карточке неактивна
+                self.model.set_pending(mod_data.id, True)
+                try:
+                    self.mod_installer.submit_install(
+                        mod_data,
+                        lambda job, success, message, mod_id=mod_data.id:
+                            self._emit_install_finished(mod_id, success, message)
+                    )
+                except Exception:
+                    self.model.set_pending(mod_data.id, False)
+                    raise
             
             # Обновляем состояние кнопки
-            self.update_button_state()
+            self.view.update(index)
             
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Непредвиденная ошибка: {str(e)}")
     
-    def show_preview(self):
+    def _emit_install_finished(self, mod_id: str, success: bool, message: str):
+        """Передача результата установки в GUI поток (вызывается из потока загрузок)"""
+        try:
+            self._install_signals.finished.emit(mod_id, success, message)
+        except RuntimeError:
+            # Окно закрыли, пока шла загрузка
+            pass
+    
+    def _on_install_finished(self, mod_id: str, success: bool, message: str):
+        """Результат фоновой установки: снимаем ожидание с карточки и сообщаем пользователю"""
+        self.model.set_pending(mod_id, False)
+        if success:
+            # Сообщение установщика содержит номер pak и пересечения с другими модами
+            QMessageBox.information(self, "Успех", f"Мод успешно установлен\n\n{message}")
+        else:
+            QMessageBox.warning(self, "Ошибка", f"Ошибка при установке мода: {message}")
+    
+    def shutdown(self):
+        """Отмена фоновых загрузок и сохранение индекса медиакэша при закрытии окна"""
+        self.mod_installer.shutdown()
+        self.media_cache.flush()
+    
+    def show_preview(self, index: QModelIndex):
         """Показ превью/видео мода"""
-        video_url = self.mod_data.get('media', {}).get('video')
+        video_url = index.data(ModRole).video
         if video_url:
             # TODO: Реализовать показ превью/видео
             QMessageBox.information(self, "Превью", f"Видео доступно по ссылке: {video_url}")
-
-
-class ModsTab(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.mods_data = []
-        self.media_cache = MediaCache()
-        self.setup_ui()
-    
-    def setup_ui(self):
-        layout = QVBoxLayout(self)
-        
-        # Создаем область прокрутки
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        # Контейнер для карточек модов
-        self.mods_container = QWidget()
-        self.grid_layout = QGridLayout(self.mods_container)
-        self.grid_layout.setSpacing(20)
-        
-        scroll.setWidget(self.mods_container)
-        layout.addWidget(scroll)
-    
-    def update_mods(self, mods_data):
-        """Обновление списка модов"""
-        self.mods_data = mods_data
-        self.refresh_view()
-    
-    def filter_mods(self, search_text, category):
-        """Фильтрация модов по поиску и категории"""
-        filtered_mods = []
-        
-        for mod_data in self.mods_data:
-            # Фильтр по категории
-            if category != "Все категории" and mod_data['category'].lower() != category.lower():
-                continue
-            
-            # Фильтр по поиску
-            search_in = [
-                mod_data.get('title', ''),
-                mod_data.get('author', ''),
-                mod_data.get('descriptions', {}).get('ru', ''),
-                mod_data.get('descriptions', {}).get('en', '')
-            ]
-            
-            if not any(search_text in text.lower() for text in search_in):
-                continue
-            
-            filtered_mods.append(mod_data)
-        
-        self.refresh_view(filtered_mods)
-    
-    def refresh_view(self, mods_data=None):
-        """Обновление отображения модов"""
-        # Очищаем текущее отображение
-        for i in reversed(range(self.grid_layout.count())): 
-            self.grid_layout.itemAt(i).widget().setParent(None)
-        
-        # Если не переданы моды для отображения, используем все
-        if mods_data is None:
-            mods_data = self.mods_data
-        
-        # Добавляем карточки модов
-        row = 0
-        col = 0
-        max_cols = 3
-        
-        for mod_data in mods_data:  
-            card = ModCard(mod_data)
-            self.grid_layout.addWidget(card, row, col)
-            
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
-    
-    def resizeEvent(self, event):
-        """Обработка изменения размера окна"""
-        super().resizeEvent(event)
-        self.refresh_view()
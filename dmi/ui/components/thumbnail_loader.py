@@ -0,0 +1,185 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+from dmi.core.config import get_app_data_dir
+from typing import Callable, Optional
+import hashlib
+import os
+
+
+class _ThumbnailSignals(QObject):
+    # (ключ миниатюры, изображение или пустое изображение при ошибке)
+    decoded = pyqtSignal(str, QImage)
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, key: str, source: str, resolve: Callable[[str], Optional[str]],
+                 cache_dir: str, size: QSize, signals: _ThumbnailSignals):
+        """
+        Получение исходного изображения и декодирование одной миниатюры в пуле потоков
+        :param key: Ключ миниатюры
+        :param source: Исходное изображение (путь или имя, понятное resolve)
+        :param resolve: Функция, возвращающая путь к локальному файлу (может скачивать)
+        :param cache_dir: Папка дискового кэша миниатюр
+        :param size: Размер миниатюры
+        :param signals: Объект для передачи результата в GUI поток
+        """
+        super().__init__()
+        self.key = key
+        self.source = source
+        self.resolve = resolve
+        self.cache_dir = cache_dir
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        image = QImage()
+        try:
+            source_path = self.resolve(self.source)
+        except Exception as e:
+            print(f"Ошибка при получении {self.source}: {e}")
+            source_path = None
+        if source_path:
+            image = self._load(source_path)
+        try:
+            self.signals.decoded.emit(self.key, image)
+        except RuntimeError:
+            # Загрузчик удален, пока шло декодирование
+            pass
+
+    def _get_cache_path(self, source_path: str) -> Optional[str]:
+        """
+        Файл миниатюры в дисковом кэше: имя - хэш пути, размера и времени
+        изменения исходника и размер миниатюры
+        Хэш содержимого исходника не используется намеренно: для него пришлось бы
+        при каждом запуске читать все исходные изображения, а stat дает тот же
+        результат - замененный файл (в том числе обновленный MediaCache) получает
+        новое время изменения и, значит, новую миниатюру
+        :return: Путь без расширения или None если исходника нет
+        """
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        source = f"{os.path.abspath(source_path)}|{st.st_size}|{st.st_mtime_ns}"
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}_{self.size.width()}x{self.size.height()}")
+
+    def _load(self, source_path: str) -> QImage:
+        """Миниатюра из дискового кэша или декодирование исходника с записью в кэш"""
+        image = QImage()
+        base_path = self._get_cache_path(source_path)
+        if base_path is None:
+            return image
+        # Миниатюры с прозрачностью хранятся в PNG, остальные - в JPEG
+        for extension in ('.png', '.jpg'):
+            if os.path.exists(base_path + extension):
+                image = QImage(base_path + extension)
+                break
+
+        if image.isNull():
+            reader = QImageReader(source_path)
+            reader.setAutoTransform(True)
+            source_size = reader.size()
+            if source_size.isValid():
+                # Декодируем сразу в нужный размер, полный кадр в память не попадает
+                reader.setScaledSize(source_size.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if not image.isNull():
+                # JPEG теряет альфа-канал, поэтому прозрачные превью сохраняем в PNG
+                if image.hasAlphaChannel():
+                    cache_path, image_format, quality = base_path + '.png', 'PNG', -1
+                else:
+                    cache_path, image_format, quality = base_path + '.jpg', 'JPG', 90
+                temp_path = cache_path + '.tmp' + os.path.splitext(cache_path)[1]
+                if image.save(temp_path, image_format, quality):
+                    os.replace(temp_path, cache_path)
+        return image
+
+
+class ThumbnailLoader(QObject):
+    # Миниатюра готова, аргумент - исходное изображение (как передано в get)
+    thumbnailReady = pyqtSignal(str)
+
+    # Сколько памяти отдавать под готовые миниатюры (КБ)
+    MEMORY_CACHE_KB = 64 * 1024
+
+    def __init__(self, size: QSize, cache_dir: str = None,
+                 resolve: Callable[[str], Optional[str]] = None, parent=None):
+        """
+        Фоновая загрузка миниатюр превью
+        Изображения декодируются в пуле потоков сразу в нужном размере.
+        Готовые миниатюры сохраняются на диск с ключом из хэша пути, размера и
+        времени изменения исходного файла (не его содержимого) и размера миниатюры,
+        поэтому при следующих запусках исходники не декодируются и не читаются.
+        Превью с прозрачностью сохраняются в PNG, остальные - в JPEG
+        :param size: Размер миниатюры
+        :param cache_dir: Папка дискового кэша. По умолчанию %APPDATA%/DMI/cache/thumbnails/
+        :param resolve: Функция имя -> путь к локальному файлу, вызывается в пуле
+                        потоков (например, скачивание через MediaCache).
+                        По умолчанию источник - уже путь к файлу
+        """
+        super().__init__(parent)
+        self.size = size
+        self.resolve = resolve or (lambda source: source)
+        self.cache_dir = cache_dir or get_app_data_dir('cache', 'thumbnails')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount() - 1))
+
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), self.MEMORY_CACHE_KB))
+
+        self._signals = _ThumbnailSignals()
+        self._signals.decoded.connect(self._on_decoded)
+        # Ключ миниатюры -> исходный путь для задач в работе
+        self._pending = {}
+        # Исходные изображения, которые не удалось получить или прочитать
+        self._failed = set()
+
+    def _get_key(self, source: str) -> str:
+        """Ключ миниатюры в памяти: источник и размер миниатюры"""
+        return f"thumb|{source}|{self.size.width()}x{self.size.height()}"
+
+    def get(self, source: str) -> Optional[QPixmap]:
+        """
+        Получение миниатюры
+        Если миниатюра еще не готова, ставит получение исходника и декодирование
+        в очередь и возвращает None; по готовности испускается thumbnailReady
+        :param source: Исходное изображение (путь или имя для resolve)
+        :return: Миниатюра или None
+        """
+        if source in self._failed:
+            return None
+        key = self._get_key(source)
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+
+        if key not in self._pending:
+            self._pending[key] = source
+            self.pool.start(_ThumbnailTask(key, source, self.resolve, self.cache_dir,
+                                           self.size, self._signals))
+        return None
+
+    def is_failed(self, source_path: str) -> bool:
+        """Не удалось ли загрузить изображение"""
+        return source_path in self._failed
+
+    def _on_decoded(self, key: str, image: QImage):
+        """Прием результата из пула потоков (в GUI потоке)"""
+        source_path = self._pending.pop(key, None)
+        if source_path is None:
+            return
+        if image.isNull():
+            self._failed.add(source_path)
+        else:
+            # QPixmap можно создавать только в GUI потоке
+            QPixmapCache.insert(key, QPixmap.fromImage(image))
+        self.thumbnailReady.emit(source_path)
+
+    def clear(self) -> None:
+        """Сброс очереди (например, при смене каталога)"""
+        self.pool.clear()
+        self._pending.clear()
+        self._failed.clear()
@@ -0,0 +1,150 @@
+from PyQt6.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from dmi.core.github_api import GitHubAPI
+
+
+class _UpdateSignals(QObject):
+    # (успех/есть_обновления, сообщение)
+    finished = pyqtSignal(bool, str)
+
+
+class _UpdateTask(QRunnable):
+    def __init__(self, func, signals: _UpdateSignals):
+        """
+        Вызов метода GitHubAPI в пуле потоков
+        :param func: Метод, возвращающий (bool, сообщение)
+        :param signals: Объект для передачи результата в GUI поток
+        """
+        super().__init__()
+        self.func = func
+        self.signals = signals
+
+    def run(self):
+        try:
+            result, message = self.func()
+        except Exception as e:
+            result, message = False, f"Ошибка при проверке обновлений: {str(e)}"
+        try:
+            self.signals.finished.emit(result, message)
+        except RuntimeError:
+            # Окно закрыли, пока шел запрос
+            pass
+
+
+class UpdateChecker(QObject):
+    # Проверка завершена: (есть_обновления, сообщение)
+    checked = pyqtSignal(bool, str)
+    # Обновление применено: (успех, сообщение)
+    applied = pyqtSignal(bool, str)
+
+    def __init__(self, github: GitHubAPI, parent=None):
+        """
+        Проверка и применение обновлений каталога в фоновом потоке,
+        чтобы сетевые запросы не блокировали интерфейс
+        :param github: Клиент GitHub API
+        """
+        super().__init__(parent)
+        self.github = github
+        self._busy = False
+
+        self._check_signals = _UpdateSignals()
+        self._check_signals.finished.connect(self._on_checked)
+        self._apply_signals = _UpdateSignals()
+        self._apply_signals.finished.connect(self._on_applied)
+
+    def is_busy(self) -> bool:
+        """Идет ли сейчас проверка или обновление"""
+        return self._busy
+
+    def check(self) -> bool:
+        """
+        Запуск проверки обновлений
+        :return: False, если предыдущая операция еще не завершена
+        """
+        if self._busy:
+            return False
+        self._busy = True
+        QThreadPool.globalInstance().start(_UpdateTask(self.github.check_for_updates, self._check_signals))
+        return True
+
+    def apply(self) -> bool:
+        """
+        Запуск обновления mods.json (из ответа, полученного при проверке)
+        :return: False, если предыдущая операция еще не завершена
+        """
+        if self._busy:
+            return False
+        self._busy = True
+        QThreadPool.globalInstance().start(_UpdateTask(self.github.update_mods_json, self._apply_signals))
+        return True
+
+    def _on_checked(self, has_updates: bool, message: str):
+        self._busy = False
+        self.checked.emit(has_updates, message)
+
+    def _on_applied(self, success: bool, message: str):
+        self._busy = False
+        self.applied.emit(success, message)
+
+
+class UpdateBanner(QFrame):
+    # Пользователь согласился обновить каталог
+    updateRequested = pyqtSignal()
+
+    # Через сколько скрывать сообщение об успешном обновлении (мс)
+    AUTO_HIDE_MS = 5000
+
+    def __init__(self, parent=None):
+        """Полоса с сообщением об обновлениях над вкладками; не блокирует окно"""
+        super().__init__(parent)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setStyleSheet("UpdateBanner { background-color: #fff4ce; }")
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+
+        self.message_label = QLabel()
+        self.message_label.setWordWrap(True)
+        layout.addWidget(self.message_label, 1)
+
+        self.update_btn = QPushButton("Обновить")
+        self.update_btn.clicked.connect(self.updateRequested.emit)
+        layout.addWidget(self.update_btn)
+
+        self.close_btn = QPushButton("Скрыть")
+        self.close_btn.clicked.connect(self.hide)
+        layout.addWidget(self.close_btn)
+
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.timeout.connect(self.hide)
+
+        self.hide()
+
+    def show_update(self, message: str):
+        """Показать предложение обновить каталог"""
+        self.hide_timer.stop()
+        self.message_label.setText(message)
+        self.update_btn.setEnabled(True)
+        self.update_btn.show()
+        self.show()
+
+    def show_progress(self, message: str):
+        """Показать, что обновление выполняется"""
+        self.hide_timer.stop()
+        self.message_label.setText(message)
+        self.update_btn.setEnabled(False)
+        self.show()
+
+    def show_message(self, message: str, auto_hide: bool = False):
+        """
+        Показать сообщение без кнопки обновления
+        :param auto_hide: Скрыть через AUTO_HIDE_MS
+        """
+        self.message_label.setText(message)
+        self.update_btn.hide()
+        self.show()
+        if auto_hide:
+            self.hide_timer.start(self.AUTO_HIDE_MS)
+        else:
+            self.hide_timer.stop()
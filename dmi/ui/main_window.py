@@ -1,27 +1,42 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
-                             QPushButton, QLabel, QLineEdit, QComboBox,
+                             QPushButton, QLabel, QLineEdit,
                              QStatusBar, QMessageBox, QTabWidget, QHBoxLayout,
                              QSpacerItem, QSizePolicy)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon
 from .components.mods_tab import ModsTab
-from .components.launch_params_tab import LaunchParamsTab
-from .components.maps_tab import MapsTab
-from .components.crosshair_tab import CrosshairTab
-from .components.splash_tab import SplashTab
-from .dialogs.settings_dialog import SettingsDialog
-from .dialogs.game_path_dialog import GamePathDialog
+from .components.lazy_tab import LazyTab
+from .components.facet_combo import FacetComboBox
+from .components.update_banner import UpdateBanner, UpdateChecker
 from ..core.config import Config
 from ..core.mod_scanner import ModScanner
 from ..core.github_api import GitHubAPI
 import sys
+import time
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Окно отрисовано впервые (мс от запуска, 0 если время запуска не указано)
+    firstPainted = pyqtSignal(float)
+    
+    def __init__(self, started_at: float = None, check_updates_on_start: bool = True):
+        """
+        Главное окно
+        :param started_at: Время запуска программы (time.perf_counter()); если указано,
+                           при первой отрисовке окна в консоль выводится время запуска
+        :param check_updates_on_start: Проверить обновления после первой отрисовки
+                                       (если это не отключено в настройках)
+        """
         super().__init__()
         
+        self.started_at = started_at
+        # Время от запуска до первой отрисовки окна (мс)
+        self.first_paint_ms = None
+        
         self.config = Config()
+        self.check_updates_on_start = check_updates_on_start and self.config.get_check_updates()
         self.github = GitHubAPI()
+        # Интерфейс создан (False, если пользователь отказался указать путь к игре)
+        self.initialized = False
         
         # Проверяем путь к игре при запуске
         if not self.check_game_path():
@@ -32,12 +47,10 @@ class MainWindow(QMainWindow):
                 return
         
         self.init_ui()
+        self.initialized = True
         
-        # Обновляем список модов
+        # Показываем локальный каталог сразу, обновления проверяются после первой отрисовки
         self.refresh_mods()
-        
-        # Проверяем обновления при запуске
-        self.check_updates()
     
     def init_ui(self):
         # Основные настройки окна
@@ -76,30 +89,53 @@ class MainWindow(QMainWindow):
         # Поле поиска
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск модов...")
-        self.search_input.textChanged.connect(self.filter_mods)
+        # Фильтруем не на каждое нажатие, а после паузы в наборе
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_mods)
+        self.search_input.textChanged.connect(self.search_timer.start)
         toolbar_layout.addWidget(self.search_input)
         
-        # Выпадающий список категорий
-        self.category_combo = QComboBox()
-        self.category_combo.addItem("Все категории")
-        self.category_combo.addItem("Heroes")
-        self.category_combo.addItem("Interface")
-        self.category_combo.addItem("Sounds")
-        self.category_combo.addItem("Game")
-        self.category_combo.addItem("Post-processing")
-        self.category_combo.currentTextChanged.connect(self.filter_mods)
-        toolbar_layout.addWidget(self.category_combo)
-        
         main_layout.addWidget(toolbar)
         
+        # Фильтры по фасетам каталога; значения и количество заполняются из индекса фасетов
+        filters_bar = QWidget()
+        filters_layout = QHBoxLayout(filters_bar)
+        filters_layout.setContentsMargins(0, 0, 0, 0)
+        self.facet_combos = {
+            'category': FacetComboBox('category', "Все категории"),
+            'subcategory': FacetComboBox('subcategory', "Все подкатегории"),
+            'hero': FacetComboBox('hero', "Все герои"),
+            'author': FacetComboBox('author', "Все авторы"),
+            'month': FacetComboBox('month', "Любая дата")
+        }
+        for combo in self.facet_combos.values():
+            combo.currentIndexChanged.connect(self.filter_mods)
+            filters_layout.addWidget(combo)
+        filters_layout.addStretch()
+        main_layout.addWidget(filters_bar)
+        
+        # Сообщения об обновлениях каталога (не блокируют окно)
+        self.update_banner = UpdateBanner()
+        self.update_banner.updateRequested.connect(self.apply_update)
+        main_layout.addWidget(self.update_banner)
+        
+        self.update_checker = UpdateChecker(self.github, self)
+        self.update_checker.checked.connect(self.on_updates_checked)
+        self.update_checker.applied.connect(self.on_update_applied)
+        
         # Добавляем вкладку с модами
         self.tabs = QTabWidget()
         self.mods_tab = ModsTab()
+        self.mods_tab.modsAdopted.connect(self.on_mods_adopted)
         self.tabs.addTab(self.mods_tab, "Моды")
-        self.tabs.addTab(LaunchParamsTab(), "Параметры запуска")
-        self.tabs.addTab(MapsTab(), "Карты")
-        self.tabs.addTab(CrosshairTab(), "Прицел")
-        self.tabs.addTab(SplashTab(), "Заставка")
+        # Остальные вкладки создаются при первом открытии
+        self.tabs.addTab(LazyTab('dmi.ui.components.launch_params_tab', 'LaunchParamsTab'), "Параметры запуска")
+        self.tabs.addTab(LazyTab('dmi.ui.components.maps_tab', 'MapsTab'), "Карты")
+        self.tabs.addTab(LazyTab('dmi.ui.components.crosshair_tab', 'CrosshairTab'), "Прицел")
+        self.tabs.addTab(LazyTab('dmi.ui.components.splash_tab', 'SplashTab'), "Заставка")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         main_layout.addWidget(self.tabs)
         
         # Создаем статус бар
@@ -116,6 +152,7 @@ class MainWindow(QMainWindow):
             return True
         except ValueError:
             # Путь не установлен, показываем диалог
+            from .dialogs.game_path_dialog import GamePathDialog
             dialog = GamePathDialog(self)
             if dialog.exec():
                 # Путь выбран
@@ -135,6 +172,7 @@ class MainWindow(QMainWindow):
         Запрос пути к игре у пользователя
         :return: True если путь выбран
         """
+        from .dialogs.game_path_dialog import GamePathDialog
         dialog = GamePathDialog(self)
         if dialog.exec():
             # Путь выбран
@@ -144,42 +182,102 @@ class MainWindow(QMainWindow):
             # Диалог отменен
             return False
     
+    def on_tab_changed(self, index: int):
+        """Создание вкладки при первом открытии"""
+        tab = self.tabs.widget(index)
+        if isinstance(tab, LazyTab):
+            tab.ensure_created()
+    
     def refresh_mods(self):
         """Обновление списка модов"""
         self.statusBar.showMessage("Обновление списка модов...")
         mods_data = self.mod_scanner.scan_mods()
-        self.mods_tab.update_mods(mods_data["mods"])  # Передаем список модов
+        # Передаем список модов и построенные сканером индексы
+        self.mods_tab.update_mods(mods_data["mods"], self.mod_scanner.search_index,
+                                  self.mod_scanner.facet_index)
+        self.populate_facets()
+        self.filter_mods()
         self.statusBar.showMessage("Список модов обновлен", 3000)
+        if self.first_paint_ms is not None:
+            # При запуске поиск начинается после первой отрисовки (см. paintEvent)
+            self.mods_tab.adopt_untracked()
+    
+    def on_mods_adopted(self, count: int):
+        """Найдены моды каталога среди pak файлов, установленных без программы"""
+        self.statusBar.showMessage(f"Опознано установленных вручную модов: {count}", 5000)
+    
+    def populate_facets(self):
+        """Заполнение фильтров значениями фасетов из каталога"""
+        facet_index = self.mod_scanner.facet_index
+        names = self.mod_scanner.get_display_names(self.config.get_language())
+        for facet, combo in self.facet_combos.items():
+            facet_names = names.get(facet, {})
+            values = facet_index.get_values(facet)
+            if facet == 'month':
+                # Сначала новые, в виде ММ.ГГГГ
+                values.reverse()
+                facet_names = {value: f"{value[5:7]}.{value[:4]}" for value in values}
+            else:
+                values.sort(key=lambda value: facet_names.get(value, value).lower())
+            combo.set_values(values, facet_names)
     
     def filter_mods(self):
-        """Фильтрация модов по поиску и категории"""
+        """Фильтрация модов по поиску и фасетам, обновление количества в фильтрах"""
         search_text = self.search_input.text().lower()
-        category = self.category_combo.currentText()
-        self.mods_tab.filter_mods(search_text, category)
+        filters = {facet: combo.get_value() for facet, combo in self.facet_combos.items()}
+        counts = self.mods_tab.filter_mods(search_text, filters)
+        for facet, combo in self.facet_combos.items():
+            combo.set_counts(counts.get(facet, {}))
     
     def check_updates(self):
-        """Проверка обновлений модов"""
-        self.statusBar.showMessage("Проверка обновлений...")
-        has_updates, message = self.github.check_for_updates()
-        
+        """Проверка обновлений модов (в фоновом потоке)"""
+        if self.update_checker.check():
+            self.update_btn.setEnabled(False)
+            self.statusBar.showMessage("Проверка обновлений...")
+    
+    def on_updates_checked(self, has_updates: bool, message: str):
+        """Результат фоновой проверки обновлений"""
+        self.update_btn.setEnabled(True)
         if has_updates:
-            reply = QMessageBox.question(
-                self,
-                "Доступно обновление",
-                f"{message}\nХотите обновить список модов?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            
-            if reply == QMessageBox.StandardButton.Yes:
-                success, update_msg = self.github.update_mods_json()
-                if success:
-                    self.refresh_mods()
-                    QMessageBox.information(self, "Успех", update_msg)
-                else:
-                    QMessageBox.warning(self, "Ошибка", update_msg)
+            self.statusBar.clearMessage()
+            self.update_banner.show_update(message)
         else:
             self.statusBar.showMessage(message, 3000)
     
+    def apply_update(self):
+        """Обновление списка модов по кнопке в баннере"""
+        if self.update_checker.apply():
+            self.update_btn.setEnabled(False)
+            self.update_banner.show_progress("Обновление списка модов...")
+    
+    def on_update_applied(self, success: bool, message: str):
+        """Результат обновления списка модов"""
+        self.update_btn.setEnabled(True)
+        if success:
+            self.refresh_mods()
+        self.update_banner.show_message(message, auto_hide=success)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.initialized:
+            return
+        if self.first_paint_ms is None:
+            self.first_paint_ms = 0.0
+            if self.started_at is not None:
+                self.first_paint_ms = (time.perf_counter() - self.started_at) * 1000
+                print(f"Первая отрисовка окна через {self.first_paint_ms:.0f} мс после запуска")
+            self.firstPainted.emit(self.first_paint_ms)
+            if self.check_updates_on_start:
+                # Проверяем обновления в фоне, когда окно уже показано
+                QTimer.singleShot(0, self.check_updates)
+            # Опознаем pak файлы, установленные без программы, пока окно уже работает
+            QTimer.singleShot(0, self.mods_tab.adopt_untracked)
+    
+    def closeEvent(self, event):
+        if self.initialized:
+            self.mods_tab.shutdown()
+        super().closeEvent(event)
+    
     def open_settings(self):
         """Открытие окна настроек"""
         from .dialogs.settings_dialog import SettingsDialog
@@ -0,0 +1,76 @@
+import os
+import sys
+import gc
+import json
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_search_index import make_synthetic_catalog
+from dmi.core.catalog_snapshot import CatalogSnapshot
+from dmi.core.mod_scanner import ModScanner
+
+def load_dicts(path: str) -> list:
+    """Старый способ: разбор JSON во вложенные словари с добавлением id"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    mods = []
+    for mod_id, mod_info in data.get('mods', {}).items():
+        mod_info['id'] = mod_id
+        mods.append(mod_info)
+    return mods
+
+def measure(func, repeat: int = 5):
+    """
+    Время загрузки (лучшее из repeat) и память, которую занимает результат
+    :return: (мс, МБ)
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return best, retained / 1024 / 1024
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as base_path:
+        mods = make_synthetic_catalog(size)
+        os.makedirs(os.path.join(base_path, 'data'))
+        mods_json_path = os.path.join(base_path, 'data', 'mods.json')
+        with open(mods_json_path, 'w', encoding='utf-8') as f:
+            json.dump({'mods': {mod.pop('id'): mod for mod in mods}}, f, indent=2, ensure_ascii=False)
+        del mods
+
+        scanner = ModScanner(base_path)
+        scanner.snapshot = CatalogSnapshot(os.path.join(base_path, 'catalog.snapshot'))
+
+        def cold():
+            scanner.snapshot.clear()
+            return scanner.load_catalog()
+
+        print(f"Каталог: {size} модов, mods.json {os.path.getsize(mods_json_path) / 1024 / 1024:.1f} МБ")
+        print(f"{'способ':<40}{'время, мс':>11}{'память, МБ':>12}")
+        for title, func in (
+            ("JSON -> словари (старый)", lambda: load_dicts(mods_json_path)),
+            ("JSON -> ModRecord + запись снимка", cold),
+            ("снимок -> ModRecord", scanner.load_catalog),
+        ):
+            elapsed, memory = measure(func)
+            print(f"{title:<40}{elapsed:>11.0f}{memory:>12.1f}")
+        print(f"Размер снимка: {os.path.getsize(scanner.snapshot.snapshot_path) / 1024 / 1024:.1f} МБ")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_file(path: str, size: int) -> None:
+    """Файл мода заданного размера (разреженный - место на диске не тратится)"""
+    with open(path, 'wb') as f:
+        f.write(os.path.basename(path).encode())
+        f.truncate(size)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    size = int(sys.argv[2]) * 1024 * 1024 if len(sys.argv) > 2 else 200 * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as base_path:
+        # Манифест, журнал и профили - во временной папке
+        os.environ['APPDATA'] = os.path.join(base_path, 'appdata')
+        from dmi.core.mod_installer import ModInstaller
+        from dmi.core.loadout_manager import LoadoutManager
+
+        addons_path = os.path.join(base_path, 'game', 'citadel', 'addons')
+        source_path = os.path.join(base_path, 'source')
+        os.makedirs(addons_path)
+        os.makedirs(source_path)
+
+        installer = ModInstaller()
+        installer._game_path = addons_path
+        installer.refresh_state()
+        loadouts = LoadoutManager(installer)
+
+        # Два набора по count модов: первый установлен, второй отложен
+        first = [f"first_{i}" for i in range(count)]
+        second = [f"second_{i}" for i in range(count)]
+        for mod_id in second + first:
+            path = os.path.join(source_path, f"{mod_id}.vpk")
+            make_file(path, size)
+            # Файлы переносятся в папку аддонов переименованием, без копирования
+            installer.commit_changes([{'source': path, 'info': {'mod_id': mod_id, 'version': '1'}}], [])
+        loadouts.save_profile("first", first)
+        loadouts.save_profile("second", second)
+        loadouts.switch_profile("first")
+
+        print(f"Профили по {count} модов, {size // 1024 // 1024} МБ каждый")
+        for name in ("second", "first", "second"):
+            start = time.perf_counter()
+            success, message = loadouts.switch_profile(name)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"-> {name:<8}{elapsed:>8.1f} мс  {message}")
+            assert success, message
+
+        # Для сравнения: старый способ - скопировать моды заново
+        start = time.perf_counter()
+        for pak_filename in installer.get_slot_order():
+            shutil.copyfile(os.path.join(addons_path, pak_filename),
+                            os.path.join(source_path, pak_filename))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"копирование {count} модов: {elapsed:.1f} мс")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.mod_record import ModRecord
+from dmi.core.search_index import SearchIndex
+
+def make_synthetic_catalog(size: int, seed: int = 42) -> list:
+    """
+    Синтетический каталог на основе data/mods.json
+    Моды размножаются с перемешанными словами названий и описаний
+    :param size: Количество модов
+    :param seed: Seed генератора
+    :return: Список модов
+    """
+    with open(os.path.join('data', 'mods.json'), 'r', encoding='utf-8') as f:
+        base = list(json.load(f)['mods'].values())
+
+    rng = random.Random(seed)
+    words = [w for mod in base for w in (mod.get('title') or '').split()]
+    mods = []
+    for i in range(size):
+        source = base[i % len(base)]
+        mod = dict(source)
+        mod['id'] = f"{source['id']}_{i}"
+        mod['title'] = " ".join(rng.sample(words, 3))
+        mod['descriptions'] = {
+            lang: " ".join(rng.sample(text.split(), len(text.split())))
+            for lang, text in (source.get('descriptions') or {}).items() if text
+        }
+        mods.append(mod)
+    return mods
+
+def linear_search(mods: list, query: str) -> list:
+    """Старый способ: перебор всех модов с приведением полей к нижнему регистру"""
+    query = query.lower()
+    result = []
+    for mod in mods:
+        search_in = [
+            mod.get('title', ''),
+            mod.get('author', ''),
+            mod.get('hero') or '',
+            mod.get('descriptions', {}).get('ru', ''),
+            mod.get('descriptions', {}).get('en', '')
+        ]
+        if any(query in (text or '').lower() for text in search_in):
+            result.append(mod['id'])
+    return result
+
+def bench(func, repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    mods = make_synthetic_catalog(size)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.build([ModRecord.from_dict(mod['id'], mod) for mod in mods])
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Каталог: {size} модов, построение индекса: {build_ms:.0f} мс")
+
+    queries = ["haze", "abrams skin", "sound", "ui", "interloper", "звук", "xyzzy", "в"]
+    print(f"{'запрос':<14}{'найдено':>9}{'первый, мс':>12}{'отбор, мс':>11}"
+          f"{'с ранж., мс':>13}{'перебор, мс':>13}")
+    for query in queries:
+        # Первый запрос - без кэша слов запроса
+        index._term_cache.clear()
+        cold_ms = bench(lambda: index.search(query), 1)
+        found = len(index.search(query))
+        match_ms = bench(lambda: index.search_positions(query), 50)
+        index_ms = bench(lambda: index.search(query), 50)
+        linear_ms = bench(lambda: linear_search(mods, query), 3)
+        print(f"{query:<14}{found:>9}{cold_ms:>12.3f}{match_ms:>11.3f}"
+              f"{index_ms:>13.3f}{linear_ms:>13.1f}")
+
+    # Имитация набора запроса по буквам
+    typed = "interloper"
+    index._term_cache.clear()
+    start = time.perf_counter()
+    for i in range(1, len(typed) + 1):
+        index.search_positions(typed[:i])
+    print(f"Набор '{typed}' по буквам: {(time.perf_counter() - start) * 1000:.2f} мс "
+          f"на {len(typed)} запросов")
+
+if __name__ == '__main__':
+    main()
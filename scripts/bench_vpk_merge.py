@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.vpk_reader import VpkReader
+from dmi.core.vpk_writer import VpkWriter, merge_vpks
+
+def make_mods(addons_path: str, count: int, files_per_mod: int, file_size: int, seed: int = 42) -> list:
+    """
+    Синтетические pak файлы модов, собранные из случайных файлов: часть
+    путей у модов одного героя совпадает (как у двух скинов на одного героя)
+    :return: Пути pak файлов в порядке загрузки
+    """
+    rng = random.Random(seed)
+    paths = []
+    for number in range(1, count + 1):
+        hero = f"hero{number % 12}"
+        source_path = os.path.join(addons_path, f"mod{number}")
+        os.makedirs(source_path)
+        writer = VpkWriter()
+        for index in range(files_per_mod):
+            # Треть путей общая для модов одного героя
+            owner = hero if index % 3 == 0 else f"mod{number}"
+            file_path = os.path.join(source_path, f"{index}.bin")
+            with open(file_path, 'wb') as f:
+                f.write(rng.getrandbits(file_size * 8).to_bytes(file_size, 'little'))
+            writer.add_file(f"materials/{owner}/texture_{index}.vtex_c", file_path)
+        path = os.path.join(addons_path, f"pak{number:02d}_dir.vpk")
+        writer.write(path)
+        paths.append(path)
+    return paths
+
+def measure_game_side(paths: list) -> dict:
+    """
+    То, что игра делает с pak файлами при запуске: открыть каждый и прочитать каталог
+    :return: {paks, files, tree_bytes, open_ms}
+    """
+    start = time.perf_counter()
+    files = 0
+    tree_bytes = 0
+    for path in paths:
+        with VpkReader(path) as reader:
+            files += len(reader)
+            tree_bytes += reader.tree_size
+    return {
+        'paks': len(paths),
+        'files': files,
+        'tree_bytes': tree_bytes,
+        'open_ms': (time.perf_counter() - start) * 1000
+    }
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    files_per_mod = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    file_size = int(sys.argv[3]) if len(sys.argv) > 3 else 16 * 1024
+
+    with tempfile.TemporaryDirectory() as base_path:
+        paths = make_mods(base_path, count, files_per_mod, file_size)
+        before = measure_game_side(paths)
+
+        target_path = os.path.join(base_path, 'merged_dir.vpk')
+        tracemalloc.start()
+        start = time.perf_counter()
+        stats = merge_vpks(paths, target_path, verify_crc=True)
+        merge_ms = (time.perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        after = measure_game_side([target_path])
+        with VpkReader(target_path) as reader:
+            checksums = reader.verify_checksums()
+
+        data_mb = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print(f"{count} модов по {files_per_mod} файлов, {data_mb:.0f} МБ")
+        print(f"{'':<12}{'pak':>6}{'файлов':>10}{'каталог, КБ':>14}{'открытие, мс':>15}")
+        for title, row in (("до", before), ("после", after)):
+            print(f"{title:<12}{row['paks']:>6}{row['files']:>10}{row['tree_bytes'] / 1024:>14.1f}{row['open_ms']:>15.1f}")
+        print(f"Объединение: {merge_ms:.0f} мс, перекрыто файлов: {stats['overridden']}, "
+              f"пик памяти: {peak / 1024 / 1024:.1f} МБ, контрольные суммы: {checksums}")
+
+if __name__ == '__main__':
+    main()
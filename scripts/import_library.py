@@ -0,0 +1,49 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.library_importer import LibraryImporter
+from dmi.core.mod_scanner import ModScanner
+from dmi.core.vpk_store import VpkStore
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Разбор папок со скачанными модами: моды каталога, повторы, неизвестные файлы. "
+                    "Файлы не перемещаются и не переименовываются")
+    parser.add_argument('paths', nargs='+', help="Папки для обхода")
+    parser.add_argument('--report', metavar='JSON', help="Сохранить полный отчет в файл")
+    parser.add_argument('--store', action='store_true',
+                        help="Скопировать найденные моды каталога в хранилище программы")
+    parser.add_argument('--workers', type=int, default=None, help="Число потоков")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    mods = ModScanner(root).scan_mods()["mods"]
+
+    start = time.perf_counter()
+    report = LibraryImporter(max_workers=args.workers).run(args.paths, mods)
+    elapsed = time.perf_counter() - start
+
+    for item in report.matched:
+        print(f"[каталог]  {item['mod_id']:<24} {item['path']}")
+    for item in report.duplicates:
+        print(f"[повтор]   {item['path']} = {item['original']}")
+    for item in report.unknown:
+        print(f"[неизвестен] {item['suggested_name']:<24} {item['path']}")
+    for item in report.errors:
+        print(f"[ошибка]   {item['path']}: {item['error']}")
+    print(f"{report.get_summary()}. Прочитано файлов: {report.hashed}, {elapsed:.2f} с")
+
+    if args.store:
+        added = LibraryImporter.import_to_store(report, VpkStore())
+        print(f"Добавлено в хранилище: {added}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.vpk_reader import VpkReader
+
+def list_vpk(path: str) -> None:
+    """Вывод содержимого VPK: путь, размер, CRC"""
+    start = time.perf_counter()
+    with VpkReader(path) as reader:
+        elapsed = (time.perf_counter() - start) * 1000
+        for entry in reader:
+            print(f"{entry.crc:08x} {entry.size:>12} {entry.path}")
+        print(f"VPK v{reader.version}: {len(reader)} файлов, {reader.get_total_size()} байт, "
+              f"каталог разобран за {elapsed:.1f} мс, контрольные суммы: {reader.verify_checksums()}")
+
+def update_catalog(mods_path: str, files_root: str) -> None:
+    """
+    Проверка файлов модов каталога и запись сведений о содержимом
+    В file каждого мода записываются vpk_version, entries (число файлов)
+    и unpacked_size (суммарный размер файлов внутри VPK)
+    :param mods_path: Путь к mods.json
+    :param files_root: Папка, от которой отсчитываются file.local_path
+    """
+    with open(mods_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    checked = 0
+    problems = []
+    for mod_id, mod_info in data['mods'].items():
+        file_info = mod_info.get('file') or {}
+        local_path = file_info.get('local_path')
+        if not local_path:
+            continue
+        path = os.path.join(files_root, local_path.replace('\\', os.sep))
+        if not os.path.exists(path):
+            problems.append(f"{mod_id}: файл не найден ({path})")
+            continue
+        try:
+            with VpkReader(path) as reader:
+                if not reader.is_single_file():
+                    problems.append(f"{mod_id}: VPK ссылается на внешние архивы")
+                if reader.verify_checksums() is False:
+                    problems.append(f"{mod_id}: контрольная сумма каталога не совпадает")
+                file_info['vpk_version'] = reader.version
+                file_info['entries'] = len(reader)
+                file_info['unpacked_size'] = reader.get_total_size()
+                checked += 1
+        except (OSError, ValueError) as e:
+            problems.append(f"{mod_id}: не является VPK ({e})")
+
+    with open(mods_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    print(f"Проверено модов: {checked}")
+    for problem in problems:
+        print(problem)
+
+def main():
+    parser = argparse.ArgumentParser(description="Просмотр VPK и проверка файлов каталога")
+    parser.add_argument('path', help="VPK файл или папка с файлами модов (с --catalog)")
+    parser.add_argument('--catalog', metavar='MODS_JSON',
+                        help="Проверить файлы модов каталога и записать сведения о содержимом")
+    args = parser.parse_args()
+
+    if args.catalog:
+        update_catalog(args.catalog, args.path)
+    else:
+        list_vpk(args.path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.mod_installer import ModInstaller
+
+def main():
+    installer = ModInstaller()
+    installer.refresh_state()
+
+    start = time.perf_counter()
+    report = installer.get_conflict_report()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for line in report:
+        print(line)
+    print(f"Pak файлов: {len(installer.get_slot_order())}, пересечений: {len(report)}, "
+          f"проверка заняла {elapsed:.1f} мс")
+
+if __name__ == '__main__':
+    main()
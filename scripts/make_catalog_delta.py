@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dmi.core.catalog_delta import make_delta
+
+# Сколько последних дельт хранить в репозитории
+KEEP_DELTAS = 50
+
+def load_json(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json(path: str, data: dict, indent: int = None) -> None:
+    """Атомарная запись JSON"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Публикация новой версии каталога: mods.json с номером версии и дельта к нему")
+    parser.add_argument('old', help="Опубликованный сейчас mods.json")
+    parser.add_argument('new', help="Новый mods.json")
+    parser.add_argument('data_dir', help="Папка data репозитория модов")
+    parser.add_argument('--keep', type=int, default=KEEP_DELTAS,
+                        help=f"Сколько последних дельт хранить (по умолчанию {KEEP_DELTAS})")
+    args = parser.parse_args()
+
+    old_catalog = load_json(args.old)
+    new_catalog = load_json(args.new)
+    old_sequence = old_catalog.get('sequence', 0)
+    new_catalog['sequence'] = old_sequence + 1
+
+    delta = make_delta(old_catalog, new_catalog)
+    if not delta['upsert'] and not delta['delete']:
+        print("Каталоги совпадают, новая версия не нужна")
+        return
+
+    deltas_dir = os.path.join(args.data_dir, 'deltas')
+    os.makedirs(deltas_dir, exist_ok=True)
+    index_path = os.path.join(deltas_dir, 'index.json')
+    try:
+        index = load_json(index_path)
+    except OSError:
+        index = {}
+
+    # Цепочка рвется, если старая версия - не та, на которую указывает индекс
+    if index.get('sequence') != old_sequence:
+        index['oldest'] = old_sequence
+
+    save_json(os.path.join(deltas_dir, f"{delta['sequence']}.json"), delta)
+
+    # Удаляем старые дельты; клиенты, отставшие сильнее, скачают каталог целиком
+    oldest = max(index['oldest'], delta['sequence'] - args.keep)
+    for sequence in range(index['oldest'] + 1, oldest + 1):
+        path = os.path.join(deltas_dir, f"{sequence}.json")
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Сначала полный каталог, потом индекс - клиент не увидит версию без каталога
+    save_json(os.path.join(args.data_dir, 'mods.json'), new_catalog, indent=2)
+    save_json(index_path, {'sequence': delta['sequence'], 'oldest': oldest})
+
+    print(f"Версия {delta['sequence']}: изменено {len(delta['upsert'])}, удалено {len(delta['delete'])}, "
+          f"дельта {len(json.dumps(delta, ensure_ascii=False).encode('utf-8'))} байт")
+
+if __name__ == '__main__':
+    main()